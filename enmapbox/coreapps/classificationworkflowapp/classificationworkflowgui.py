@@ -868,7 +868,7 @@ class ClassificationWorkflowGui(QMainWindow):
             self.mFilePredictedProbability.setFilePath(filenameProbability)
 
             # probability as RGB
-            colors = str([c.color for c in ClassifierDump(**Utils.pickleLoad(filenameClassifier)).categories])
+            colors = str([c.color for c in ClassifierDump(**Utils.datasetLoad(filenameClassifier)).categories])
             alg = CreateRgbImageFromClassProbabilityAlgorithm()
             parameters = {
                 alg.P_PROBABILITY: filenameProbability,
@@ -932,7 +932,7 @@ class ClassificationWorkflowGui(QMainWindow):
     def updateDatasetInfo(self, mFile: QgsFileWidget, label: QLabel):
         filename = mFile.filePath()
         if exists(filename) and filename.endswith('.pkl'):
-            dump = ClassifierDump(**Utils.pickleLoad(filename))
+            dump = ClassifierDump(**Utils.datasetLoad(filename))
             label.setText(f'{np.array(dump.X).shape[0]} '
                           f'samples {np.array(dump.X).shape[1]} features  {len(dump.categories)} categories')
             label.show()
@@ -963,7 +963,7 @@ class ClassificationWorkflowGui(QMainWindow):
     def onDatasetChanged(self, *args):
         filename = self.mFileDataset.filePath()
         if exists(filename) and filename.endswith('.pkl'):
-            dump = ClassifierDump(**Utils.pickleLoad(filename))
+            dump = ClassifierDump(**Utils.datasetLoad(filename))
         else:
             dump = ClassifierDump(categories=[], features=[], X=np.zeros((0, 0)), y=np.zeros((0, 1)))
 
@@ -1024,7 +1024,7 @@ class ClassificationWorkflowGui(QMainWindow):
             self.pushParameterMissingSample()
             raise MissingParameterError()
 
-        dump = ClassifierDump(**Utils.pickleLoad(filename))
+        dump = ClassifierDump(**Utils.datasetLoad(filename, mmap=False))  # we overwrite the arrays below
 
         categories = list()
         for i, origCategory in enumerate(dump.categories):
@@ -1039,7 +1039,7 @@ class ClassificationWorkflowGui(QMainWindow):
 
         # overwrite sample
         dump = dump.withCategories(categories).withFeatures(features)
-        Utils.pickleDump(dump.__dict__, filename)
+        Utils.datasetDump(dump.__dict__, filename)
 
     @errorHandled(successMessage=None)
     def onSetTrainSize(self, *args):
@@ -1093,7 +1093,7 @@ class ClassificationWorkflowGui(QMainWindow):
         filename = file.filePath()
 
         if filename.endswith('.pkl'):
-            dump = Utils.pickleLoad(filename)
+            dump = Utils.datasetLoad(filename)
             filename = filename + '.json'
             Utils.jsonDump(dump, filename)
         self.openWebbrowser(filename)
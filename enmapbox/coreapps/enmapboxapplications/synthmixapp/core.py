@@ -67,7 +67,7 @@ class SynthmixApp(QMainWindow):
         if filename == '':
             return
 
-        dump = ClassifierDump(**Utils.pickleLoad(filename))
+        dump = ClassifierDump(**Utils.datasetLoad(filename))
         self.names = [c.name for c in dump.categories]
         self.uiTargets().addItems(self.names)
         self.uiTargets().selectAllOptions()
@@ -197,7 +197,7 @@ class SynthmixApp(QMainWindow):
 # SynthMix will be overhauled for version 3.10!
 @typechecked
 def utilsMakeClassificationSampleFromCategorizedLibrary(filenameDataset: str, filename: str) -> ClassificationSample:
-    dump = ClassifierDump(**Utils.pickleLoad(filenameDataset))
+    dump = ClassifierDump(**Utils.datasetLoad(filenameDataset))
     X = dump.X
     y = dump.y
     categories = dump.categories
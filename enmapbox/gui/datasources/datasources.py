@@ -7,6 +7,7 @@ from qgis.core import QgsDataItem, QgsLayerItem, QgsCoordinateReferenceSystem, Q
     QgsMapLayerType, QgsVectorLayer, QgsRasterLayer, Qgis, QgsWkbTypes, QgsField
 
 from enmapbox import messageLog, debugLog
+from enmapboxprocessing.utils import Utils
 from ...externals.qps.classification.classificationscheme import ClassificationScheme
 from ...externals.qps.models import TreeNode, PyObjectTreeNode
 from ...externals.qps.utils import SpatialExtent, parseWavelength, iconForFieldType
@@ -264,8 +265,8 @@ class ModelDataSource(DataSource):
         error = None
         try:
             if source.endswith('.pkl'):
-                with open(source, 'rb') as f:
-                    pkl_obj = pickle.load(f)
+                # datasets and models are stored in a zip container, legacy files are plain pickles
+                pkl_obj = Utils.datasetLoad(source)
             elif source.endswith('.json'):
                 with open(source, 'r', encoding='utf-8') as f:
                     pkl_obj = json.load(f)
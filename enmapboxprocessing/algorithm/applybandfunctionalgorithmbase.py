@@ -1,14 +1,17 @@
 import inspect
 from inspect import signature
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, Callable
 
 import numpy as np
 from qgis._core import (QgsProcessingContext, QgsProcessingFeedback, Qgis)
 
+from enmapboxprocessing.blockexecutor import BlockExecutor
 from enmapboxprocessing.driver import Driver
 from enmapboxprocessing.enmapalgorithm import EnMAPProcessingAlgorithm
+from enmapboxprocessing.rasterblockinfo import RasterBlockInfo
 from enmapboxprocessing.rasterreader import RasterReader
 from enmapboxprocessing.typing import QgisDataType
+from enmapboxprocessing.utils import Utils
 from typeguard import typechecked
 
 
@@ -16,12 +19,21 @@ from typeguard import typechecked
 class ApplyBandFunctionAlgorithmBase(EnMAPProcessingAlgorithm):
     P_RASTER, _RASTER = 'raster', 'Raster layer'
     P_FUNCTION, _FUNCTION = 'function', 'Function'
+    P_OVERLAP, _OVERLAP = 'overlap', 'Tile overlap'
+    P_NUMBER_OF_WORKERS, _NUMBER_OF_WORKERS = 'numberOfWorkers', 'Number of workers'
     P_OUTPUT_RASTER, _OUTPUT_RASTER = 'outputRaster', 'Output raster layer'
+    Tileable = True  # set to False for functions with an unbounded footprint (e.g. filling holes)
+    MaximumOverlap = 32  # larger footprints are processed band-wise
 
     def helpParameters(self) -> List[Tuple[str, str]]:
         return [
             (self._RASTER, f'Raster layer to be processed band-wise.'),
             (self._FUNCTION, self.helpParameterCode()),
+            (self._OVERLAP, 'Number of pixels by which tiles are extended on each side, '
+                            'which must cover the footprint of the function. '
+                            'If not specified, the overlap is derived from the footprint of the function. '
+                            'Functions with a footprint too large for tiling are applied to whole bands.'),
+            (self._NUMBER_OF_WORKERS, self.NumberOfWorkers),
             (self._OUTPUT_RASTER, self.RasterFileDestination)
         ]
 
@@ -43,6 +55,8 @@ class ApplyBandFunctionAlgorithmBase(EnMAPProcessingAlgorithm):
     def initAlgorithm(self, configuration: Dict[str, Any] = None):
         self.addParameterRasterLayer(self.P_RASTER, self._RASTER)
         self.addParameterCode(self.P_FUNCTION, self._FUNCTION, self.defaultCodeAsString())
+        self.addParameterInt(self.P_OVERLAP, self._OVERLAP, None, True, 0, None, True)
+        self.addParameterNumberOfWorkers(self.P_NUMBER_OF_WORKERS, self._NUMBER_OF_WORKERS)
         self.addParameterRasterDestination(self.P_OUTPUT_RASTER, self._OUTPUT_RASTER)
 
     def defaultCodeAsString(self):
@@ -65,47 +79,131 @@ class ApplyBandFunctionAlgorithmBase(EnMAPProcessingAlgorithm):
     ) -> Dict[str, Any]:
         raster = self.parameterAsRasterLayer(parameters, self.P_RASTER, context)
         function = self.parameterAsFunction(parameters, self.P_FUNCTION, context)
+        overlap = self.parameterAsInt(parameters, self.P_OVERLAP, context)
+        numberOfWorkers = self.parameterAsNumberOfWorkers(parameters, self.P_NUMBER_OF_WORKERS, context)
         filename = self.parameterAsOutputLayer(parameters, self.P_OUTPUT_RASTER, context)
         format, options = self.GTiffFormat, self.DefaultGTiffCreationOptions
+        maximumMemoryUsage = Utils.maximumMemoryUsage()
 
         with open(filename + '.log', 'w') as logfile:
             feedback, feedback2 = self.createLoggingFeedback(feedback, logfile)
             self.tic(feedback, parameters, context)
 
-            feedback.pushInfo('Apply function')
-            self.reader = RasterReader(raster)
-            self.writer = Driver(filename, format, options, feedback).createLike(self.reader, self.outputDataType())
-            for i in range(self.reader.bandCount()):
-                feedback.setProgress(i / self.reader.bandCount() * 100)
-                bandList = [i + 1]
-                self.array = self.reader.array(bandList=bandList)[0]
-                self.prepareInput()
-                self.marray = self.reader.maskArray(self.array[None], bandList=bandList)[0]
+            reader = RasterReader(raster)
+            writer = Driver(filename, format, options, feedback).createLike(reader, self.outputDataType())
+
+            def apply(array: np.ndarray, bandNo: int) -> np.ndarray:
+                array = self.prepareInput(array)
+                marray = reader.maskArray(array[None], bandList=[bandNo])[0]
                 if len(signature(function).parameters) == 1:
-                    self.outarray = function(self.array)
+                    outarray = function(array)
+                else:
+                    outarray = function(array, reader.noDataValue(bandNo))
+                return self.prepareOutput(outarray, marray)
+
+            if overlap is None and self.Tileable:
+                overlap = self.footprintRadius(lambda array: apply(array, 1))
+            if overlap is None:
+                feedback.pushInfo('Apply function band-wise')
+                blockSizeX, blockSizeY = reader.width(), reader.height()
+                overlap = 0
+            else:
+                feedback.pushInfo(f'Apply function tile-wise (overlap={overlap})')
+                executor = BlockExecutor(numberOfWorkers)
+                pixelMemoryUsage = reader.pixelMemoryUsage(1)  # input tile
+                pixelMemoryUsage += 4 + 1  # float32 copy and mask
+                pixelMemoryUsage += 8 * 2  # output tile and function temporaries
+                pixelMemoryUsage *= executor.blocksInFlight()
+                blockSizeX, blockSizeY = reader.planBlockSize(pixelMemoryUsage, maximumMemoryUsage)
+                blockSizeX = max(blockSizeX, min(reader.width(), 4 * overlap))
+                blockSizeY = max(blockSizeY, min(reader.height(), 4 * overlap))
+
+            for i in range(reader.bandCount()):
+                feedback.setProgress(i / reader.bandCount() * 100)
+                bandNo = i + 1
+
+                def read(block: RasterBlockInfo):
+                    # extend the tile by the overlap, but only inside the raster, so that the function sees the true
+                    # raster border and tiles give the same result as processing the whole band at once
+                    left = min(overlap, block.xOffset)
+                    top = min(overlap, block.yOffset)
+                    right = min(overlap, reader.width() - block.xOffset - block.width)
+                    bottom = min(overlap, reader.height() - block.yOffset - block.height)
+                    array = reader.arrayFromPixelOffsetAndSize(
+                        block.xOffset - left, block.yOffset - top, block.width + left + right,
+                        block.height + top + bottom, [bandNo]
+                    )[0]
+                    return array, (top, left)
+
+                def compute(block: RasterBlockInfo, data):
+                    array, (top, left) = data
+                    outarray = apply(array, bandNo)
+                    return outarray[top: top + block.height, left: left + block.width]
+
+                def write(block: RasterBlockInfo, outarray):
+                    writer.writeArray2d(outarray, bandNo, block.xOffset, block.yOffset)
+
+                blocks = reader.walkGrid(blockSizeX, blockSizeY)
+                if overlap == 0 and blockSizeX == reader.width() and blockSizeY == reader.height():
+                    for block in blocks:
+                        write(block, compute(block, read(block)))
                 else:
-                    self.outarray = function(self.array, self.reader.noDataValue(i + 1))
-                self.prepareOutput()
-                self.writer.writeArray(self.outarray[None], bandList=bandList)
+                    executor.run(blocks, read, compute, write)
 
-            self.writer.setMetadata(self.reader.metadata())
-            self.writer.setNoDataValue(self.outputNoDataValue())
-            for i in range(self.reader.bandCount()):
-                self.writer.setBandName(self.reader.bandName(i + 1), i + 1)
+            writer.setMetadata(reader.metadata())
+            writer.setNoDataValue(self.outputNoDataValue())
+            for i in range(reader.bandCount()):
+                writer.setBandName(reader.bandName(i + 1), i + 1)
 
             result = {self.P_OUTPUT_RASTER: filename}
             self.toc(feedback, result)
 
         return result
 
+    @classmethod
+    def footprintRadius(cls, function: Callable[[np.ndarray], np.ndarray]) -> Optional[int]:
+        """Derive the footprint radius of a band function by probing it with perturbed arrays.
+
+        The function is applied to a set of probe arrays (constant, random continuous and random binary),
+        with and without perturbing the center pixel. The radius is the largest (Chebyshev) distance of an output pixel
+        affected by the perturbation. Returns None, if the footprint exceeds the MaximumOverlap.
+        """
+        size = 2 * (cls.MaximumOverlap + 1) + 1
+        center = size // 2
+        random = np.random.RandomState(42)
+        probes = [(np.zeros((size, size)), 1.), (np.ones((size, size)), 0.)]
+        for _ in range(4):
+            probes.append((random.random_sample((size, size)) * 100, 1e4))
+            probes.append((random.random_sample((size, size)) * 100, -1e4))
+        for density in [0.25, 0.5, 0.75]:
+            for _ in range(4):
+                probe = np.float32(random.random_sample((size, size)) < density)
+                probes.append((probe, 1. - probe[center, center]))
+
+        distance = np.maximum(*np.abs(np.indices((size, size)) - center))
+        radius = 0
+        for probe, value in probes:
+            probe = np.float32(probe)
+            perturbed = probe.copy()
+            perturbed[center, center] = value
+            with np.errstate(all='ignore'):
+                changed = np.not_equal(np.asarray(function(probe)), np.asarray(function(perturbed)))
+            if changed.shape != probe.shape:
+                return None
+            if np.any(changed):
+                radius = max(radius, int(np.max(distance[changed])))
+        if radius > cls.MaximumOverlap:
+            return None
+        return radius
+
     def outputDataType(self) -> QgisDataType:
         return Qgis.Float32
 
     def outputNoDataValue(self) -> Optional[float]:
         return None
 
-    def prepareInput(self):
-        pass
+    def prepareInput(self, array: np.ndarray) -> np.ndarray:
+        return array
 
-    def prepareOutput(self):
-        pass
+    def prepareOutput(self, outarray: np.ndarray, marray: np.ndarray) -> np.ndarray:
+        return outarray
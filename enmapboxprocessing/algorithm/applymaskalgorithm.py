@@ -6,6 +6,7 @@ from enmapboxprocessing.algorithm.layertomaskalgorithm import LayerToMaskAlgorit
 from enmapboxprocessing.driver import Driver
 from enmapboxprocessing.enmapalgorithm import EnMAPProcessingAlgorithm, Group
 from enmapboxprocessing.rasterreader import RasterReader
+from enmapboxprocessing.rasterwriter import AsyncRasterWriter
 from enmapboxprocessing.utils import Utils
 from typeguard import typechecked
 
@@ -57,22 +58,27 @@ class ApplyMaskAlgorithm(EnMAPProcessingAlgorithm):
             }
             mask = QgsRasterLayer(self.runAlg(alg, parameters, None, feedback2, context, True)[alg.P_OUTPUT_MASK])
 
-            # read mask
-            invalid = RasterReader(mask).array()[0] == 0
-
             # process raster
             reader = RasterReader(raster)
+            maskReader = RasterReader(mask)
             writer = Driver(filename, format, options, feedback).createLike(reader, reader.dataType())
-            for i in range(reader.bandCount()):
-                feedback.setProgress(i / reader.bandCount() * 100)
-                array = reader.array(bandList=[i + 1])[0]
-                noDataValue = reader.noDataValue(i + 1)
-                array[invalid] = noDataValue
-                writer.writeArray(array[None], bandList=[i + 1])
-
-                writer.setBandName(reader.bandName(i + 1), i + 1)
-                writer.setMetadata(reader.metadata(i + 1), i + 1)
-                writer.setNoDataValue(noDataValue, i + 1)
+            noDataValues = [reader.noDataValue(bandNo) for bandNo in range(1, reader.bandCount() + 1)]
+            prefetch = 2
+            pixelMemoryUsage = reader.pixelMemoryUsage() + maskReader.pixelMemoryUsage()
+            pixelMemoryUsage *= prefetch + 1 + 2  # blocks queued for reading, processed and queued for writing
+            blockSizeX, blockSizeY = reader.planBlockSize(pixelMemoryUsage)
+            blocks = reader.walkGrid(blockSizeX, blockSizeY, feedback)
+            with AsyncRasterWriter(writer) as asyncWriter:
+                for block, array in reader.iterBlockArrays(blocks, prefetch=prefetch):
+                    invalid = maskReader.arrayFromBlock(block)[0] == 0
+                    for a, noDataValue in zip(array, noDataValues):
+                        a[invalid] = noDataValue
+                    asyncWriter.writeArray(array, block.xOffset, block.yOffset)
+
+            for bandNo, noDataValue in enumerate(noDataValues, 1):
+                writer.setBandName(reader.bandName(bandNo), bandNo)
+                writer.setMetadata(reader.metadata(bandNo), bandNo)
+                writer.setNoDataValue(noDataValue, bandNo)
 
             writer.setMetadata(reader.metadata())
             result = {self.P_OUTPUT_RASTER: filename}
@@ -148,42 +148,54 @@ class ClassificationPerformanceStratifiedAlgorithm(EnMAPProcessingAlgorithm):
             self.runAlg(alg, parameters, None, feedback2, context, True)
             stratification = QgsRasterLayer(parameters[alg.P_OUTPUT_CATEGORIZED_RASTER])
 
-            feedback.pushInfo('Read data')
+            feedback.pushInfo('Count samples')
             # Note that we can be sure that all pixel grids match!
-            arrayReference = RasterReader(reference).array()[0]
             categoriesReference = Utils.categoriesFromPalettedRasterRenderer(reference.renderer())
-            arrayPrediction = RasterReader(classification).array()[0]
             categoriesPrediction = Utils.categoriesFromPalettedRasterRenderer(classification.renderer())
-            arrayStratification = RasterReader(stratification).array()[0]
             categoriesStratification = Utils.categoriesFromPalettedRasterRenderer(stratification.renderer())
-            # - get valid reference location
-            valid = np.full_like(arrayReference, False, bool)
-            for c in categoriesReference:
-                np.logical_or(valid, arrayReference == c.value, out=valid)
-            yReference = arrayReference[valid].astype(np.float32)
-            yMap = arrayPrediction[valid].astype(np.float32)
+            classValues = [c.value for c in categoriesReference]
+            classNames = [c.name for c in categoriesReference]
+            strataValues = [c.value for c in categoriesStratification]
             # - remap class ids by name
-            yMapRemapped = np.zeros_like(yMap)
+            mapValues = list()
+            mapIndices = list()
             for cP in categoriesPrediction:
-                for cR in categoriesReference:
-                    if cR.name == cP.name:
-                        yMapRemapped[yMap == cP.value] = cR.value
-            yMap = yMapRemapped
+                if cP.name in classNames:
+                    mapValues.append(cP.value)
+                    mapIndices.append(classNames.index(cP.name))
+            # - stream over the grid and accumulate the stratum x map x reference count tensor
+            readerReference = RasterReader(reference)
+            readerPrediction = RasterReader(classification)
+            readerStratification = RasterReader(stratification)
+            pixelMemoryUsage = sum(reader.pixelMemoryUsage(1)
+                                   for reader in [readerReference, readerPrediction, readerStratification])
+            pixelMemoryUsage += 3 * 8 + 1 + 8  # indices, mask and combined codes
+            blockSizeX, blockSizeY = readerPrediction.planBlockSize(pixelMemoryUsage)
+            nStrata = len(strataValues)
+            nClasses = len(classValues)
+            accumulator = StratifiedConfusionMatrixAccumulator(nStrata, nClasses)
+            for block in readerPrediction.walkGrid(blockSizeX, blockSizeY, feedback):
+                referenceIndex = lookupIndices(
+                    readerReference.arrayFromBlock(block)[0], classValues, range(nClasses), nClasses
+                )
+                mapIndex = lookupIndices(readerPrediction.arrayFromBlock(block)[0], mapValues, mapIndices, nClasses)
+                stratumIndex = lookupIndices(
+                    readerStratification.arrayFromBlock(block)[0], strataValues, range(nStrata), nStrata
+                )
+                accumulator.update(stratumIndex, mapIndex, referenceIndex, referenceIndex < nClasses)
             # - prepare strata
-            stratum = arrayStratification[valid]
-            h_all, N_h_all = np.unique(arrayStratification, return_counts=True)
+            assert accumulator.counts[-1].sum() == 0, 'observed samples outside of strata detected'
             h = list()
             N_h = list()
-            for i, category in enumerate(categoriesStratification):
-                if category.value not in h_all:
+            for i in range(nStrata):
+                if accumulator.stratumSizes[i] == 0:
                     continue
-                h.append(category.value)
-                N_h.append(N_h_all[i])
+                h.append(i)
+                N_h.append(int(accumulator.stratumSizes[i]))
+            counts = accumulator.counts[h]
 
             feedback.pushInfo('Estimate statistics and create report')
-            classValues = [c.value for c in categoriesReference]
-            classNames = [c.name for c in categoriesReference]
-            stats = stratifiedAccuracyAssessment(stratum, yReference, yMap, h, N_h, classValues, classNames)
+            stats = stratifiedAccuracyAssessmentFromCounts(counts, N_h, classValues, classNames)
             pixelUnits = QgsUnitTypes.toString(classification.crs().mapUnits())
             pixelArea = classification.rasterUnitsPerPixelX() * classification.rasterUnitsPerPixelY()
             self.writeReport(filename, stats, pixelUnits=pixelUnits, pixelArea=pixelArea)
@@ -324,6 +336,52 @@ def stratifiedAccuracyAssessment(
     return StratifiedAccuracyAssessmentResult(N=float(sum(N_h)), n=len(reference), class_names=classNames, **stats)
 
 
+@typechecked
+def stratifiedAccuracyAssessmentFromCounts(counts: np.ndarray, N_h: Iterable, classValues, classNames):
+    stats = aa_stratified_counts(counts, N_h, classValues)
+    return StratifiedAccuracyAssessmentResult(
+        N=float(sum(N_h)), n=int(np.sum(counts)), class_names=classNames, **stats
+    )
+
+
+@typechecked
+def lookupIndices(array: np.ndarray, keys: Iterable, indices: Iterable, default: int) -> np.ndarray:
+    """Map array values to the indices of matching keys, or to the default index, if no key matches."""
+    keys = np.array(keys)
+    indices = np.array(indices, dtype=np.int64)
+    if len(keys) == 0:
+        return np.full(np.shape(array), default, np.int64)
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    indices = indices[order]
+    positions = np.clip(np.searchsorted(keys, array), 0, len(keys) - 1)
+    return np.where(keys[positions] == array, indices[positions], default)
+
+
+@typechecked
+class StratifiedConfusionMatrixAccumulator(object):
+    """Accumulate the stratum x map x reference sample count tensor and the stratum sizes block by block.
+
+    Inputs are stratum, map class and reference class indices. The last stratum and class index is reserved for
+    pixels outside of all strata and classes. Only valid pixels are counted as samples, but all pixels contribute to
+    the stratum sizes.
+    """
+
+    def __init__(self, numberOfStrata: int, numberOfClasses: int):
+        self.numberOfStrata = numberOfStrata
+        self.numberOfClasses = numberOfClasses
+        self.counts = np.zeros((numberOfStrata + 1, numberOfClasses + 1, numberOfClasses + 1), np.int64)
+        self.stratumSizes = np.zeros((numberOfStrata + 1,), np.int64)
+
+    def update(self, stratum: np.ndarray, map: np.ndarray, reference: np.ndarray, valid: np.ndarray = None):
+        self.stratumSizes += np.bincount(stratum.ravel(), minlength=len(self.stratumSizes))
+        if valid is not None:
+            stratum, map, reference = stratum[valid], map[valid], reference[valid]
+        _, nMap, nReference = self.counts.shape
+        codes = (stratum.ravel() * nMap + map.ravel()) * nReference + reference.ravel()
+        self.counts += np.bincount(codes, minlength=self.counts.size).reshape(self.counts.shape)
+
+
 # Implementation is based on:
 #    Stehman, S. V., 2014.
 #    Estimating area and map accuracy for stratified random sampling when the strata are different from the map classes.
@@ -332,6 +390,8 @@ def stratifiedAccuracyAssessment(
 #
 # Function naming and signatures are inspired by an R implementation provided by Dirk Pflugmacher:
 #    https://scm.cms.hu-berlin.de/pflugmad/mapac/-/tree/master/R
+#
+# All involved variables are indicators (0/1), so all estimators only depend on per-stratum sample counts.
 
 @typechecked
 def aa_stratified(
@@ -341,7 +401,6 @@ def aa_stratified(
     reference = np.array(reference)
     map = np.array(map)
     h = np.array(h)
-    N_h = np.array(N_h, dtype=np.float64)
 
     assert len(stratum) == len(reference) == len(map)
     assert len(h) == len(N_h)
@@ -351,75 +410,97 @@ def aa_stratified(
     if classes is None:
         classes = np.unique(map)
 
+    # count samples per stratum, map class and reference class
+    accumulator = StratifiedConfusionMatrixAccumulator(len(h), len(classes))
+    accumulator.update(
+        lookupIndices(stratum, h, range(len(h)), len(h)),
+        lookupIndices(map, classes, range(len(classes)), len(classes)),
+        lookupIndices(reference, classes, range(len(classes)), len(classes))
+    )
+    counts = accumulator.counts[:-1]  # all samples are inside strata
+    return aa_stratified_counts(counts, N_h, classes)
+
+
+@typechecked
+def aa_stratified_counts(counts: np.ndarray, N_h: Iterable, classes: Iterable):
+    """Estimate accuracies and area proportions from the (stratum, map, reference) sample count tensor.
+
+    Map and reference axes may have one trailing extra entry, counting samples outside of all classes.
+    """
+    counts = np.array(counts, dtype=np.float64)
+    N_h = np.array(N_h, dtype=np.float64)
+    k = len(classes)
+
+    assert counts.ndim == 3
+    assert len(counts) == len(N_h)
+    assert counts.shape[1] in [k, k + 1] and counts.shape[2] in [k, k + 1]
+    n_h = counts.sum(axis=(1, 2))
+    assert np.all(n_h > 0), f'empty strata detected: {np.where(n_h == 0)[0].tolist()}'
+
     stats = defaultdict(list)
     stats['classes'] = list(classes)
 
+    diagonal = np.diagonal(counts[:, :k, :k], axis1=1, axis2=2)  # map == reference == class
+    mapTotals = counts[:, :k].sum(axis=2)  # map == class
+    referenceTotals = counts[:, :, :k].sum(axis=1)  # reference == class
+
     # adjusted confusion matrix area proportions (sums to 1).
-    cmp = np.zeros((len(classes), len(classes)))
-    for i in range(len(classes)):
-        for j in range(len(classes)):
-            y_u = np.logical_and(map == classes[i], reference == classes[j])
-            R, R_SE = aa_estimator_stratified(stratum, y_u, h, N_h)
-            cmp[i, j] = R
+    cmp, _ = aa_estimator_stratified(n_h, counts[:, :k, :k], N_h)
     stats['confusion_matrix_proportions'] = cmp.tolist()
 
     # adjusted confusion matrix counts
-    stats['confusion_matrix_counts'] = (cmp * len(reference)).tolist()
+    stats['confusion_matrix_counts'] = (cmp * np.sum(n_h)).tolist()
 
     # overall accuracy
-    oa, oa_se = aa_estimator_stratified(stratum, map == reference, h, N_h)
-    stats['overall_accuracy'] = oa
-    stats['overall_accuracy_se'] = oa_se
-
-    for i in range(len(classes)):
-        # area proportion
-        R, R_SE = aa_estimator_stratified(stratum, reference == classes[i], h, N_h)
-        stats['area_proportion'].append(R)
-        stats['area_proportion_se'].append(R_SE)
-
-        # user's accuracy
-        x_u = map == classes[i]
-        y_u = np.logical_and(reference == classes[i], map == classes[i])
-        ua, ua_se = aa_estimator_stratified_ratio(stratum, x_u, y_u, h, N_h)
-        stats['users_accuracy'].append(ua)
-        stats['users_accuracy_se'].append(ua_se)
-
-        # producer's accuracy
-        x_u = reference == classes[i]
-        y_u = np.logical_and(reference == classes[i], map == classes[i])
-        pa, pa_se = aa_estimator_stratified_ratio(stratum, x_u, y_u, h, N_h)
-        stats['producers_accuracy'].append(pa)
-        stats['producers_accuracy_se'].append(pa_se)
-
-        # f1
-        stats['f1'].append(2 * ua * pa / (ua + pa))
-        stats['f1_se'].append(np.sqrt(np.add(
+    oa, oa_se = aa_estimator_stratified(n_h, diagonal.sum(axis=1), N_h)
+    stats['overall_accuracy'] = float(oa)
+    stats['overall_accuracy_se'] = float(oa_se)
+
+    # area proportion
+    R, R_SE = aa_estimator_stratified(n_h, referenceTotals, N_h)
+    stats['area_proportion'] = R.tolist()
+    stats['area_proportion_se'] = R_SE.tolist()
+
+    # user's accuracy
+    ua, ua_se = aa_estimator_stratified_ratio(n_h, mapTotals, diagonal, diagonal, N_h)
+    stats['users_accuracy'] = ua.tolist()
+    stats['users_accuracy_se'] = ua_se.tolist()
+
+    # producer's accuracy
+    pa, pa_se = aa_estimator_stratified_ratio(n_h, referenceTotals, diagonal, diagonal, N_h)
+    stats['producers_accuracy'] = pa.tolist()
+    stats['producers_accuracy_se'] = pa_se.tolist()
+
+    # f1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stats['f1'] = (2 * ua * pa / (ua + pa)).tolist()
+        stats['f1_se'] = np.sqrt(np.add(
             (ua_se * (2 * pa / (ua + pa) - 2 * ua * pa / (ua + pa) ** 2)) ** 2,
             (pa_se * (2 * ua / (ua + pa) - 2 * ua * pa / (ua + pa) ** 2)) ** 2
-        )))
+        )).tolist()
 
     return stats
 
 
+def _perStratum(n_h: np.ndarray, values: np.ndarray) -> np.ndarray:
+    # reshape per-stratum vector for broadcasting against (stratum, ...) shaped sums
+    return n_h.reshape((-1,) + (1,) * (values.ndim - 1))
+
+
 @typechecked
 def aa_estimator_stratified(
-        stratum: np.ndarray, y_u: np.ndarray, h: np.ndarray, N_h: np.ndarray
-) -> Tuple[float, float]:
-    Y = 0.
-    n_h = np.zeros_like(N_h)
-    for i in range(len(h)):
-        indices = np.where(stratum == h[i])[0]
-        y_u_mean = np.mean(y_u[indices])
-        Y += N_h[i] * y_u_mean
-        n_h[i] = len(indices)
-    R = Y / np.sum(N_h)
-
-    R_VAR = 0.
-    for i in range(len(h)):
-        indices = np.where(stratum == h[i])[0]
-        f = (1. - n_h[i] / N_h[i])
-        s2yh = np.var(y_u[indices], ddof=1)
-        R_VAR += N_h[i] ** 2 * f * s2yh / n_h[i]
+        n_h: np.ndarray, y_h: np.ndarray, N_h: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Estimate a proportion from per-stratum sample sizes n_h and indicator sums y_h (first axis is stratum)."""
+    n = _perStratum(n_h, y_h)
+    N = _perStratum(N_h, y_h)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y_u_mean = y_h / n
+        R = np.sum(N * y_u_mean, axis=0) / np.sum(N_h)
+
+        f = (1. - n / N)
+        s2yh = (y_h - y_h * y_u_mean) / (n - 1)
+        R_VAR = np.sum(N ** 2 * f * s2yh / n, axis=0)
     R_VAR /= np.sum(N_h) ** 2
     R_SE = np.sqrt(R_VAR)
     return R, R_SE
@@ -427,29 +508,24 @@ def aa_estimator_stratified(
 
 @typechecked
 def aa_estimator_stratified_ratio(
-        stratum: np.ndarray, x_u: np.ndarray, y_u: np.ndarray, h: np.ndarray, N_h: np.ndarray
-) -> Tuple[float, float]:
-    X = 0.
-    Y = 0.
-    n_h = np.zeros_like(N_h)
-    for i in range(len(h)):
-        indices = np.where(stratum == h[i])[0]
-        x_u_mean = np.mean(x_u[indices])
-        y_u_mean = np.mean(y_u[indices])
-        Y += N_h[i] * y_u_mean
-        X += N_h[i] * x_u_mean
-        n_h[i] = len(indices)
-    R = Y / X
-
-    R_VAR = 0.
-    for i in range(len(h)):
-        indices = np.where(stratum == h[i])[0]
-        f = (1. - n_h[i] / N_h[i])
-        s2xh = np.var(x_u[indices], ddof=1)
-        s2yh = np.var(y_u[indices], ddof=1)
-        sxyh = np.cov(x_u[indices], y_u[indices], ddof=1)[0][1]
-        R_VAR += N_h[i] ** 2 * f * (s2yh + R ** 2 * s2xh - 2 * R * sxyh) / n_h[i]
-    R_VAR /= X ** 2
+        n_h: np.ndarray, x_h: np.ndarray, y_h: np.ndarray, xy_h: np.ndarray, N_h: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Estimate a ratio from per-stratum sample sizes n_h and indicator sums x_h, y_h and xy_h."""
+    n = _perStratum(n_h, y_h)
+    N = _perStratum(N_h, y_h)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_u_mean = x_h / n
+        y_u_mean = y_h / n
+        Y = np.sum(N * y_u_mean, axis=0)
+        X = np.sum(N * x_u_mean, axis=0)
+        R = Y / X
+
+        f = (1. - n / N)
+        s2xh = (x_h - x_h * x_u_mean) / (n - 1)
+        s2yh = (y_h - y_h * y_u_mean) / (n - 1)
+        sxyh = (xy_h - x_h * y_u_mean) / (n - 1)
+        R_VAR = np.sum(N ** 2 * f * (s2yh + R ** 2 * s2xh - 2 * R * sxyh) / n, axis=0)
+        R_VAR /= X ** 2
 
     R_VAR = abs(R_VAR)  # fixes an issue with floating-point accuracies that resulted in near zero, but negative values
 
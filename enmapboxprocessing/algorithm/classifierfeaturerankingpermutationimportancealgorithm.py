@@ -103,18 +103,18 @@ class ClassifierFeatureRankingPermutationImportanceAlgorithm(EnMAPProcessingAlgo
                 filenameTestSample = filenameTrainSample
             refit = filenameTrainSample != filenameClassifier
 
-            classifier = ClassifierDump(**Utils.pickleLoad(filenameClassifier)).classifier
+            classifier = ClassifierDump(**Utils.datasetLoad(filenameClassifier)).classifier
             feedback.pushInfo(f'Load classifier: {classifier}')
 
             if refit:
-                dump = ClassifierDump(**Utils.pickleLoad(filenameTrainSample))
+                dump = ClassifierDump(**Utils.datasetLoad(filenameTrainSample))
                 X, y, features = dump.X, dump.y, dump.features
                 feedback.pushInfo(f'Load training dataset: X=array{list(X.shape)} y=array{list(dump.y.shape)}')
                 feedback.pushInfo(f'Fit classifier')
                 classifier.fit(X, y)
 
             # load test sample
-            dump = ClassifierDump(**Utils.pickleLoad(filenameTestSample))
+            dump = ClassifierDump(**Utils.datasetLoad(filenameTestSample))
             X, y, features = dump.X, dump.y, dump.features
             feedback.pushInfo(f'Load test dataset: X=array{list(X.shape)} y=array{list(dump.y.shape)}')
 
@@ -60,8 +60,8 @@ class ClassifierPerformanceAlgorithm(EnMAPProcessingAlgorithm):
             feedback, feedback2 = self.createLoggingFeedback(feedback, logfile)
             self.tic(feedback, parameters, context)
 
-            classifier = ClassifierDump(**Utils.pickleLoad(filenameClassifier)).classifier
-            sample = ClassifierDump(**Utils.pickleLoad(filenameSample))
+            classifier = ClassifierDump(**Utils.datasetLoad(filenameClassifier)).classifier
+            sample = ClassifierDump(**Utils.datasetLoad(filenameSample))
             feedback.pushInfo(f'Load classifier: {classifier}')
             feedback.pushInfo(f'Load sample data: X{list(sample.X.shape)} y{list(sample.y.shape)}')
 
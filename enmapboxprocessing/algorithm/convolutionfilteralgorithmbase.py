@@ -1,13 +1,15 @@
 import inspect
 import traceback
-from math import ceil
 from typing import Dict, Any, List, Tuple
 
 import numpy as np
 from qgis._core import (QgsProcessingContext, QgsProcessingFeedback, Qgis)
 
+from enmapboxprocessing.blockexecutor import BlockExecutor
 from enmapboxprocessing.driver import Driver
 from enmapboxprocessing.enmapalgorithm import EnMAPProcessingAlgorithm, Group
+from enmapboxprocessing.kernelconvolver import KernelConvolver
+from enmapboxprocessing.rasterblockinfo import RasterBlockInfo
 from enmapboxprocessing.rasterreader import RasterReader
 from enmapboxprocessing.utils import Utils
 from typeguard import typechecked
@@ -19,6 +21,7 @@ class ConvolutionFilterAlgorithmBase(EnMAPProcessingAlgorithm):
     P_KERNEL, _KERNEL = 'kernel', 'Kernel'
     P_NORMALIZE, _NORMALIZE = 'normalize', 'Normalize kernel'
     P_INTERPOLATE, _INTERPOLATE = 'interpolate', 'Interpolate no data pixel'
+    P_NUMBER_OF_WORKERS, _NUMBER_OF_WORKERS = 'numberOfWorkers', 'Number of workers'
     P_OUTPUT_RASTER, _OUTPUT_RASTER = 'outputRaster', 'Output raster layer'
 
     def helpParameters(self) -> List[Tuple[str, str]]:
@@ -29,6 +32,7 @@ class ConvolutionFilterAlgorithmBase(EnMAPProcessingAlgorithm):
             (self._INTERPOLATE, 'Whether to interpolate no data pixel. '
                                       'Will result in renormalization of the kernel at each position ignoring '
                                       'pixels with no data values.'),
+            (self._NUMBER_OF_WORKERS, self.NumberOfWorkers),
             (self._OUTPUT_RASTER, self.RasterFileDestination)
         ]
 
@@ -52,6 +56,7 @@ class ConvolutionFilterAlgorithmBase(EnMAPProcessingAlgorithm):
         self.addParameterCode(self.P_KERNEL, self._KERNEL, self.defaultCodeAsString())
         self.addParameterBoolean(self.P_NORMALIZE, self._NORMALIZE, False, False, True)
         self.addParameterBoolean(self.P_INTERPOLATE, self._INTERPOLATE, True, False, True)
+        self.addParameterNumberOfWorkers(self.P_NUMBER_OF_WORKERS, self._NUMBER_OF_WORKERS)
         self.addParameterRasterDestination(self.P_OUTPUT_RASTER, self._OUTPUT_RASTER)
 
     def defaultCodeAsString(self):
@@ -89,16 +94,14 @@ class ConvolutionFilterAlgorithmBase(EnMAPProcessingAlgorithm):
         raster = self.parameterAsRasterLayer(parameters, self.P_RASTER, context)
         kernel = self.parameterAsKernel(parameters, self.P_KERNEL, context)
         normalize_kernel = self.parameterAsBoolean(parameters, self.P_NORMALIZE, context)
-        if self.parameterAsBoolean(parameters, self.P_INTERPOLATE, context):
-            nan_treatment = 'interpolate'
-        else:
-            nan_treatment = 'fill'
+        interpolate = self.parameterAsBoolean(parameters, self.P_INTERPOLATE, context)
+        numberOfWorkers = self.parameterAsNumberOfWorkers(parameters, self.P_NUMBER_OF_WORKERS, context)
         filename = self.parameterAsOutputLayer(parameters, self.P_OUTPUT_RASTER, context)
         format, options = self.GTiffFormat, self.DefaultGTiffCreationOptions
         maximumMemoryUsage = Utils.maximumMemoryUsage()
 
         with open(filename + '.log', 'w') as logfile:
-            from astropy.convolution import convolve, CustomKernel
+            from astropy.convolution import CustomKernel
             feedback, feedback2 = self.createLoggingFeedback(feedback, logfile)
             self.tic(feedback, parameters, context)
 
@@ -112,26 +115,39 @@ class ConvolutionFilterAlgorithmBase(EnMAPProcessingAlgorithm):
 
             zsize, ysize, xsize = kernel.shape
             overlap = int((max(ysize, xsize) + 1) / 2.)
+            convolver = KernelConvolver(kernel.array, normalize_kernel, interpolate)
+            feedback.pushInfo(f'Convolution backend: {convolver.backend}')
 
             feedback.pushInfo('Convolve raster')
             rasterReader = RasterReader(raster)
             writer = Driver(filename, format, options, feedback).createLike(rasterReader, Qgis.Float32)
-            lineMemoryUsage = rasterReader.lineMemoryUsage(dataTypeSize=Qgis.Float32)
-            lineMemoryUsage *= 2  # output has same size
-            blockSizeY = min(raster.height(), ceil(maximumMemoryUsage / lineMemoryUsage))
-            blockSizeX = raster.width()
-            for block in rasterReader.walkGrid(blockSizeX, blockSizeY, feedback):
+            executor = BlockExecutor(numberOfWorkers)
+            pixelMemoryUsage = rasterReader.pixelMemoryUsage()  # input block
+            pixelMemoryUsage += rasterReader.pixelMemoryUsage(dataTypeSize=1)  # mask
+            pixelMemoryUsage += rasterReader.pixelMemoryUsage(dataTypeSize=8) * 3  # float64 working copies
+            pixelMemoryUsage += rasterReader.pixelMemoryUsage(dataTypeSize=8)  # output block
+            pixelMemoryUsage *= executor.blocksInFlight()
+            blockSizeX, blockSizeY = rasterReader.planBlockSize(pixelMemoryUsage, maximumMemoryUsage)
+            noDataValue = float(np.finfo(np.float32).min)
+
+            def read(block: RasterBlockInfo):
                 feedback.setProgress(block.yOffset / rasterReader.height() * 100)
                 array = rasterReader.arrayFromBlock(block, overlap=overlap)
                 mask = rasterReader.maskArray(array)
-                outarray = convolve(
-                    array, kernel, fill_value=np.nan, nan_treatment=nan_treatment,
-                    normalize_kernel=normalize_kernel, mask=np.logical_not(mask)
-                )
-                noDataValue = float(np.finfo(np.float32).min)
+                return array, mask
+
+            def compute(block: RasterBlockInfo, data):
+                array, mask = data
+                outarray = convolver.convolve(array, mask)
                 outarray[np.isnan(outarray)] = noDataValue
+                return outarray
+
+            def write(block: RasterBlockInfo, outarray):
                 writer.writeArray(outarray, block.xOffset, block.yOffset, overlap=overlap)
 
+            blocks = rasterReader.walkGrid(blockSizeX, blockSizeY, feedback)
+            executor.run(blocks, read, compute, write)
+
             writer.setMetadata(rasterReader.metadata())
             writer.setNoDataValue(noDataValue)
             for i in range(rasterReader.bandCount()):
@@ -66,7 +66,7 @@ class FeatureClusteringHierarchicalAlgorithm(EnMAPProcessingAlgorithm):
             feedback, feedback2 = self.createLoggingFeedback(feedback, logfile)
             self.tic(feedback, parameters, context)
 
-            dump = Utils.pickleLoad(filenameDataset)
+            dump = Utils.datasetLoad(filenameDataset)
             X = dump['X']
             features = dump['features']
             feedback.pushInfo(f'Load feature data: X{list(X.shape)}')
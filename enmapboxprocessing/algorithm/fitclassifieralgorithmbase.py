@@ -81,7 +81,7 @@ class FitClassifierAlgorithmBase(EnMAPProcessingAlgorithm):
             self.tic(feedback, parameters, context)
 
             if filenameDataset is not None:
-                dump = ClassifierDump(**Utils.pickleLoad(filenameDataset))
+                dump = ClassifierDump(**Utils.datasetLoad(filenameDataset))
                 feedback.pushInfo(
                     f'Load training dataset: X=array{list(dump.X.shape)} y=array{list(dump.y.shape)} categories={[c.name for c in dump.categories]}')
                 feedback.pushInfo('Fit classifier')
@@ -91,7 +91,7 @@ class FitClassifierAlgorithmBase(EnMAPProcessingAlgorithm):
                 dump = ClassifierDump(None, None, None, None, classifier)
 
             dump = dump.withClassifier(classifier=classifier)
-            Utils.pickleDump(dump.__dict__, filename)
+            Utils.datasetDump(dump.__dict__, filename)
 
             result = {self.P_OUTPUT_CLASSIFIER: filename}
             self.toc(feedback, result)
@@ -1,4 +1,3 @@
-from math import ceil
 from typing import Dict, Any, List, Tuple
 
 import numpy as np
@@ -7,8 +6,11 @@ from qgis._core import (QgsProcessingContext, QgsProcessingFeedback, QgsRasterLa
                         QgsProcessingException, QgsMapLayer)
 
 from enmapboxprocessing.algorithm.layertomaskalgorithm import LayerToMaskAlgorithm
+from enmapboxprocessing.batchpredictor import BatchPredictor
+from enmapboxprocessing.blockexecutor import BlockExecutor
 from enmapboxprocessing.driver import Driver
 from enmapboxprocessing.enmapalgorithm import EnMAPProcessingAlgorithm, Group
+from enmapboxprocessing.rasterblockinfo import RasterBlockInfo
 from enmapboxprocessing.rasterreader import RasterReader
 from enmapboxprocessing.typing import ClassifierDump
 from enmapboxprocessing.utils import Utils
@@ -20,6 +22,7 @@ class PredictClassificationAlgorithm(EnMAPProcessingAlgorithm):
     P_RASTER, _RASTER = 'raster', 'Raster layer with features'
     P_CLASSIFIER, _CLASSIFIER = 'classifier', 'Classifier'
     P_MASK, _MASK = 'mask', 'Mask layer'
+    P_NUMBER_OF_WORKERS, _NUMBER_OF_WORKERS = 'numberOfWorkers', 'Number of workers'
     P_OUTPUT_CLASSIFICATION, _OUTPUT_CLASSIFICATION = 'outputClassification', 'Output classification layer'
 
     def displayName(self) -> str:
@@ -41,6 +44,7 @@ class PredictClassificationAlgorithm(EnMAPProcessingAlgorithm):
                            'but overall number of bands and features do match, raster bands are used in original order.'),
             (self._CLASSIFIER, 'A fitted classifier.'),
             (self._MASK, 'A mask layer.'),
+            (self._NUMBER_OF_WORKERS, self.NumberOfWorkers),
             (self._OUTPUT_CLASSIFICATION, self.RasterFileDestination)
         ]
 
@@ -51,11 +55,13 @@ class PredictClassificationAlgorithm(EnMAPProcessingAlgorithm):
         self.addParameterRasterLayer(self.P_RASTER, self._RASTER)
         self.addParameterMapLayer(self.P_MASK, self._MASK, optional=True, advanced=True)
         self.addParameterFile(self.P_CLASSIFIER, self._CLASSIFIER, fileFilter='Model file (*.pkl)')
+        self.addParameterNumberOfWorkers(self.P_NUMBER_OF_WORKERS, self._NUMBER_OF_WORKERS)
         self.addParameterRasterDestination(self.P_OUTPUT_CLASSIFICATION, self._OUTPUT_CLASSIFICATION)
 
     def checkParameterValues(self, parameters: Dict[str, Any], context: QgsProcessingContext) -> Tuple[bool, str]:
         try:
-            ClassifierDump(**Utils.pickleLoad(self.parameterAsFile(parameters, self.P_CLASSIFIER, context)))
+            ClassifierDump(**Utils.datasetLoad(
+                self.parameterAsFile(parameters, self.P_CLASSIFIER, context), mmap=True))
         except TypeError:
             return False, 'Invalid classifier file.'
         return True, ''
@@ -65,8 +71,10 @@ class PredictClassificationAlgorithm(EnMAPProcessingAlgorithm):
     ) -> Dict[str, Any]:
         raster = self.parameterAsRasterLayer(parameters, self.P_RASTER, context)
         mask = self.parameterAsLayer(parameters, self.P_MASK, context)
-        dump = ClassifierDump(**Utils.pickleLoad(self.parameterAsFile(parameters, self.P_CLASSIFIER, context)))
+        dump = ClassifierDump(**Utils.datasetLoad(
+            self.parameterAsFile(parameters, self.P_CLASSIFIER, context), mmap=True))
         format, options = self.GTiffFormat, self.DefaultGTiffCreationOptions
+        numberOfWorkers = self.parameterAsNumberOfWorkers(parameters, self.P_NUMBER_OF_WORKERS, context)
         filename = self.parameterAsOutputLayer(parameters, self.P_OUTPUT_CLASSIFICATION, context)
         maximumMemoryUsage = Utils.maximumMemoryUsage()
 
@@ -105,23 +113,36 @@ class PredictClassificationAlgorithm(EnMAPProcessingAlgorithm):
                 maskReader = RasterReader(mask)
             dataType = Utils.smallesUIntDataType(max([c.value for c in dump.categories]))
             writer = Driver(filename, format, options, feedback).createLike(rasterReader, dataType, 1)
-            lineMemoryUsage = rasterReader.lineMemoryUsage()
-            blockSizeY = min(raster.height(), ceil(maximumMemoryUsage / lineMemoryUsage))
-            blockSizeX = raster.width()
-            for block in rasterReader.walkGrid(blockSizeX, blockSizeY, feedback):
+            executor = BlockExecutor(numberOfWorkers)
+            nFeatures = len(dump.features)
+            pixelMemoryUsage = rasterReader.pixelMemoryUsage(nFeatures)  # input block
+            pixelMemoryUsage += nFeatures  # mask
+            pixelMemoryUsage += nFeatures * 8  # sample buffer
+            pixelMemoryUsage += Utils.qgisDataTypeToNumpyDataType(dataType)().itemsize  # output block
+            pixelMemoryUsage *= executor.blocksInFlight()
+            predictor = BatchPredictor(dump.classifier)
+            blockSizeX, blockSizeY = rasterReader.planBlockSize(pixelMemoryUsage, maximumMemoryUsage)
+
+            def read(block: RasterBlockInfo):
                 arrayX = rasterReader.arrayFromBlock(block, bandList)
-                valid = np.all(rasterReader.maskArray(arrayX, bandList), axis=0)
+                valid = rasterReader.maskArray2d(arrayX, bandList)
                 if mask is not None:
                     marray = maskReader.arrayFromBlock(block)
                     np.logical_and(valid, maskReader.maskArray(marray, defaultNoDataValue=0.)[0], out=valid)
-                X = list()
-                for a in arrayX:
-                    X.append(a[valid])
-                y = dump.classifier.predict(np.transpose(X))
+                return arrayX, valid
+
+            def compute(block: RasterBlockInfo, data):
+                arrayX, valid = data
                 arrayY = np.zeros_like(valid, Utils.qgisDataTypeToNumpyDataType(dataType))
-                arrayY[valid] = y
+                predictor.predict(arrayX, valid, arrayY)
+                return arrayY
+
+            def write(block: RasterBlockInfo, arrayY):
                 writer.writeArray2d(arrayY, 1, xOffset=block.xOffset, yOffset=block.yOffset)
 
+            blocks = rasterReader.walkGrid(blockSizeX, blockSizeY, feedback)
+            executor.run(blocks, read, compute, write)
+
             writer.close()
             outraster = QgsRasterLayer(filename)
             renderer = Utils.palettedRasterRendererFromCategories(outraster.dataProvider(), 1, dump.categories)
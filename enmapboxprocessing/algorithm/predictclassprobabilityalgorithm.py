@@ -1,4 +1,3 @@
-from math import ceil
 from typing import Dict, Any, List, Tuple
 
 import numpy as np
@@ -7,10 +6,13 @@ from qgis._core import (QgsProcessingContext, QgsProcessingFeedback, QgsVectorLa
                         Qgis, QgsProcessingException, QgsMapLayer)
 
 from enmapboxprocessing.algorithm.layertomaskalgorithm import LayerToMaskAlgorithm
+from enmapboxprocessing.batchpredictor import BatchPredictor
 from enmapboxprocessing.algorithm.rasterizevectoralgorithm import RasterizeVectorAlgorithm
 from enmapboxprocessing.algorithm.translaterasteralgorithm import TranslateRasterAlgorithm
+from enmapboxprocessing.blockexecutor import BlockExecutor
 from enmapboxprocessing.driver import Driver
 from enmapboxprocessing.enmapalgorithm import EnMAPProcessingAlgorithm, Group
+from enmapboxprocessing.rasterblockinfo import RasterBlockInfo
 from enmapboxprocessing.rasterreader import RasterReader
 from enmapboxprocessing.typing import ClassifierDump
 from enmapboxprocessing.utils import Utils
@@ -22,6 +24,7 @@ class PredictClassPropabilityAlgorithm(EnMAPProcessingAlgorithm):
     P_RASTER, _RASTER = 'raster', 'Raster layer with features'
     P_CLASSIFIER, _CLASSIFIER = 'classifier', 'Classifier'
     P_MASK, _MASK = 'mask', 'Mask layer'
+    P_NUMBER_OF_WORKERS, _NUMBER_OF_WORKERS = 'numberOfWorkers', 'Number of workers'
     P_OUTPUT_PROBABILITY, _OUTPUT_PROBABILITY = 'outputProbability', 'Output class probability layer'
 
     def displayName(self) -> str:
@@ -36,6 +39,7 @@ class PredictClassPropabilityAlgorithm(EnMAPProcessingAlgorithm):
                            'Classifier features and raster bands are matched by name.'),
             (self._CLASSIFIER, 'A fitted classifier.'),
             (self._MASK, 'A mask layer.'),
+            (self._NUMBER_OF_WORKERS, self.NumberOfWorkers),
             (self._OUTPUT_PROBABILITY, self.RasterFileDestination)
         ]
 
@@ -46,11 +50,13 @@ class PredictClassPropabilityAlgorithm(EnMAPProcessingAlgorithm):
         self.addParameterRasterLayer(self.P_RASTER, self._RASTER)
         self.addParameterFile(self.P_CLASSIFIER, self._CLASSIFIER, fileFilter='Model file (*.pkl)')
         self.addParameterMapLayer(self.P_MASK, self._MASK, optional=True, advanced=True)
+        self.addParameterNumberOfWorkers(self.P_NUMBER_OF_WORKERS, self._NUMBER_OF_WORKERS)
         self.addParameterRasterDestination(self.P_OUTPUT_PROBABILITY, self._OUTPUT_PROBABILITY)
 
     def checkParameterValues(self, parameters: Dict[str, Any], context: QgsProcessingContext) -> Tuple[bool, str]:
         try:
-            dump = ClassifierDump(**Utils.pickleLoad(self.parameterAsFile(parameters, self.P_CLASSIFIER, context)))
+            dump = ClassifierDump(**Utils.datasetLoad(
+                self.parameterAsFile(parameters, self.P_CLASSIFIER, context), mmap=True))
         except TypeError:
             return False, 'Invalid classifier file.'
         if not hasattr(dump.classifier, 'predict_proba'):
@@ -62,8 +68,10 @@ class PredictClassPropabilityAlgorithm(EnMAPProcessingAlgorithm):
     ) -> Dict[str, Any]:
         raster = self.parameterAsRasterLayer(parameters, self.P_RASTER, context)
         mask = self.parameterAsLayer(parameters, self.P_MASK, context)
-        dump = ClassifierDump(**Utils.pickleLoad(self.parameterAsFile(parameters, self.P_CLASSIFIER, context)))
+        dump = ClassifierDump(**Utils.datasetLoad(
+            self.parameterAsFile(parameters, self.P_CLASSIFIER, context), mmap=True))
         format, options = self.GTiffFormat, self.DefaultGTiffCreationOptions
+        numberOfWorkers = self.parameterAsNumberOfWorkers(parameters, self.P_NUMBER_OF_WORKERS, context)
         filename = self.parameterAsOutputLayer(parameters, self.P_OUTPUT_PROBABILITY, context)
         maximumMemoryUsage = gdal.GetCacheMax()
 
@@ -103,23 +111,35 @@ class PredictClassPropabilityAlgorithm(EnMAPProcessingAlgorithm):
             dataType = Qgis.Float32
             gdalDataType = Utils.qgisDataTypeToNumpyDataType(dataType)
             writer = Driver(filename, format, options, feedback).createLike(rasterReader, dataType, nBands)
-            lineMemoryUsage = rasterReader.lineMemoryUsage() + rasterReader.lineMemoryUsage(nBands, 32 // 4)
-            blockSizeY = min(raster.height(), ceil(maximumMemoryUsage / lineMemoryUsage))
-            blockSizeX = raster.width()
-            for block in rasterReader.walkGrid(blockSizeX, blockSizeY, feedback):
+            executor = BlockExecutor(numberOfWorkers)
+            nFeatures = len(dump.features)
+            pixelMemoryUsage = rasterReader.pixelMemoryUsage(nFeatures)  # input block
+            pixelMemoryUsage += nFeatures  # mask
+            pixelMemoryUsage += nFeatures * 8  # sample buffer
+            pixelMemoryUsage += nBands * 4  # output block, probabilities are predicted in chunks
+            pixelMemoryUsage *= executor.blocksInFlight()
+            predictor = BatchPredictor(dump.classifier)
+            blockSizeX, blockSizeY = rasterReader.planBlockSize(pixelMemoryUsage, maximumMemoryUsage)
+
+            def read(block: RasterBlockInfo):
                 arrayX = rasterReader.arrayFromBlock(block, bandList)
-                valid = np.all(rasterReader.maskArray(arrayX, bandList), axis=0)
+                valid = rasterReader.maskArray2d(arrayX, bandList)
                 if mask is not None:
                     marray = maskReader.arrayFromBlock(block)
                     np.logical_and(valid, maskReader.maskArray(marray, defaultNoDataValue=0.)[0], out=valid)
-                X = list()
-                for a in arrayX:
-                    X.append(a[valid])
-                y = dump.classifier.predict_proba(np.transpose(X))
+                return arrayX, valid
+
+            def compute(block: RasterBlockInfo, data):
+                arrayX, valid = data
                 arrayY = np.full((nBands, *valid.shape), -1, gdalDataType)
-                for i, aY in enumerate(arrayY):
-                    aY[valid] = y[:, i]
-                    writer.writeArray2d(aY, i + 1, xOffset=block.xOffset, yOffset=block.yOffset)
+                predictor.predictProba(arrayX, valid, arrayY)
+                return arrayY
+
+            def write(block: RasterBlockInfo, arrayY):
+                writer.writeArray(arrayY, xOffset=block.xOffset, yOffset=block.yOffset)
+
+            blocks = rasterReader.walkGrid(blockSizeX, blockSizeY, feedback)
+            executor.run(blocks, read, compute, write)
 
             for bandNo, c in enumerate(dump.categories, 1):
                 writer.setBandName(c.name, bandNo)
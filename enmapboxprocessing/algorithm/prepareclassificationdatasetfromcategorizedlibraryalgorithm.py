@@ -137,7 +137,7 @@ class PrepareClassificationDatasetFromCategorizedLibraryAlgorithm(EnMAPProcessin
             features = [f'Band {i + 1}' for i in range(X.shape[1])]
             dump = ClassifierDump(categories=categories, features=features, X=X, y=y)
             dumpDict = dump.__dict__
-            Utils.pickleDump(dumpDict, filename)
+            Utils.datasetDump(dumpDict, filename)
 
             result = {self.P_OUTPUT_DATASET: filename}
             self.toc(feedback, result)
@@ -113,7 +113,7 @@ class PrepareClassificationDatasetFromCategorizedRasterAlgorithm(EnMAPProcessing
 
             dump = ClassifierDump(categories=categories, features=features, X=X, y=y)
             dumpDict = dump.__dict__
-            Utils.pickleDump(dumpDict, filename)
+            Utils.datasetDump(dumpDict, filename)
 
             result = {self.P_OUTPUT_DATASET: filename}
             self.toc(feedback, result)
@@ -131,26 +131,55 @@ class PrepareClassificationDatasetFromCategorizedRasterAlgorithm(EnMAPProcessing
         maximumMemoryUsage = gdal.GetCacheMax()
         rasterReader = RasterReader(raster)
         classificationReader = RasterReader(classification)
-        lineMemoryUsage = rasterReader.lineMemoryUsage(1)
-        lineMemoryUsage += classificationReader.width() * classificationReader.dataTypeSize()
+
+        # first pass: find labeled pixel locations by scanning the class band only
+        lineMemoryUsage = classificationReader.lineMemoryUsage(1) * 2
         blockSizeY = min(raster.height(), ceil(maximumMemoryUsage / lineMemoryUsage))
         blockSizeX = raster.width()
-
-        X = list()
+        values = [c.value for c in categories]
+        rows = list()
+        cols = list()
         y = list()
-        for block in rasterReader.walkGrid(blockSizeX, blockSizeY, feedback):
+        for block in classificationReader.walkGrid(blockSizeX, blockSizeY, feedback):
             blockClassification = classificationReader.arrayFromBlock(block, [classBandNo])[0]
-            labeled = np.full_like(blockClassification, False, bool)
-            for c in categories:
-                np.logical_or(labeled, blockClassification == c.value, out=labeled)
-            blockY = blockClassification[labeled]
-            blockX = list()
-            for bandNo in range(1, rasterReader.bandCount() + 1):
-                blockBand = rasterReader.arrayFromBlock(block, [bandNo])[0]
-                blockX.append(blockBand[labeled])
-            X.append(blockX)
-            y.append(blockY)
-        X = np.concatenate(X, axis=1).T
+            labeled = np.isin(blockClassification, values)
+            blockRows, blockCols = np.nonzero(labeled)
+            rows.append(blockRows + block.yOffset)
+            cols.append(blockCols + block.xOffset)
+            y.append(blockClassification[labeled])
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
         y = np.expand_dims(np.concatenate(y), 1)
+
+        # second pass: read all bands at once, but only for windows covering runs of labeled rows
+        lineMemoryUsage = rasterReader.lineMemoryUsage()
+        maximumStripHeight = max(1, maximumMemoryUsage // lineMemoryUsage)
+        X = list()
+        uniqueRows, starts = np.unique(rows, return_index=True)  # rows are sorted, so labels are grouped by row
+        stops = np.append(starts[1:], len(rows))
+        i = 0
+        while i < len(uniqueRows):
+            # extend the strip as long as rows are adjacent and the strip fits into memory
+            j = i + 1
+            while j < len(uniqueRows) and uniqueRows[j] == uniqueRows[j - 1] + 1 \
+                    and uniqueRows[j] - uniqueRows[i] < maximumStripHeight:
+                j += 1
+            stripRows = rows[starts[i]:stops[j - 1]]
+            stripCols = cols[starts[i]:stops[j - 1]]
+            xOffset = int(stripCols.min())
+            yOffset = int(uniqueRows[i])
+            width = int(stripCols.max()) - xOffset + 1
+            height = int(uniqueRows[j - 1]) - yOffset + 1
+            array = np.array(rasterReader.arrayFromPixelOffsetAndSize(xOffset, yOffset, width, height))
+            X.append(array[:, stripRows - yOffset, stripCols - xOffset])
+            if feedback is not None:
+                feedback.setProgress(j / len(uniqueRows) * 100)
+            i = j
+
+        if len(X) == 0:
+            dtype = Utils.qgisDataTypeToNumpyDataType(rasterReader.dataType())
+            X = np.zeros((0, rasterReader.bandCount()), dtype=dtype)
+        else:
+            X = np.concatenate(X, axis=1).T
         checkSampleShape(X, y)
         return X, y
@@ -127,7 +127,7 @@ class PrepareClassificationDatasetFromCategorizedVectorAlgorithm(EnMAPProcessing
             dump = ClassifierDump(categories=categories, features=features, X=X, y=y)
             dumpDict = dump.__dict__
 
-            Utils.pickleDump(dumpDict, filename)
+            Utils.datasetDump(dumpDict, filename)
 
             result = {self.P_OUTPUT_DATASET: filename}
             self.toc(feedback, result)
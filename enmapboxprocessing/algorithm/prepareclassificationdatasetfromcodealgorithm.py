@@ -88,7 +88,7 @@ class PrepareClassificationDatasetFromCodeAlgorithm(EnMAPProcessingAlgorithm):
             self.tic(feedback, parameters, context)
 
             classifierDump = self.parameterAsClassifierDump(parameters, self.P_CODE, context)
-            Utils.pickleDump(classifierDump.__dict__, filename)
+            Utils.datasetDump(classifierDump.__dict__, filename)
 
             result = {self.P_OUTPUT_DATASET: filename}
             self.toc(feedback, result)
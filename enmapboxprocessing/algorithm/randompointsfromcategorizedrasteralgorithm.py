@@ -1,3 +1,4 @@
+from collections import defaultdict
 from math import ceil
 from typing import Dict, Any, List, Tuple
 
@@ -100,62 +101,27 @@ class RandomPointsFromCategorizedRasterAlgorithm(EnMAPProcessingAlgorithm):
             yres = stratification.rasterUnitsPerPixelY()
             kernelGlobal = self.makeKernel(xres, yres, distanceGlobal)
             kernelStratum = self.makeKernel(xres, yres, distanceStratum)
-            kernelGlobalY1, kernelGlobalX1 = [-(v - 1) // 2 for v in kernelGlobal.shape]
-            kernelGlobalY2, kernelGlobalX2 = [(v + 1) // 2 for v in kernelGlobal.shape]
-            kernelStratumY1, kernelStratumX1 = [-(v - 1) // 2 for v in kernelStratum.shape]
-            kernelStratumY2, kernelStratumX2 = [(v + 1) // 2 for v in kernelStratum.shape]
-
-            # create a binary mask for each strata (add extra border for convinient kernel masking)
-            xsize = stratification.width()
-            ysize = stratification.height()
-            yborder1, xborder1 = [(v - 1) // 2 for v in kernelGlobal.shape]
-            yborder2, xborder2 = [(v - 1) // 2 for v in kernelStratum.shape]
-            yborder, xborder = max(yborder1, yborder2), max(xborder1, xborder2)
-            noData = min(-9999, np.min([c.value for c in categories]) - 1)
-            arrayStrata = np.full((ysize + 2 * yborder, xsize + 2 * xborder), noData)
-            arrayStrata[yborder: yborder + ysize, xborder: xborder + xsize] = \
-                RasterReader(stratification).array(bandList=[stratification.renderer().band()])[0]
-            ysize2, xsize2 = arrayStrata.shape
 
-            masks = list()
-            for category in categories:
-                mask = (arrayStrata == category.value).astype(np.uint8)
-                masks.append(mask)
-            arrayStrata[:] = noData
+            noData = min(-9999, np.min([c.value for c in categories]) - 1)
+            arrayStrata = RasterReader(stratification).array(bandList=[stratification.renderer().band()])[0]
+            values = [c.value for c in categories]
 
             # draw points
-            # - for each strata
-            for mask, n, category in zip(masks, N, categories):
-                for i in range(n):
-                    # - draw single pixel
-                    indices = np.where(mask.flat)[0]
-                    if len(indices) == 0:
-                        feedback.pushInfo(
-                            f"Could only draw {i + 1} points ({n} requested) for category '{category.name}'."
-                        )
-                        break  # no pixel left
-                    if len(indices) == 1:
-                        index = indices[0]
-                    else:
-                        index = indices[np.random.randint(0, len(indices) - 1, 1)[0]]
-                    x = index % xsize2
-                    y = index // xsize2
-
-                    # save point
-                    arrayStrata[y, x] = category.value
-
-                    # apply mask kernel
-                    mask[y + kernelStratumY1:y + kernelStratumY2,
-                    x + kernelStratumX1:x + kernelStratumX2] *= kernelStratum
-                    for m in masks:
-                        m[y + kernelGlobalY1:y + kernelGlobalY2, x + kernelGlobalX1:x + kernelGlobalX2] *= kernelGlobal
-
-            # cut off border and store as raster
-            arrayStrata = [arrayStrata[yborder: yborder + ysize, xborder: xborder + xsize]]
+            indicesList = self.drawPixels(arrayStrata, values, N, kernelGlobal, kernelStratum, feedback)
+            for indices, n, category in zip(indicesList, N, categories):
+                if len(indices) < n:
+                    feedback.pushInfo(
+                        f"Could only draw {len(indices)} points ({n} requested) for category '{category.name}'."
+                    )
+
+            # store as raster
+            arraySample = np.full(arrayStrata.shape, noData)
+            for indices, value in zip(indicesList, values):
+                arraySample.flat[indices] = value
             driver = Driver(Utils.tmpFilename(
                 filename, 'sample.tif'), self.GTiffFormat, self.DefaultGTiffCreationOptions
             )
-            writer = driver.createFromArray(arrayStrata, stratification.extent(), stratification.crs())
+            writer = driver.createFromArray([arraySample], stratification.extent(), stratification.crs())
             writer.setNoDataValue(noData)
             writer.close()
 
@@ -172,6 +138,42 @@ class RandomPointsFromCategorizedRasterAlgorithm(EnMAPProcessingAlgorithm):
             self.toc(feedback, result)
         return result
 
+    @classmethod
+    def drawPixels(
+            cls, arrayStrata: np.ndarray, values: List[int], N: List[int], kernelGlobal: np.ndarray,
+            kernelStratum: np.ndarray, feedback: QgsProcessingFeedback = None
+    ) -> List[np.ndarray]:
+        """Return flat indices of random pixels drawn for each category value.
+
+        Candidate pixels are extracted and shuffled once per category and consumed in order.
+        A candidate is rejected, if it lies inside the distance kernel of a point drawn before.
+        Drawn points are kept in grid buckets, so that each candidate is only checked against nearby points.
+        """
+        xsize = arrayStrata.shape[1]
+        bucketsGlobal = PixelBuckets(kernelGlobal)
+        indicesList = list()
+        for i, (value, n) in enumerate(zip(values, N)):
+            if feedback is not None:
+                feedback.setProgress(i / len(values) * 100)
+            candidates = np.flatnonzero(arrayStrata == value)
+            np.random.shuffle(candidates)
+            bucketsStratum = PixelBuckets(kernelStratum)
+            if bucketsGlobal.isTrivial() and bucketsStratum.isTrivial():
+                indicesList.append(candidates[:n])
+                continue
+            indices = list()
+            for index in candidates.tolist():
+                if len(indices) == n:
+                    break
+                y, x = divmod(index, xsize)
+                if bucketsGlobal.isExcluded(y, x) or bucketsStratum.isExcluded(y, x):
+                    continue
+                indices.append(index)
+                bucketsGlobal.add(y, x)
+                bucketsStratum.add(y, x)
+            indicesList.append(np.array(indices, dtype=np.int64))
+        return indicesList
+
     @classmethod
     def makeKernel(cls, xres: float, yres: float, radius: float) -> np.ndarray:
         nx = ceil((radius - xres / 2) / xres) * 2 + 1
@@ -183,3 +185,35 @@ class RandomPointsFromCategorizedRasterAlgorithm(EnMAPProcessingAlgorithm):
                 kernel[yi, xi] = (x ** 2 + y ** 2) ** 0.5 > radius
 
         return kernel.astype(np.uint8)
+
+
+class PixelBuckets(object):
+    """Drawn pixel locations, bucketed into grid cells of the size of the distance kernel radius."""
+
+    def __init__(self, kernel: np.ndarray):
+        self.kernel = kernel
+        self.ky, self.kx = [(v - 1) // 2 for v in kernel.shape]
+        self.cellSizeY = max(1, self.ky)
+        self.cellSizeX = max(1, self.kx)
+        self.buckets: Dict[Tuple[int, int], List[Tuple[int, int]]] = defaultdict(list)
+
+    def isTrivial(self) -> bool:
+        # a single pixel kernel only excludes the drawn pixel itself
+        return self.ky == 0 and self.kx == 0
+
+    def isExcluded(self, y: int, x: int) -> bool:
+        if self.isTrivial():
+            return False
+        cellY = y // self.cellSizeY
+        cellX = x // self.cellSizeX
+        for bucketY in (cellY - 1, cellY, cellY + 1):
+            for bucketX in (cellX - 1, cellX, cellX + 1):
+                for y2, x2 in self.buckets.get((bucketY, bucketX), ()):
+                    dy = y - y2
+                    dx = x - x2
+                    if abs(dy) <= self.ky and abs(dx) <= self.kx and self.kernel[dy + self.ky, dx + self.kx] == 0:
+                        return True
+        return False
+
+    def add(self, y: int, x: int):
+        self.buckets[(y // self.cellSizeY, x // self.cellSizeX)].append((y, x))
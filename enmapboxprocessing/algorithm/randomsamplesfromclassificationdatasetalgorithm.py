@@ -67,7 +67,7 @@ class RandomSamplesFromClassificationDatasetAlgorithm(EnMAPProcessingAlgorithm):
             feedback, feedback2 = self.createLoggingFeedback(feedback, logfile)
             self.tic(feedback, parameters, context)
 
-            dump = ClassifierDump(**Utils.pickleLoad(filenameSample))
+            dump = ClassifierDump(**Utils.datasetLoad(filenameSample))
             feedback.pushInfo(
                 f'Load dataset: X=array{list(np.shape(dump.X))} y=array{list(np.shape(dump.y))} categories={[c.name for c in dump.categories]}')
 
@@ -96,13 +96,13 @@ class RandomSamplesFromClassificationDatasetAlgorithm(EnMAPProcessingAlgorithm):
 
             # store sample
             dump2 = dump.withSample(dump.X[indices], dump.y[indices]).withClassifier(None)
-            Utils.pickleDump(dump2.__dict__, filename)
+            Utils.datasetDump(dump2.__dict__, filename)
 
             # store conmplement
             indices2 = np.full((dump.X.shape[0],), True, bool)
             indices2[indices] = False
             dump2 = dump.withSample(dump.X[indices2], dump.y[indices2]).withClassifier(None)
-            Utils.pickleDump(dump2.__dict__, filename2)
+            Utils.datasetDump(dump2.__dict__, filename2)
 
             result = {self.P_OUTPUT_DATASET: filename, self.P_OUTPUT_COMPLEMENT: filename2}
             self.toc(feedback, result)
@@ -1,9 +1,11 @@
 import traceback
 from collections import OrderedDict, defaultdict
+from itertools import takewhile, chain
 from math import ceil
 from os.path import basename, splitext, join, dirname
 from re import finditer, Match
-from typing import Dict, Any, List, Tuple, Union
+from types import CodeType
+from typing import Dict, Any, List, Tuple, Union, Set, NamedTuple
 
 import numpy
 import numpy as np
@@ -26,6 +28,13 @@ from enmapboxprocessing.utils import Utils
 from typeguard import typechecked
 
 
+class RasterMathCode(NamedTuple):
+    code: CodeType  # compiled user code
+    isSingleLineCode: bool
+    atBands: Dict[str, Dict[Tuple, List[Tuple[str, str]]]]  # band subsets and their data and mask identifiers
+    names: Set[str]  # all names referenced by the code
+
+
 @typechecked
 class RasterMathAlgorithm(EnMAPProcessingAlgorithm):
     P_CODE, _CODE = 'code', 'Code'
@@ -299,12 +308,15 @@ class RasterMathAlgorithm(EnMAPProcessingAlgorithm):
 
             # blockSizeY = 100
 
+            # parse, rewrite and compile the code only once and reuse it for all blocks
+            rasterMathCode = self.compileCode(code, readers, writers, feedback)
+
             # process
             if overlap is None:
                 overlap = 0
             for block in grid.walkGrid(blockSizeX, blockSizeY, feedback):
                 results = self.processBlock(
-                    code, block, readers, readers2, writers, overlap, feedback
+                    rasterMathCode, block, readers, readers2, writers, overlap, feedback
                 )
                 for key in results:
                     writer = writers[key]
@@ -339,8 +351,9 @@ class RasterMathAlgorithm(EnMAPProcessingAlgorithm):
                     identifier = substring.split('.')[0]
                     writers[identifier] = Mock()  # silently ignore all writer interaction
 
+        rasterMathCode = self.compileCode(code, readers, writers, feedback)
         for block in grid.walkGrid(1, 1, None):
-            results = self.processBlock(code, block, readers, readers2, writers, 0, feedback, dryRun=True)
+            results = self.processBlock(rasterMathCode, block, readers, readers2, writers, 0, feedback, dryRun=True)
             break  # stop after processing the first pixel
 
         for name, result in results.items():
@@ -359,70 +372,23 @@ class RasterMathAlgorithm(EnMAPProcessingAlgorithm):
 
         return writers
 
-    def processBlock(
-            self, code: str, block: RasterBlockInfo, readers: Dict[str, RasterReader],
-            readers2: Dict[str, RasterReader], writers: Dict[str, Union[RasterWriter, Mock]],
-            overlap: int, feedback: ProcessingFeedback, dryRun=False
-    ) -> Dict[str, np.ndarray]:
+    def compileCode(
+            self, code: str, readers: Dict[str, RasterReader], writers: Dict[str, Union[RasterWriter, Mock]],
+            feedback: ProcessingFeedback
+    ) -> RasterMathCode:
+        """Rewrite the user code into valid Python code and compile it.
+        This is done only once and the result is reused for all blocks.
 
-        # add modules
-        namespace = dict()
-        namespace['np'] = np
-        namespace['numpy'] = numpy
+        Also return the band subsets used via the @-syntax and all names referenced by the code,
+        which is used to only read the data that is actually needed.
+        """
 
-        # add special variables
-        if dryRun:
-            namespace['feedback'] = Mock()  # silently ignore all feedback
-        else:
-            namespace['feedback'] = feedback
-        namespace['block'] = block
-        namespace['dryRun'] = dryRun
-
-        # add data arrays and readers
+        # find single band usages indicated by '@'
         atIdentifiers = list()  # collect all @identifiers that need to be substitution with valid identifier
+        atBands: Dict[str, Dict[Tuple, List[Tuple[str, str]]]] = dict()
         for rasterName in readers:
             reader = readers[rasterName]  # used for querying metadata etc.
-            reader2 = readers2[rasterName]  # used for reading the resampled data
-
-            # only read all the data if really required, maybe we just need single bands indicated by the usage of'@'
-            needAllData = False
-
-            # - check if we use the actual array
-            match_: Match
-            for line in code.splitlines():
-                if line.startswith('#'):
-                    continue
-                line += '    '  # add some space for avoiding index errors when checking
-                for match_ in finditer(rasterName, line):
-                    if line[match_.end()] in '@.':
-                        continue  # not using the actual array, but only a single band or the reader
-                needAllData = True
-
-            # - check if we use the actual mask array
-            match_: Match
-            for line in code.splitlines():
-                if line.startswith('#'):
-                    continue
-                line += '    '  # add some space for avoiding index errors when checking
-                for match_ in finditer(rasterName + 'Mask', line):
-                    if line[match_.end()] in '@':
-                        continue  # not using the actual mask array, but only a single band
-                needAllData = True
-
-            if needAllData:
-                # check if the raster is a rasterized vector ...
-                isRasterizedVector = reader.bandName(reader.bandCount()) == 'None'
-                if isRasterizedVector:  # ... if so, we just assign the 0/1 mask, instead of all burned fields
-                    array = np.array(reader2.arrayFromBlock(block, [reader.bandCount()], overlap))
-                    namespace[rasterName] = array
-                    namespace[rasterName + 'Mask'] = array == 1
-                else:
-                    array = np.array(reader2.arrayFromBlock(block, None, overlap))
-                    namespace[rasterName] = array
-                    namespace[rasterName + 'Mask'] = np.array(reader2.maskArray(array, None))
-
-            #  find single band usages indicated by '@'
-            atBands: Dict[Tuple, List[str]] = defaultdict(list)
+            atBands[rasterName] = defaultdict(list)
             match_: Match
             for line in code.splitlines():
                 if line.startswith('#'):
@@ -474,33 +440,10 @@ class RasterMathAlgorithm(EnMAPProcessingAlgorithm):
                         bandNos = tuple(set(bandsToUse).difference(bandsToExclude))
 
                     identifier = text.replace('Mask@', '@') + unit
-                    atBands[bandNos].append(identifier)  # collect all identifiers for each band
-
-            # add single band data
-            for bandNos, identifiers in atBands.items():
-                array = np.array(reader2.arrayFromBlock(block, list(bandNos), overlap))
-                marray = np.array(reader2.maskArray(array, list(bandNos)))
-                for identifier in identifiers:
                     tmp = identifier.split('@')
-                    namespace[Utils.makeIdentifier(tmp[0] + 'At' + tmp[1])] = array
-                    namespace[Utils.makeIdentifier(tmp[0] + 'MaskAt' + tmp[1])] = marray
-
-            namespace[rasterName + '_'] = reader
-
-        namespace['RS'] = list()
-        namespace['RS_'] = list()
-        namespace['RSMask'] = list()
-        for rasterName in self.inputRasterListNames():
-            if rasterName in namespace:
-                namespace['RS'].append(namespace[rasterName])
-                namespace['RS_'].append(namespace[rasterName + '_'])
-                namespace['RSMask'].append(namespace[rasterName + 'Mask'])
-            else:
-                break
-
-        # add writers
-        for rasterName, writer in writers.items():
-            namespace[rasterName + '_'] = writer
+                    key = Utils.makeIdentifier(tmp[0] + 'At' + tmp[1])
+                    maskKey = Utils.makeIdentifier(tmp[0] + 'MaskAt' + tmp[1])
+                    atBands[rasterName][bandNos].append((key, maskKey))  # collect all identifiers for each band
 
         # inject writer objects
         for rasterName in writers:
@@ -529,16 +472,114 @@ class RasterMathAlgorithm(EnMAPProcessingAlgorithm):
         # replace @
         code = code.replace('@', 'At')
 
-        # execute code
+        # compile code
         try:
             code = code.replace(r'\n', '\n')  # convert raw new lines (only required when executed via qgis_process)
-            exec(code, namespace)
+            codeObject = compile(code, '<string>', 'exec')
         except Exception as error:
-            traceback.print_exc()
-            text = traceback.format_exc()
+            self.reportCodeError(error, feedback)
+
+        return RasterMathCode(codeObject, isSingleLineCode, atBands, self.referencedNames(codeObject))
+
+    @classmethod
+    def referencedNames(cls, codeObject: CodeType) -> Set[str]:
+        """Return all names referenced by the code, including nested functions, classes and comprehensions."""
+        names = set(codeObject.co_names)
+        for constant in codeObject.co_consts:
+            if isinstance(constant, CodeType):
+                names.update(cls.referencedNames(constant))
+        return names
+
+    def reportCodeError(self, error: Exception, feedback: ProcessingFeedback):
+        traceback.print_exc()
+        text = traceback.format_exc()
+        if 'File "<string>"' in text:
             text = text[text.index('File "<string>"'):]
-            feedback.reportError(text)
-            raise QgsProcessingException(str(error))
+        feedback.reportError(text)
+        raise QgsProcessingException(str(error))
+
+    def processBlock(
+            self, rasterMathCode: RasterMathCode, block: RasterBlockInfo, readers: Dict[str, RasterReader],
+            readers2: Dict[str, RasterReader], writers: Dict[str, Union[RasterWriter, Mock]],
+            overlap: int, feedback: ProcessingFeedback, dryRun=False
+    ) -> Dict[str, np.ndarray]:
+
+        isSingleLineCode = rasterMathCode.isSingleLineCode
+        names = rasterMathCode.names
+
+        # add modules
+        namespace = dict()
+        namespace['np'] = np
+        namespace['numpy'] = numpy
+
+        # add special variables
+        if dryRun:
+            namespace['feedback'] = Mock()  # silently ignore all feedback
+        else:
+            namespace['feedback'] = feedback
+        namespace['block'] = block
+        namespace['dryRun'] = dryRun
+
+        # add data arrays and readers, but only read the data that is actually used by the code
+        rasterListNames = list(takewhile(lambda rasterName: rasterName in readers, self.inputRasterListNames()))
+        needRasterList = 'RS' in names or 'RSMask' in names
+        for rasterName in readers:
+            reader = readers[rasterName]  # used for querying metadata etc.
+            reader2 = readers2[rasterName]  # used for reading the resampled data
+
+            # only read all the data if really required, maybe we just need single bands indicated by the usage of'@'
+            needAllData = rasterName in names or rasterName + 'Mask' in names
+            if needRasterList and rasterName in rasterListNames:
+                needAllData = True
+
+            isRasterizedVector = False
+            if needAllData:
+                # check if the raster is a rasterized vector ...
+                isRasterizedVector = reader.bandName(reader.bandCount()) == 'None'
+                if isRasterizedVector:  # ... if so, we just assign the 0/1 mask, instead of all burned fields
+                    array = np.array(reader2.arrayFromBlock(block, [reader.bandCount()], overlap))
+                    namespace[rasterName] = array
+                    namespace[rasterName + 'Mask'] = array == 1
+                else:
+                    array = np.array(reader2.arrayFromBlock(block, None, overlap))
+                    namespace[rasterName] = array
+                    namespace[rasterName + 'Mask'] = np.array(reader2.maskArray(array, None))
+
+            # add single band data
+            for bandNos, keys in rasterMathCode.atBands[rasterName].items():
+                if not any(key in names for key in chain(*keys)):
+                    continue  # skip unused band subsets
+                if needAllData and not isRasterizedVector:  # reuse the data that was already read for this block
+                    indices = [bandNo - 1 for bandNo in bandNos]
+                    array = namespace[rasterName][indices]
+                    marray = namespace[rasterName + 'Mask'][indices]
+                else:
+                    array = np.array(reader2.arrayFromBlock(block, list(bandNos), overlap))
+                    marray = np.array(reader2.maskArray(array, list(bandNos)))
+                for key, maskKey in keys:
+                    namespace[key] = array
+                    namespace[maskKey] = marray
+
+            namespace[rasterName + '_'] = reader
+
+        namespace['RS'] = list()
+        namespace['RS_'] = list()
+        namespace['RSMask'] = list()
+        for rasterName in rasterListNames:
+            namespace['RS_'].append(namespace[rasterName + '_'])
+            if needRasterList:
+                namespace['RS'].append(namespace[rasterName])
+                namespace['RSMask'].append(namespace[rasterName + 'Mask'])
+
+        # add writers
+        for rasterName, writer in writers.items():
+            namespace[rasterName + '_'] = writer
+
+        # execute code
+        try:
+            exec(rasterMathCode.code, namespace)
+        except Exception as error:
+            self.reportCodeError(error, feedback)
 
         # prepare output data
         results = dict()
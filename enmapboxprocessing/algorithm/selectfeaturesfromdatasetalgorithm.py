@@ -48,7 +48,7 @@ class SelectFeaturesFromDatasetAlgorithm(EnMAPProcessingAlgorithm):
             feedback, feedback2 = self.createLoggingFeedback(feedback, logfile)
             self.tic(feedback, parameters, context)
 
-            dump = ClassifierDump(**Utils.pickleLoad(filenameDataset))
+            dump = ClassifierDump(**Utils.datasetLoad(filenameDataset))
             feedback.pushInfo(
                 f'Load feature data: X=array{list(dump.X.shape)}')
 
@@ -72,7 +72,7 @@ class SelectFeaturesFromDatasetAlgorithm(EnMAPProcessingAlgorithm):
             dumpDict = dump.__dict__.copy()
             dumpDict['X'] = dump.X[:, indices]
             dumpDict['features'] = [dump.features[index] for index in indices]
-            Utils.pickleDump(dumpDict, filename)
+            Utils.datasetDump(dumpDict, filename)
 
             result = {self.P_OUTPUT_DATASET: filename}
             self.toc(feedback, result)
@@ -15,8 +15,9 @@ class SpatialFilterFunctionAlgorithmBase(ApplyBandFunctionAlgorithmBase):
     def outputNoDataValue(self) -> float:
         return float(np.finfo(np.float32).min)
 
-    def prepareInput(self):
-        self.array = np.float32(self.array)
+    def prepareInput(self, array: np.ndarray) -> np.ndarray:
+        return np.float32(array)
 
-    def prepareOutput(self):
-        self.outarray[np.logical_not(self.marray)] = self.outputNoDataValue()
+    def prepareOutput(self, outarray: np.ndarray, marray: np.ndarray) -> np.ndarray:
+        outarray[np.logical_not(marray)] = self.outputNoDataValue()
+        return outarray
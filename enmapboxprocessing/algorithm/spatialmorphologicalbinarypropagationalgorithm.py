@@ -5,6 +5,7 @@ from typeguard import typechecked
 
 @typechecked
 class SpatialMorphologicalBinaryPropagationAlgorithm(SpatialFilterFunctionAlgorithmBase):
+    Tileable = False  # non-local operation, always apply to the whole band
 
     def displayName(self) -> str:
         return 'Spatial morphological Binary Propagation filter'
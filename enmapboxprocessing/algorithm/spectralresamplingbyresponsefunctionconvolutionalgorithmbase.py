@@ -1,7 +1,7 @@
 import inspect
 from collections import OrderedDict
-from math import ceil, sqrt, pi, exp
-from typing import Dict, Any, List, Tuple, Union
+from math import sqrt, pi
+from typing import Dict, Any, List, Tuple, Union, Optional
 from warnings import warn
 
 import numpy as np
@@ -10,9 +10,12 @@ from qgis._core import (QgsProcessingContext, QgsProcessingFeedback, QgsProcessi
 
 from enmapbox.externals.qps.speclib.core.spectrallibrary import SpectralLibrary, SpectralLibraryUtils
 from enmapbox.externals.qps.speclib.core.spectralprofile import SpectralProfile
+from enmapboxprocessing.blockexecutor import BlockExecutor
 from enmapboxprocessing.driver import Driver
 from enmapboxprocessing.enmapalgorithm import EnMAPProcessingAlgorithm, Group
+from enmapboxprocessing.rasterblockinfo import RasterBlockInfo
 from enmapboxprocessing.rasterreader import RasterReader
+from enmapboxprocessing.spectralresponsecache import SpectralResponseCache
 from enmapboxprocessing.typing import Array3d, Number
 from typeguard import typechecked
 
@@ -25,6 +28,7 @@ class SpectralResamplingByResponseFunctionConvolutionAlgorithmBase(EnMAPProcessi
     P_RASTER, _RASTER = 'raster', 'Spectral raster layer'
     P_CODE, _CODE = 'response', 'Spectral response function'
     P_SAVE_RESPONSE_FUNCTION, _SAVE_RESPONSE_FUNCTION = 'saveResponseFunction', 'Save spectral response function'
+    P_NUMBER_OF_WORKERS, _NUMBER_OF_WORKERS = 'numberOfWorkers', 'Number of workers'
     P_OUTPUT_RASTER, _OUTPUT_RASTER = 'outputResampledRaster', 'Output raster layer'
     A_CODE = False
 
@@ -40,6 +44,7 @@ class SpectralResamplingByResponseFunctionConvolutionAlgorithmBase(EnMAPProcessi
             (self._CODE, 'Python code specifying the spectral response function.'),
             (self._SAVE_RESPONSE_FUNCTION,
              'Whether to save the spectral response function library as *.srf.gpkg sidecar file.'),
+            (self._NUMBER_OF_WORKERS, self.NumberOfWorkers),
             (self._OUTPUT_RASTER, self.RasterFileDestination)
         ]
 
@@ -70,6 +75,7 @@ class SpectralResamplingByResponseFunctionConvolutionAlgorithmBase(EnMAPProcessi
         self.addParameterRasterLayer(self.P_RASTER, self._RASTER)
         self.addParameterCode(self.P_CODE, self._CODE, self.defaultCodeAsString(), advanced=self.A_CODE)
         self.addParameterBoolean(self.P_SAVE_RESPONSE_FUNCTION, self._SAVE_RESPONSE_FUNCTION, False, True, True)
+        self.addParameterNumberOfWorkers(self.P_NUMBER_OF_WORKERS, self._NUMBER_OF_WORKERS)
         self.addParameterRasterDestination(self.P_OUTPUT_RASTER, self._OUTPUT_RASTER)
 
     def processAlgorithm(
@@ -77,8 +83,9 @@ class SpectralResamplingByResponseFunctionConvolutionAlgorithmBase(EnMAPProcessi
     ) -> Dict[str, Any]:
         raster = self.parameterAsSpectralRasterLayer(parameters, self.P_RASTER, context)
         format, options = self.GTiffFormat, self.DefaultGTiffCreationOptions
-        responses = self.parameterAsResponses(parameters, self.P_CODE, context)
+        code = self.parameterAsString(parameters, self.P_CODE, context)
         saveResponseFunction = self.parameterAsBoolean(parameters, self.P_SAVE_RESPONSE_FUNCTION, context)
+        numberOfWorkers = self.parameterAsNumberOfWorkers(parameters, self.P_NUMBER_OF_WORKERS, context)
         filename = self.parameterAsOutputLayer(parameters, self.P_OUTPUT_RASTER, context)
         maximumMemoryUsage = gdal.GetCacheMax()
 
@@ -86,66 +93,58 @@ class SpectralResamplingByResponseFunctionConvolutionAlgorithmBase(EnMAPProcessi
             feedback, feedback2 = self.createLoggingFeedback(feedback, logfile)
             self.tic(feedback, parameters, context)
 
-            # convert FWHM specifications to fully defined response function
-            responses2 = OrderedDict()
-            for i, (k, v) in enumerate(responses.items()):
-                if isinstance(k, (int, float)):
-                    fwhm = float(v)
-                    sigma = fwhm / 2.355
-                    x0 = float(k)
-                    xs = list()
-                    weights = list()
-                    a = 2 * sigma ** 2
-                    b = sigma * sqrt(2 * pi)
-                    for x in range(int(x0 - sigma * 3), int(x0 + sigma * 3) + 2):
-                        c = -(x - x0) ** 2
-                        fx = exp(c / a) / b
-                        weights.append(fx)
-                        xs.append(x)
-                    weights = np.divide(weights, np.max(weights))  # scale to 0-1 range
-    #                responses2[f'Band {i + 1} ({k} Nanometers)'] = [(x, round(w, RESPONSE_CUTOFF_DIGITS)) for x, w in
-    #                                                                zip(xs, weights)]
-                    responses2[f'band {i + 1}'] = [(x, round(w, RESPONSE_CUTOFF_DIGITS)) for x, w in
-                                                                zip(xs, weights)]
+            # compile response function once per sensor definition
+            def compileResponses():
+                return self.compileResponses(self.parameterAsResponses(parameters, self.P_CODE, context), feedback)
 
-                else:
-                    responses2[k] = v
-            responses = responses2
+            responses = SpectralResponseCache.responses(code, compileResponses)
 
             feedback.getQgsFeedback().pushInfo('Spectral response functions:')  # never silence this info!
             for name in responses:
                 feedback.getQgsFeedback().pushInfo(f"responses['{name}'] = {responses[name]}")
 
-            # check if wavelength have single nanometer step
-            for name in responses:
-                values = np.array([v for v, _ in responses[name]])
-                differences = np.subtract(values[1:], values[:-1])
-                if not np.all(differences == 1):
-                    message = f'invalid response function wavelength resolution for "{name}" band\n' \
-                              f'wavelength: {values}\n' \
-                              f'difference: {differences}\n' \
-                              f'check wavelength region around: {values[:-1][differences != 1]}'
-                    feedback.reportError(message, True)
-                    raise QgsProcessingException(message)
-
             reader = RasterReader(raster)
-            wavelength = [reader.wavelength(i + 1) for i in range(reader.bandCount())]
+            wavelength = reader.wavelengths().tolist()
             outputBandCount = len(responses)
             outputNoDataValue = reader.noDataValue()
 
+            # only source bands with non-zero response weights need to be read
+            matrix = SpectralResponseCache.matrix(code, wavelength, lambda: self.responseMatrix(wavelength, responses))
+            self.warnUncoveredBands(matrix, wavelength, responses, feedback)
+            bandList = [int(index) + 1 for index in np.flatnonzero(np.any(matrix != 0, axis=0))]
+            if len(bandList) == 0:
+                bandList = [1]  # nothing covered, still read a band for the mask
+            matrix = matrix[:, np.subtract(bandList, 1)]
+
             writer = Driver(filename, format, options, feedback).createLike(reader, reader.dataType(), outputBandCount)
-            lineMemoryUsage = reader.lineMemoryUsage() * 2
-            blockSizeY = min(raster.height(), ceil(maximumMemoryUsage / lineMemoryUsage))
-            blockSizeX = raster.width()
-            for block in reader.walkGrid(blockSizeX, blockSizeY, feedback):
-                array = reader.arrayFromBlock(block)
-                outarray = self.resampleData(array, wavelength, responses, outputNoDataValue, feedback)
+            executor = BlockExecutor(numberOfWorkers)
+            pixelMemoryUsage = reader.pixelMemoryUsage(len(bandList))  # input block
+            pixelMemoryUsage += reader.pixelMemoryUsage(len(bandList), 1)  # mask
+            pixelMemoryUsage += reader.pixelMemoryUsage(outputBandCount, 8)  # output block
+            pixelMemoryUsage *= executor.blocksInFlight()
+            blockSizeX, blockSizeY = reader.planBlockSize(pixelMemoryUsage, maximumMemoryUsage)
+
+            def read(block: RasterBlockInfo):
+                array = reader.arrayFromBlock(block, bandList)
+                if outputNoDataValue is not None:
+                    marray = reader.maskArray2d(array, bandList)
+                else:
+                    marray = None
+                return array, marray
+
+            def compute(block: RasterBlockInfo, data):
+                array, marray = data
+                outarray = self.resampleData(array, matrix, outputNoDataValue)
                 if outputNoDataValue is not None:
-                    marray = np.all(reader.maskArray(array), axis=0)
-                    for arr in outarray:
-                        arr[np.logical_not(marray)] = outputNoDataValue
+                    outarray[:, np.logical_not(marray)] = outputNoDataValue
+                return outarray
+
+            def write(block: RasterBlockInfo, outarray):
                 writer.writeArray(outarray, block.xOffset, block.yOffset)
 
+            blocks = reader.walkGrid(blockSizeX, blockSizeY, feedback)
+            executor.run(blocks, read, compute, write)
+
             outputWavelength = list()
             for name in responses:
                 values = responses[name]
@@ -186,31 +185,89 @@ class SpectralResamplingByResponseFunctionConvolutionAlgorithmBase(EnMAPProcessi
         return result
 
     @staticmethod
-    def resampleData(
-            array: Array3d, wavelength: List, responses: Dict[str, List[Tuple[int, float]]], noDataValue: float,
+    def compileResponses(
+            responses: Dict[Union[str, float], Union[List[Tuple[int, float]], Number]],
             feedback: QgsProcessingFeedback
-    ) -> Array3d:
+    ) -> Dict[str, List[Tuple[int, float]]]:
+        """Convert FWHM specifications to fully defined response functions and check the wavelength steps."""
+        responses2 = OrderedDict()
+        for i, (k, v) in enumerate(responses.items()):
+            if isinstance(k, (int, float)):
+                fwhm = float(v)
+                sigma = fwhm / 2.355
+                x0 = float(k)
+                xs = np.arange(int(x0 - sigma * 3), int(x0 + sigma * 3) + 2)
+                a = 2 * sigma ** 2
+                b = sigma * sqrt(2 * pi)
+                weights = np.exp(-(xs - x0) ** 2 / a) / b
+                weights = np.divide(weights, np.max(weights))  # scale to 0-1 range
+                responses2[f'band {i + 1}'] = [(int(x), round(float(w), RESPONSE_CUTOFF_DIGITS))
+                                               for x, w in zip(xs, weights)]
+            else:
+                responses2[k] = v
+
+        # check if wavelength have single nanometer step
+        for name in responses2:
+            values = np.array([v for v, _ in responses2[name]])
+            differences = np.subtract(values[1:], values[:-1])
+            if not np.all(differences == 1):
+                message = f'invalid response function wavelength resolution for "{name}" band\n' \
+                          f'wavelength: {values}\n' \
+                          f'difference: {differences}\n' \
+                          f'check wavelength region around: {values[:-1][differences != 1]}'
+                feedback.reportError(message, True)
+                raise QgsProcessingException(message)
+
+        return responses2
+
+    @staticmethod
+    def responseMatrix(wavelength: List, responses: Dict[str, List[Tuple[int, float]]]) -> np.ndarray:
+        """Return (n_out, n_in) matrix of response weights, normalized to sum to one for each target band.
+
+        Source band wavelength are rounded to full nanometers and matched against the response function.
+        Rows of target bands not covered by any source band are all zero.
+        """
         wavelength = [int(round(v)) for v in wavelength]
-        outarray = list()
-        for name in responses:
+        matrix = np.zeros((len(responses), len(wavelength)), dtype=np.float64)
+        for row, name in enumerate(responses):
             weightsByWavelength = dict(responses[name])
-            indices = list()
-            weights = list()
             for index, wl in enumerate(wavelength):
                 weight = weightsByWavelength.get(wl)
                 if weight is not None:
-                    indices.append(index)
-                    weights.append(weight)
-            if len(indices) == 0:
-                message = f'no source bands ({min(wavelength)} to {max(wavelength)} nanometers) ' \
-                          f'are covert by target band "{name}" ' \
-                          f'({min(weightsByWavelength.keys())} to {max(weightsByWavelength.keys())} nanometers), ' \
-                          f'which will result in output band filled with no data values'
-                warn(message)
-                feedback.pushWarning(message)
-                outarray.append(np.full_like(array[0], noDataValue, dtype=array[0].dtype))
-            else:
-                weights = np.divide(weights, np.sum(weights))
-                outarray.append(np.average([array[i] for i in indices], 0, weights))
+                    matrix[row, index] = weight
+            total = np.sum(matrix[row])
+            if total != 0:
+                matrix[row] /= total
+        return matrix
+
+    @staticmethod
+    def warnUncoveredBands(
+            matrix: np.ndarray, wavelength: List, responses: Dict[str, List[Tuple[int, float]]],
+            feedback: QgsProcessingFeedback
+    ):
+        wavelength = [int(round(v)) for v in wavelength]
+        for row, name in enumerate(responses):
+            if np.any(matrix[row] != 0):
+                continue
+            weightsByWavelength = dict(responses[name])
+            message = f'no source bands ({min(wavelength)} to {max(wavelength)} nanometers) ' \
+                      f'are covert by target band "{name}" ' \
+                      f'({min(weightsByWavelength.keys())} to {max(weightsByWavelength.keys())} nanometers), ' \
+                      f'which will result in output band filled with no data values'
+            warn(message)
+            feedback.pushWarning(message)
+
+    @staticmethod
+    def resampleData(array: Array3d, matrix: np.ndarray, noDataValue: Optional[float]) -> np.ndarray:
+        """Resample (n_in, ysize, xsize) array with (n_out, n_in) response matrix.
 
+        Float32 data is resampled in float32, all other data in float64.
+        Target bands without response weights are filled with the no data value.
+        """
+        array = np.asarray(array)
+        if array.dtype == np.float32:
+            matrix = matrix.astype(np.float32)
+        outarray = np.tensordot(matrix, array, axes=1)
+        if noDataValue is not None:
+            outarray[np.all(matrix == 0, axis=1)] = noDataValue
         return outarray
@@ -30,7 +30,9 @@ class SynthMixAlgorithm(EnMAPProcessingAlgorithm):
     P_MIXING_LIKELIHOODS, _MIXING_LIKELIHOODS = 'mixingLikelihoods', 'Mixing complexity likelihoods'
     P_ALLOW_WITHINCLASS_MIXTURES, _ALLOW_WITHINCLASS_MIXTURES = 'allowWithinClassMixtures', 'Allow within-class mixtures'
     P_CLASS_LIKELIHOODS, _CLASS_LIKELIHOODS = 'classLikelihoods', 'Class likelihoods'
+    P_SEED, _SEED = 'seed', 'Random seed'
     P_OUTPUT_DATASET, _OUTPUT_DATASET = 'outputFolder', 'Output folder'
+    ChunkSize = 2 ** 14  # number of mixtures computed at once
 
     @classmethod
     def displayName(cls) -> str:
@@ -51,6 +53,7 @@ class SynthMixAlgorithm(EnMAPProcessingAlgorithm):
             (self._ALLOW_WITHINCLASS_MIXTURES, 'Whether to allow mixtures with profiles belonging to the same class.'),
             (self._CLASS_LIKELIHOODS, 'A list of likelihoods for drawing profiles from each class. '
                                       'If not specified, class likelihoods are proportional to the class size.'),
+            (self._SEED, 'The seed for the random generator can be provided.'),
             (self._OUTPUT_DATASET, self.FolderDestination)
         ]
 
@@ -64,6 +67,7 @@ class SynthMixAlgorithm(EnMAPProcessingAlgorithm):
         self.addParameterString(self.P_MIXING_LIKELIHOODS, self._MIXING_LIKELIHOODS, '0.5, 0.5', False, True)
         self.addParameterBoolean(self.P_ALLOW_WITHINCLASS_MIXTURES, self._ALLOW_WITHINCLASS_MIXTURES, True)
         self.addParameterString(self.P_CLASS_LIKELIHOODS, self._CLASS_LIKELIHOODS, None, False, True)
+        self.addParameterInt(self.P_SEED, self._SEED, None, True, 1, None, True)
         self.addParameterFolderDestination(self.P_OUTPUT_DATASET, self._OUTPUT_DATASET)
 
     def processAlgorithm(
@@ -75,13 +79,14 @@ class SynthMixAlgorithm(EnMAPProcessingAlgorithm):
         self.mixingLikelihoods = self.parameterAsValues(parameters, self.P_MIXING_LIKELIHOODS, context)
         self.allowWithinClassMixtures = self.parameterAsBoolean(parameters, self.P_ALLOW_WITHINCLASS_MIXTURES, context)
         self.classLikelihoods = self.parameterAsValues(parameters, self.P_CLASS_LIKELIHOODS, context)
+        seed = self.parameterAsInt(parameters, self.P_SEED, context)
         foldername = self.parameterAsFileOutput(parameters, self.P_OUTPUT_DATASET, context)
 
         with open(join(foldername, 'processing.log'), 'w') as logfile:
             feedback, feedback2 = self.createLoggingFeedback(feedback, logfile)
             self.tic(feedback, parameters, context)
 
-            dump = ClassifierDump(**Utils.pickleLoad(filenameDataset))
+            dump = ClassifierDump(**Utils.datasetLoad(filenameDataset))
             self.X = dump.X
             self.y = dump.y
             self.categories = dump.categories
@@ -92,77 +97,87 @@ class SynthMixAlgorithm(EnMAPProcessingAlgorithm):
                 for category in self.categories:
                     self.classLikelihoods.append(np.average(self.y == category.value))
 
+            rng = np.random.default_rng(seed)
             for target in self.categories:
-                X, y = self.mixTarget(target)
+                X, y = self.mixTarget(target, rng)
 
                 checkSampleShape(X, y, raise_=True)
 
                 features = [f'Band {i + 1}' for i in range(X.shape[1])]
                 dump = RegressionDump(targets=[target.name], features=features, X=X, y=y)
                 dumpDict = dump.__dict__
-                Utils.pickleDump(dumpDict, filename)
+                filename = join(foldername, f'{target.name}.pkl')
+                Utils.datasetDump(dumpDict, filename)
 
-            result = {self.P_OUTPUT_FOLDER: foldername}
+            result = {self.P_OUTPUT_DATASET: foldername}
             self.toc(feedback, result)
 
         return result
 
-    def mixTarget(self, target: Category):
+    def mixTarget(self, target: Category, rng: np.random.Generator = None):
+        """Create n synthetic mixtures with the target class fraction as label.
 
+        Mixing complexities, labels, endmember indices and mixing weights are drawn for all mixtures at once.
+        Weights are drawn by sequentially breaking a unit stick, i.e. the target endmember weight is uniform in [0, 1)
+        and each following endmember gets a uniform share of the remaining weight; the last endmember gets the rest.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+
+        labels = self.y.flatten()
+        values = np.array([category.value for category in self.categories])
         targetIndex = self.categories.index(target)
-        features, labels = self.X.T, self.y.flatten()
-        classes = len(self.categories)
-        classLikelihoods = {category.value: v for category, v in zip(self.categories, self.classLikelihoods)}
-        mixingComplexities = {i: v for i, v in enumerate(self.mixingLikelihoods, 2)}
-        targetRange = [0, 1]
-
-        # cache label indices and setup 0%/100% fractions from class labels
-        indices = dict()
-        zeroOneFractions = np.zeros((classes, features.shape[1]), dtype=np.float32)
-        for i, category in enumerate(self.categories):
-            indices[category.value] = np.where(labels == category.value)[0]
-            zeroOneFractions[i, indices[category.value]] = 1.
+        classLikelihoods = np.array(self.classLikelihoods, dtype=np.float64)
+        complexities = np.arange(2, len(self.mixingLikelihoods) + 2)
+        n = self.n
+
+        # cache sample indices by class
+        order = np.argsort(labels, kind='stable')
+        starts = np.searchsorted(labels[order], values)
+        counts = np.array([np.sum(labels == value) for value in values])
+
+        # draw mixing complexities
+        complexity = rng.choice(complexities, size=n, p=self.mixingLikelihoods)
+        maxComplexity = int(np.max(complexity, initial=2))
+
+        # draw class labels; first endmember is always from the target class
+        drawnClasses = np.empty((n, maxComplexity), dtype=np.int64)
+        drawnClasses[:, 0] = targetIndex
+        if self.allowWithinClassMixtures:
+            drawnClasses[:, 1:] = rng.choice(len(values), size=(n, maxComplexity - 1), p=classLikelihoods)
+        else:
+            # sample without replacement from the non-target classes via the Gumbel-top-k trick
+            classLikelihoods2 = classLikelihoods.copy()
+            classLikelihoods2[targetIndex] = 0.
+            if maxComplexity - 1 > np.count_nonzero(classLikelihoods2):
+                raise QgsProcessingException('not enough classes for drawing mixtures without within-class mixing')
+            with np.errstate(divide='ignore'):
+                keys = np.log(classLikelihoods2) + rng.gumbel(size=(n, len(values)))
+            drawnClasses[:, 1:] = np.argsort(-keys, axis=1)[:, :maxComplexity - 1]
+
+        # draw endmember indices
+        drawnIndices = order[starts[drawnClasses] + rng.integers(0, counts[drawnClasses])]
+
+        # draw mixing weights; unused endmembers get a zero weight
+        position = np.arange(maxComplexity)[None]
+        last = (complexity - 1)[:, None]
+        u = rng.random((n, maxComplexity))
+        remaining = np.cumprod(np.concatenate([np.ones((n, 1)), 1. - u[:, :-1]], axis=1), axis=1)
+        weights = np.where(position < last, u * remaining, 0.)
+        weights = np.where(position == last, remaining, weights)
 
         # create mixtures
-        mixtures = list()
-        fractions = list()
-
-        classLikelihoods2 = {k: v / (1 - classLikelihoods[target.value])
-                             for k, v in classLikelihoods.items()
-                             if k != target.value}
-        for i in range(self.n):
-            complexity = np.random.choice(list(mixingComplexities.keys()), p=list(mixingComplexities.values()))
-            drawnLabels = [target.value]
-
-            if self.allowWithinClassMixtures:
-                drawnLabels.extend(np.random.choice(list(classLikelihoods.keys()), size=complexity - 1, replace=True,
-                    p=list(classLikelihoods.values())))
-            else:
-                drawnLabels.extend(np.random.choice(list(classLikelihoods2.keys()), size=complexity - 1, replace=False,
-                    p=list(classLikelihoods2.values())))
-
-            drawnIndices = [np.random.choice(indices[label]) for label in drawnLabels]
-            drawnFeatures = features[:, drawnIndices]
-            drawnFractions = zeroOneFractions[:, drawnIndices]
-
-            randomWeights = list()
-            for i in range(complexity - 1):
-                if i == 0:
-                    weight = np.random.random() * (targetRange[1] - targetRange[0]) + targetRange[0]
-                else:
-                    weight = np.random.random() * (1. - sum(randomWeights))
-                randomWeights.append(weight)
-            randomWeights.append(1. - sum(randomWeights))
-
-            assert sum(randomWeights) == 1.
-            mixtures.append(np.sum(drawnFeatures * randomWeights, axis=1))
-            fractions.append(np.sum(drawnFractions * randomWeights, axis=1)[targetIndex])
+        nFeatures = self.X.shape[1]
+        nEndmembers = len(labels) if self.includeEndmember else 0
+        X = np.empty((n + nEndmembers, nFeatures), dtype=np.float32)
+        y = np.empty((n + nEndmembers, 1), dtype=np.float32)
+        for start in range(0, n, self.ChunkSize):
+            chunk = slice(start, start + self.ChunkSize)
+            np.einsum('nc,ncb->nb', weights[chunk], self.X[drawnIndices[chunk]], out=X[chunk], casting='same_kind')
+        y[:n, 0] = np.sum(weights * (drawnClasses == targetIndex), axis=1)
 
         if self.includeEndmember:
-            mixtures.extend(features.T)
-            fractions.extend(np.float32(labels == target.value)[0])  # 1. for target class, 0. for the rest
-
-        X = np.array(mixtures, dtype=np.float32)
-        y = np.array(fractions, dtype=np.float32)[None]
+            X[n:] = self.X
+            y[n:, 0] = labels == target.value  # 1. for target class, 0. for the rest
 
         return X, y
@@ -210,8 +210,9 @@ class TranslateRasterAlgorithm(EnMAPProcessingAlgorithm):
                 if spectralBandList is None:
                     spectralBandList = [i + 1 for i in range(spectralRaster.bandCount())]
 
-                wavelength = np.array([reader.wavelength(bandNo) for bandNo in bandList])
-                bandList = [np.argmin(np.abs(wavelength - spectralReader.wavelength(bandNo))) + 1
+                wavelength = reader.wavelengths()[np.array(bandList) - 1]
+                spectralWavelength = spectralReader.wavelengths()
+                bandList = [np.argmin(np.abs(wavelength - spectralWavelength[bandNo - 1])) + 1
                             for bandNo in spectralBandList]
 
             if bandList is None:
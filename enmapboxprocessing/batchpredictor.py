@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+
+from enmapboxprocessing.typing import Array2d, Array3d
+from typeguard import typechecked
+
+
+@typechecked
+class BatchPredictor(object):
+    """Predict the valid pixels of a feature block in chunks of samples.
+
+    Valid pixels are gathered into a preallocated C-contiguous (n_pixels, n_features) sample buffer,
+    which is float32, if the feature data type can be represented without loss, and float64 otherwise.
+    The estimator is called for chunks of samples, so only a single chunk of (probability) predictions is held in
+    memory at a time. Optionally, chunks are predicted in parallel by a pool of worker threads.
+    """
+
+    DefaultChunkSize = 2 ** 16
+
+    def __init__(self, estimator, chunkSize: int = None, numberOfWorkers: int = None):
+        if chunkSize is None:
+            chunkSize = self.DefaultChunkSize
+        if numberOfWorkers is None:
+            numberOfWorkers = 1
+        assert chunkSize >= 1
+        assert numberOfWorkers >= 1
+        self.estimator = estimator
+        self.chunkSize = chunkSize
+        self.numberOfWorkers = numberOfWorkers
+
+    @staticmethod
+    def sampleDataType(arrayX: Array3d) -> type:
+        dtypes = {np.dtype(a.dtype) for a in arrayX}
+        if all(dtype.itemsize <= 2 or dtype == np.float32 for dtype in dtypes):
+            return np.float32  # exact for 8/16-bit integers and float32
+        return np.float64
+
+    def sample(self, arrayX: Array3d, valid: Array2d) -> np.ndarray:
+        """Return C-contiguous (n_pixels, n_features) sample of all valid pixels."""
+        n = int(np.count_nonzero(valid))
+        X = np.empty((n, len(arrayX)), dtype=self.sampleDataType(arrayX))
+        for i, a in enumerate(arrayX):
+            X[:, i] = a[valid]
+        return X
+
+    def predict(self, arrayX: Array3d, valid: Array2d, out: Array2d) -> Array2d:
+        """Predict valid pixels into the 2d output array."""
+        assert out.flags.c_contiguous
+        outFlat = out.reshape(-1)
+
+        def write(indices, y):
+            outFlat[indices] = y
+
+        self._run(self.estimator.predict, arrayX, valid, write)
+        return out
+
+    def predictProba(self, arrayX: Array3d, valid: Array2d, out: Array3d) -> Array3d:
+        """Predict class probabilities of valid pixels into the 3d (n_classes, height, width) output array."""
+        assert out.flags.c_contiguous
+        outFlat = out.reshape((len(out), -1))
+
+        def write(indices, y):
+            outFlat[:, indices] = y.T
+
+        self._run(self.estimator.predict_proba, arrayX, valid, write)
+        return out
+
+    def _run(self, function: Callable, arrayX: Array3d, valid: Array2d, write: Callable):
+        X = self.sample(arrayX, valid)
+        indices = np.flatnonzero(valid)
+        chunks = [slice(start, start + self.chunkSize) for start in range(0, len(X), self.chunkSize)]
+        if self.numberOfWorkers == 1 or len(chunks) < 2:
+            for chunk in chunks:
+                write(indices[chunk], function(X[chunk]))
+        else:
+            with ThreadPoolExecutor(max_workers=self.numberOfWorkers) as pool:
+                for chunk, y in zip(chunks, pool.map(lambda chunk: function(X[chunk]), chunks)):
+                    write(indices[chunk], y)
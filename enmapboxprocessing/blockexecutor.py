@@ -0,0 +1,55 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Iterable, Any, Deque, Tuple
+
+from enmapboxprocessing.rasterblockinfo import RasterBlockInfo
+from typeguard import typechecked
+
+
+@typechecked
+class BlockExecutor(object):
+    """Schedule a blocked read-compute-write loop onto a pool of worker threads.
+
+    Reading and writing is done in the calling thread, because QGIS data providers and GDAL datasets must not be
+    shared between threads. Only the compute step is dispatched to the pool.
+    Results are written in block order and at most two blocks per worker are in flight at any time,
+    see blocksInFlight(), which should be accounted for when deriving the block size from the memory budget.
+    """
+
+    def __init__(self, numberOfWorkers: int = None):
+        if numberOfWorkers is None:
+            numberOfWorkers = 1
+        assert numberOfWorkers >= 1
+        self.numberOfWorkers = numberOfWorkers
+
+    def blocksInFlight(self) -> int:
+        if self.numberOfWorkers == 1:
+            return 1
+        return 2 * self.numberOfWorkers
+
+    def run(
+            self, blocks: Iterable[RasterBlockInfo], read: Callable[[RasterBlockInfo], Any],
+            compute: Callable[[RasterBlockInfo, Any], Any], write: Callable[[RasterBlockInfo, Any], None]
+    ):
+        if self.numberOfWorkers == 1:
+            for block in blocks:
+                write(block, compute(block, read(block)))
+            return
+
+        maximumPending = self.blocksInFlight()
+        pending: Deque[Tuple[RasterBlockInfo, Future]] = deque()
+        with ThreadPoolExecutor(max_workers=self.numberOfWorkers) as pool:
+            try:
+                for block in blocks:
+                    data = read(block)
+                    pending.append((block, pool.submit(compute, block, data)))
+                    if len(pending) >= maximumPending:
+                        block_, future = pending.popleft()
+                        write(block_, future.result())
+                while len(pending) > 0:
+                    block_, future = pending.popleft()
+                    write(block_, future.result())
+            except BaseException:
+                for _, future in pending:
+                    future.cancel()
+                raise
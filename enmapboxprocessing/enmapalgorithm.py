@@ -50,6 +50,8 @@ class EnMAPProcessingAlgorithm(QgsProcessingAlgorithm):
     ReportFileDestination = 'Output report file destination.'
     ReportOpen = 'Whether to open the output report in the web browser.'
     FolderDestination = 'Folder destination.'
+    NumberOfWorkers = 'Number of parallel workers used for block-wise processing. ' \
+                      'Reading and writing is done sequentially, only the computation is done in parallel.'
 
     VrtFormat = 'VRT'
     DefaultVrtCreationOptions = ''.split()
@@ -318,6 +320,12 @@ class EnMAPProcessingAlgorithm(QgsProcessingAlgorithm):
     ) -> QgsRectangle:
         return super().parameterAsExtent(parameters, name, context, crs)
 
+    def parameterAsNumberOfWorkers(self, parameters: Dict[str, Any], name: str, context: QgsProcessingContext) -> int:
+        numberOfWorkers = self.parameterAsInt(parameters, name, context)
+        if numberOfWorkers is None:
+            return 1
+        return numberOfWorkers
+
     def parameterAsQgsDataType(
             self, parameters: Dict[str, Any], name: str, context: QgsProcessingContext, default: QgisDataType = None
     ) -> Optional[QgisDataType]:
@@ -688,6 +696,11 @@ class EnMAPProcessingAlgorithm(QgsProcessingAlgorithm):
         options = self.O_RESAMPLE_ALG
         self.addParameterEnum(name, description, options, False, defaultValue, optional, advanced)
 
+    def addParameterNumberOfWorkers(
+            self, name: str, description='Number of workers', defaultValue=1, optional=True, advanced=True
+    ):
+        self.addParameterInt(name, description, defaultValue, optional, 1, None, advanced)
+
     def flagParameterAsAdvanced(self, name: str, advanced: bool):
         if advanced:
             p = self.parameterDefinition(name)
@@ -0,0 +1,163 @@
+from typing import Optional, List
+
+import numpy as np
+
+from typeguard import typechecked
+
+
+@typechecked
+class KernelConvolver(object):
+    """Convolve a 3d (z, y, x) array with a 3d kernel, using the fastest suitable backend.
+
+    All backends reproduce astropy.convolution.convolve with boundary='fill', fill_value=NaN and the given
+    normalize_kernel and nan_treatment ('interpolate' or 'fill') settings:
+        Direct: astropy convolve, best for small kernels
+        Separable: one 1d convolution pass per kernel axis, for rank-one kernels (e.g. Gaussian, Box, 1d kernels)
+        Fft: FFT-based convolution of the NaN-zeroed data and the valid pixel mask, for large kernels
+
+    NaN-aware normalization is done by dividing the masked data sum convolution by the masked count convolution.
+
+    The costs of the direct backend grow with the number of kernel elements, faster for spectral than for spatial
+    elements, while the costs of the separable and FFT backends are almost independent of the kernel size.
+    Crossover points are taken from snippets/processing/benchmark_convolution.py, see the results recorded there.
+    """
+    Direct = 'direct'
+    Separable = 'separable'
+    Fft = 'fft'
+    Backends = [Direct, Separable, Fft]
+    MaximumDirectSpectralKernelSize = 5  # number of rank-one kernel elements along z
+    MaximumDirectSpatialKernelSize = 25  # number of rank-one kernel elements in y and x
+    MaximumDirectKernelSize = 63  # number of kernel elements, if the kernel is not rank-one
+
+    def __init__(
+            self, kernel: np.ndarray, normalizeKernel: bool = False, interpolate: bool = True, backend: str = None
+    ):
+        assert kernel.ndim == 3
+        assert all(v % 2 == 1 for v in kernel.shape), 'kernel size must be odd in all dimensions'
+        self.kernel = np.asarray(kernel, dtype=np.float64)
+        self.normalizeKernel = normalizeKernel
+        self.interpolate = interpolate
+        self.factors = self.separableFactors(self.kernel)
+        if backend is None:
+            backend = self.selectBackend()
+        assert backend in self.Backends
+        if backend == self.Separable:
+            assert self.factors is not None, 'kernel is not separable'
+        self.backend = backend
+
+    def selectBackend(self) -> str:
+        zsize, ysize, xsize = self.kernel.shape
+        if self.factors is not None:
+            if zsize <= self.MaximumDirectSpectralKernelSize and ysize * xsize <= self.MaximumDirectSpatialKernelSize:
+                return self.Direct
+            return self.Separable
+        if self.kernel.size <= self.MaximumDirectKernelSize:
+            return self.Direct
+        return self.Fft
+
+    @staticmethod
+    def separableFactors(kernel: np.ndarray) -> Optional[List[np.ndarray]]:
+        """Return 1d kernels for all axes, which outer product is the kernel, or None, if the kernel is not rank-one."""
+        axes = [axis for axis, size in enumerate(kernel.shape) if size > 1]
+        if len(axes) == 0:
+            return [kernel.reshape(-1), np.ones(1), np.ones(1)]
+        if len(axes) == 1:
+            factors = [np.ones(1)] * 3
+            factors[axes[0]] = kernel.reshape(-1)
+            return factors
+        if len(axes) == 2:
+            matrix = kernel.reshape([kernel.shape[axis] for axis in axes])
+            u, s, vt = np.linalg.svd(matrix)
+            if s[0] == 0 or np.any(s[1:] > s[0] * 1e-10):
+                return None
+            factors = [np.ones(1)] * 3
+            factors[axes[0]] = u[:, 0] * np.sqrt(s[0])
+            factors[axes[1]] = vt[0] * np.sqrt(s[0])
+            return factors
+        return None
+
+    def convolve(self, array: np.ndarray, mask: np.ndarray = None) -> np.ndarray:
+        """Convolve array, pixels with a False mask value are treated as NaN. Returns float64 array."""
+        if self.backend == self.Direct:
+            from astropy.convolution import convolve, CustomKernel
+            return convolve(
+                array, CustomKernel(array=self.kernel), fill_value=np.nan,
+                nan_treatment='interpolate' if self.interpolate else 'fill', normalize_kernel=self.normalizeKernel,
+                mask=None if mask is None else np.logical_not(mask)
+            )
+
+        data = np.array(array, dtype=np.float64)
+        if mask is not None:
+            data[np.logical_not(mask)] = np.nan
+        invalid = np.isnan(data)
+        kernelSum = np.sum(self.kernel)
+        if (self.normalizeKernel or self.interpolate) and np.isclose(kernelSum, 0, atol=1e-8):
+            raise ValueError("The kernel can't be normalized, because its sum is close to zero.")
+
+        data[invalid] = 0
+        result = self.linearConvolve(data)
+        if self.interpolate:
+            # the NaN-filled boundary is interpolated as well, even if the data has no NaN pixels
+            # masked sum / masked kernel weight; falls back to the original value, if no pixel is valid
+            weights = self.linearConvolve(np.logical_not(invalid).astype(np.float64))
+            valid = np.abs(weights) > 1e-10 * np.sum(np.abs(self.kernel))
+            np.divide(result, weights, out=result, where=valid)
+            data[invalid] = np.nan
+            result[~valid] = data[~valid]
+            if not self.normalizeKernel:
+                result *= kernelSum
+        else:
+            # NaN propagates to all windows touching a NaN or the (NaN-filled) boundary
+            touched = self.windowCount(invalid) > 0
+            touched |= self.boundaryMask(data.shape)
+            result[touched] = np.nan
+            if self.normalizeKernel:
+                result /= kernelSum
+        return result
+
+    def linearConvolve(self, data: np.ndarray) -> np.ndarray:
+        # zero-filled linear convolution with the kernel, same output shape
+        if self.backend == self.Separable:
+            from scipy.ndimage import convolve1d
+            result = data
+            for axis, factor in enumerate(self.factors):
+                if len(factor) > 1:
+                    result = convolve1d(result, factor, axis=axis, mode='constant', cval=0.)
+                elif factor[0] != 1:
+                    result = result * factor[0]
+            return result
+        else:
+            from scipy.signal import fftconvolve
+            return fftconvolve(data, self.kernel, mode='same')
+
+    def windowCount(self, data: np.ndarray) -> np.ndarray:
+        # zero-filled moving window sum over the kernel footprint, as exact integer box sums
+        result = data.astype(np.int64)
+        for axis, size in enumerate(self.kernel.shape):
+            if size > 1:
+                result = self.boxSum(result, size, axis)
+        return result
+
+    @staticmethod
+    def boxSum(data: np.ndarray, size: int, axis: int) -> np.ndarray:
+        # centered moving window sum along an axis, zero-filled
+        half = size // 2
+        padWidth = [(0, 0)] * data.ndim
+        padWidth[axis] = (half + 1, half)
+        cumsum = np.cumsum(np.pad(data, padWidth), axis=axis)
+        n = data.shape[axis]
+        return np.take(cumsum, np.arange(size, size + n), axis) - np.take(cumsum, np.arange(n), axis)
+
+    def boundaryMask(self, shape) -> np.ndarray:
+        # pixels which kernel window exceeds the array
+        mask = np.zeros(shape, bool)
+        for axis, size in enumerate(self.kernel.shape):
+            half = size // 2
+            if half == 0:
+                continue
+            index = [slice(None)] * 3
+            index[axis] = slice(0, half)
+            mask[tuple(index)] = True
+            index[axis] = slice(shape[axis] - half, None)
+            mask[tuple(index)] = True
+        return mask
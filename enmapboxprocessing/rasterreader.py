@@ -1,5 +1,7 @@
-from math import isnan
-from typing import Iterable, List, Union, Optional
+from math import isnan, ceil, sqrt
+from queue import Queue, Full
+from threading import Thread, Event
+from typing import Iterable, List, Union, Optional, Tuple
 
 import numpy as np
 from PyQt5.QtCore import QSizeF
@@ -10,7 +12,7 @@ from qgis._core import (QgsRasterLayer, QgsRasterDataProvider, QgsCoordinateRefe
 
 from enmapboxprocessing.gridwalker import GridWalker
 from enmapboxprocessing.rasterblockinfo import RasterBlockInfo
-from enmapboxprocessing.typing import (QgisDataType, RasterSource, Array3d, Metadata, MetadataValue,
+from enmapboxprocessing.typing import (QgisDataType, RasterSource, Array2d, Array3d, Metadata, MetadataValue,
                                        MetadataDomain)
 from enmapboxprocessing.utils import Utils
 from typeguard import typechecked
@@ -45,6 +47,8 @@ class RasterReader(object):
         self.provider: QgsRasterDataProvider = provider
         self.gdalDataset = gdalDataset
         assert self.gdalDataset is not None
+        self._clearNoDataCache()
+        self._clearMetadataCache()
 
     def bandCount(self):
         return self.provider.bandCount()
@@ -80,6 +84,7 @@ class RasterReader(object):
         return self.gdalBand(bandNo).GetScale()
 
     def setUserNoDataValue(self, bandNo: int, noData: Iterable[QgsRasterRange]):
+        self._clearNoDataCache()
         return self.provider.setUserNoDataValue(bandNo, noData)
 
     def userNoDataValues(self, bandNo: int = None) -> List[QgsRasterRange]:
@@ -88,6 +93,7 @@ class RasterReader(object):
         return self.provider.userNoDataValues(bandNo)
 
     def setUseSourceNoDataValue(self, bandNo: int, use: bool):
+        self._clearNoDataCache()
         return self.provider.setUseSourceNoDataValue(bandNo, use)
 
     def sourceHasNoDataValue(self, bandNo: int = None):
@@ -129,6 +135,58 @@ class RasterReader(object):
             height = min(blockSizeY, int(round((blockExtent.yMaximum() - blockExtent.yMinimum()) / pixelSizeY)))
             yield RasterBlockInfo(blockExtent, xOffset, yOffset, width, height)
 
+    def iterBlockArrays(
+            self, blocks: Iterable[RasterBlockInfo], bandList: List[int] = None, overlap: int = None,
+            prefetch: int = 2
+    ):
+        """Yield (block, array) pairs, while upcoming blocks are read ahead in a background thread.
+
+        At most prefetch blocks are held in memory; the background thread waits if the consumer falls behind.
+        The background thread reads from its own reader, because data providers must not be shared between threads.
+        """
+        if prefetch < 1:
+            for block in blocks:
+                yield block, self.arrayFromBlock(block, bandList, overlap)
+            return
+
+        queue = Queue(maxsize=prefetch)
+        stopped = Event()
+        source = self.source()
+
+        def put(item) -> bool:
+            while not stopped.is_set():
+                try:
+                    queue.put(item, timeout=0.1)
+                    return True
+                except Full:
+                    continue
+            return False
+
+        def readAhead():
+            try:
+                reader = RasterReader(source)
+                for block in blocks:
+                    if not put((block, reader.arrayFromBlock(block, bandList, overlap))):
+                        return
+            except BaseException as error:
+                put(error)
+            finally:
+                put(None)
+
+        thread = Thread(target=readAhead, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = queue.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stopped.set()
+            thread.join()
+
     def arrayFromBlock(
             self, block: RasterBlockInfo, bandList: List[int] = None, overlap: int = None,
             feedback: QgsRasterBlockFeedback = None
@@ -154,13 +212,77 @@ class RasterReader(object):
             )
             width = width + 2 * overlap
             height = height + 2 * overlap
-        arrays = list()
+        bandList = list(bandList)
         for bandNo in bandList:
             assert 0 < bandNo <= self.bandCount()
+
+        # read all bands at once directly via GDAL, if the requested grid matches the native pixel grid, ...
+        window = self._nativePixelWindow(boundingBox, width, height)
+        if len(bandList) > 0 and window is not None and self._isGdalReadable(bandList):
+            xOffset, yOffset = window
+            dtype = Utils.gdalDataTypeToNumpyDataType(self.gdalBand(bandList[0]).DataType)
+            array = np.empty((len(bandList), height, width), dtype=dtype)
+            if len(bandList) == 1:
+                self.gdalBand(bandList[0]).ReadAsArray(xOffset, yOffset, width, height, buf_obj=array[0])
+            else:
+                try:
+                    self.gdalDataset.ReadAsArray(xOffset, yOffset, width, height, buf_obj=array, band_list=bandList)
+                except TypeError:  # older GDAL versions don't support the band_list keyword
+                    for bandNo, array2d in zip(bandList, array):
+                        self.gdalBand(bandNo).ReadAsArray(xOffset, yOffset, width, height, buf_obj=array2d)
+            return array
+
+        # ... otherwise, let the data provider do the resampling
+        arrays = list()
+        for bandNo in bandList:
             block: QgsRasterBlock = self.provider.block(bandNo, boundingBox, width, height, feedback)
-            array = Utils.qgsRasterBlockToNumpyArray(block=block)
-            arrays.append(array)
-        return arrays
+            arrays.append(Utils.qgsRasterBlockToNumpyArray(block=block))
+        dtypes = {a.dtype for a in arrays}
+        if len(dtypes) != 1:  # bands with different data types can't be stacked into a single array without casting
+            return [array.copy() for array in arrays]
+        array = np.empty((len(bandList), height, width), dtype=dtypes.pop())
+        for array2d, a in zip(array, arrays):
+            array2d[:] = a
+        return array
+
+    def _nativePixelWindow(self, boundingBox: QgsRectangle, width: int, height: int) -> Optional[Tuple[int, int]]:
+        """Return pixel offset of the bounding box, if it matches the native pixel grid and is fully covered."""
+        if width == 0 or height == 0:
+            return None
+        extent = self.extent()
+        resX = self.rasterUnitsPerPixelX()
+        resY = self.rasterUnitsPerPixelY()
+        tolerance = 1e-6
+        if abs(boundingBox.width() / width / resX - 1) > tolerance:
+            return None
+        if abs(boundingBox.height() / height / resY - 1) > tolerance:
+            return None
+        xOffset = (boundingBox.xMinimum() - extent.xMinimum()) / resX
+        yOffset = (extent.yMaximum() - boundingBox.yMaximum()) / resY
+        if abs(xOffset - round(xOffset)) > 1e-3 or abs(yOffset - round(yOffset)) > 1e-3:
+            return None
+        xOffset = int(round(xOffset))
+        yOffset = int(round(yOffset))
+        if xOffset < 0 or yOffset < 0 or xOffset + width > self.width() or yOffset + height > self.height():
+            return None
+        return xOffset, yOffset
+
+    def _isGdalReadable(self, bandList: List[int]) -> bool:
+        """Return whether GDAL returns the same values as the data provider for the given bands."""
+        if self.provider.name() != 'gdal':
+            return False
+        gdalDataTypes = {self.gdalBand(bandNo).DataType for bandNo in bandList}
+        if len(gdalDataTypes) != 1:
+            return False
+        gdalDataType = gdalDataTypes.pop()
+        try:
+            qgisDataType = Utils.gdalDataTypeToQgisDataType(gdalDataType)
+        except Exception:
+            return False
+        for bandNo in bandList:
+            if self.provider.dataType(bandNo) != qgisDataType:  # e.g. provider applies scale and offset
+                return False
+        return True
 
     def arrayFromPixelOffsetAndSize(
             self, xOffset: int, yOffset: int, width: int, height: int, bandList: List[int] = None, overlap: int = None,
@@ -205,45 +327,147 @@ class RasterReader(object):
     def maskArray(
             self, array: Array3d, bandList: List[int] = None, maskNotFinite=True, defaultNoDataValue: float = None
     ) -> Array3d:
+        """Return mask array, which is False for no data pixel and True otherwise.
+
+        No data values and user no data ranges are evaluated for all bands at once.
+        """
         if bandList is None:
             bandList = range(1, self.provider.bandCount() + 1)
+        bandList = list(bandList)
         assert len(bandList) == len(array)
-        maskArray = list()
-        for i, a in enumerate(array):
-            bandNo = i + 1
-            m = np.full_like(a, True, dtype=bool)
-            if self.provider.sourceHasNoDataValue(bandNo) and self.provider.useSourceNoDataValue(bandNo):
-                noDataValue = self.provider.sourceNoDataValue(bandNo)
-                if not isnan(noDataValue):
-                    m[a == noDataValue] = False
-            else:
-                if defaultNoDataValue is not None:
-                    m[a == defaultNoDataValue] = False
-            rasterRange: QgsRasterRange
-            for rasterRange in self.provider.userNoDataValues(bandNo):
-                if rasterRange.bounds() == QgsRasterRange.IncludeMinAndMax:
-                    contained = np.greater_equal(a, rasterRange.min())
-                    np.less_equal(a, rasterRange.max(), out=contained)
-                if rasterRange.bounds() == QgsRasterRange.IncludeMinAndMax:
-                    contained = np.greater_equal(a, rasterRange.min())
-                    np.less_equal(a, rasterRange.max(), out=contained)
-                elif rasterRange.bounds() == QgsRasterRange.IncludeMin:
-                    contained = np.greater_equal(a, rasterRange.min())
-                    np.less(a, rasterRange.max(), out=contained)
-                elif rasterRange.bounds() == QgsRasterRange.IncludeMax:
-                    contained = np.greater(a, rasterRange.min())
-                    np.less_equal(a, rasterRange.max(), out=contained)
-                elif rasterRange.bounds() == QgsRasterRange.Exclusive:
-                    contained = np.greater(a, rasterRange.min())
-                    np.less(a, rasterRange.max(), out=contained)
-                else:
-                    assert 0
-                m[contained] = False
-                if maskNotFinite:
-                    m[np.logical_not(np.isfinite(a))] = False
-            maskArray.append(m)
+        array = np.asarray(array)
+        maskArray = np.ones(array.shape, dtype=bool)
+        if len(bandList) == 0:
+            return maskArray
+        noDataValues, rasterRanges = self._noDataRules(bandList, defaultNoDataValue, array.dtype)
+
+        if not np.all(np.isnan(noDataValues)):
+            np.not_equal(array, noDataValues, out=maskArray)
+
+        for minimum, maximum, includeMinimum, includeMaximum in rasterRanges:
+            contained = self._compareToBandValues(array, minimum, includeMinimum, np.greater_equal, np.greater)
+            np.logical_and(
+                contained, self._compareToBandValues(array, maximum, includeMaximum, np.less_equal, np.less),
+                out=contained
+            )
+            maskArray[contained] = False
+
+        if maskNotFinite and np.issubdtype(array.dtype, np.floating):
+            np.logical_and(maskArray, np.isfinite(array), out=maskArray)
+
+        return maskArray
+
+    def maskArray2d(
+            self, array: Array3d, bandList: List[int] = None, maskNotFinite=True, defaultNoDataValue: float = None,
+            chunkSize=16
+    ) -> Array2d:
+        """Return 2d mask array, which is True for pixel that are valid in all bands.
+
+        Bands are processed in chunks, so the full 3d mask is never materialized.
+        """
+        if bandList is None:
+            bandList = range(1, self.provider.bandCount() + 1)
+        bandList = list(bandList)
+        assert len(bandList) == len(array)
+        maskArray = np.ones(np.shape(array[0]), dtype=bool)
+        for i in range(0, len(bandList), chunkSize):
+            marray = self.maskArray(array[i: i + chunkSize], bandList[i: i + chunkSize], maskNotFinite,
+                                    defaultNoDataValue)
+            np.logical_and(maskArray, np.all(marray, axis=0), out=maskArray)
         return maskArray
 
+    def packedMaskArray(
+            self, array: Array3d, bandList: List[int] = None, maskNotFinite=True, defaultNoDataValue: float = None
+    ) -> Array3d:
+        """Return mask array packed into bits along the band axis, see numpy.packbits and numpy.unpackbits."""
+        maskArray = self.maskArray(array, bandList, maskNotFinite, defaultNoDataValue)
+        return np.packbits(maskArray, axis=0, bitorder='little')
+
+    def _noDataRules(self, bandList: List[int], defaultNoDataValue: Optional[float], dtype: np.dtype):
+        """Return no data values and user no data ranges as arrays broadcastable to a 3d block.
+
+        For floating point blocks, values are cast to the block data type, like a scalar would be in a per-band
+        comparison. Otherwise, e.g. a no data value of -9999.9 would never match in a Float32 block.
+        """
+        dtype = np.dtype(dtype)
+        valueDtype = dtype if np.issubdtype(dtype, np.floating) else np.float64
+        key = tuple(bandList), defaultNoDataValue, valueDtype
+        rules = self._noDataRulesCache.get(key)
+        if rules is not None:
+            return rules
+
+        infos = [self._noDataInfo(bandNo) for bandNo in bandList]
+        noDataValues = list()
+        for noDataValue, _ in infos:
+            if noDataValue is None:
+                noDataValue = defaultNoDataValue
+            if noDataValue is None:
+                noDataValue = np.nan  # never matches, NaN pixels are handled via maskNotFinite
+            noDataValues.append(noDataValue)
+        noDataValues = np.array(noDataValues, dtype=np.float64).astype(valueDtype).reshape(-1, 1, 1)
+
+        rasterRanges = list()
+        for i in range(max(len(rasterRanges_) for _, rasterRanges_ in infos)):
+            minimum, maximum, includeMinimum, includeMaximum = list(), list(), list(), list()
+            for _, rasterRanges_ in infos:
+                if i < len(rasterRanges_):
+                    rasterRange = rasterRanges_[i]
+                else:
+                    rasterRange = np.nan, np.nan, True, True  # never contains a value
+                minimum.append(rasterRange[0])
+                maximum.append(rasterRange[1])
+                includeMinimum.append(rasterRange[2])
+                includeMaximum.append(rasterRange[3])
+            rasterRanges.append((
+                np.array(minimum, dtype=np.float64).astype(valueDtype).reshape(-1, 1, 1),
+                np.array(maximum, dtype=np.float64).astype(valueDtype).reshape(-1, 1, 1),
+                np.array(includeMinimum).reshape(-1, 1, 1),
+                np.array(includeMaximum).reshape(-1, 1, 1)
+            ))
+
+        rules = noDataValues, rasterRanges
+        self._noDataRulesCache[key] = rules
+        return rules
+
+    def _noDataInfo(self, bandNo: int):
+        """Return source no data value (if used) and user no data ranges of a band, queried only once."""
+        info = self._noDataInfoCache.get(bandNo)
+        if info is not None:
+            return info
+        noDataValue = None
+        if self.provider.sourceHasNoDataValue(bandNo) and self.provider.useSourceNoDataValue(bandNo):
+            noDataValue = self.provider.sourceNoDataValue(bandNo)  # may be NaN, which is covered by maskNotFinite
+        rasterRanges = list()
+        rasterRange: QgsRasterRange
+        for rasterRange in self.provider.userNoDataValues(bandNo):
+            bounds = rasterRange.bounds()
+            if bounds == QgsRasterRange.IncludeMinAndMax:
+                includeMinimum, includeMaximum = True, True
+            elif bounds == QgsRasterRange.IncludeMin:
+                includeMinimum, includeMaximum = True, False
+            elif bounds == QgsRasterRange.IncludeMax:
+                includeMinimum, includeMaximum = False, True
+            elif bounds == QgsRasterRange.Exclusive:
+                includeMinimum, includeMaximum = False, False
+            else:
+                assert 0
+            rasterRanges.append((rasterRange.min(), rasterRange.max(), includeMinimum, includeMaximum))
+        info = noDataValue, rasterRanges
+        self._noDataInfoCache[bandNo] = info
+        return info
+
+    def _clearNoDataCache(self):
+        self._noDataInfoCache = dict()
+        self._noDataRulesCache = dict()
+
+    @staticmethod
+    def _compareToBandValues(array: np.ndarray, values: np.ndarray, inclusive: np.ndarray, inclusiveOp, exclusiveOp):
+        if np.all(inclusive):
+            return inclusiveOp(array, values)
+        if not np.any(inclusive):
+            return exclusiveOp(array, values)
+        return np.where(inclusive, inclusiveOp(array, values), exclusiveOp(array, values))
+
     def metadataItem(self, key: str, domain: str = '', bandNo: int = None) -> Optional[MetadataValue]:
         string = self._gdalObject(bandNo).GetMetadataItem(key, domain)
         if string is None:
@@ -252,6 +476,11 @@ class RasterReader(object):
             return None
         return Utils.stringToMetadateValue(string)
 
+    def setMetadataItem(self, key: str, value: MetadataValue, domain: str = '', bandNo: int = None):
+        """Set metadata item (stored in the GDAL PAM auxiliary file) and invalidate cached spectral metadata."""
+        self._clearMetadataCache()
+        self._gdalObject(bandNo).SetMetadataItem(key, Utils.metadateValueToString(value), domain)
+
     def metadataDomain(self, domain: str = '', bandNo: int = None) -> MetadataDomain:
         return {
             key: Utils.stringToMetadateValue(value)
@@ -266,10 +495,7 @@ class RasterReader(object):
         if quickCheck:
             return self.wavelength(1) is not None
         else:
-            for bandNo in range(1, self.bandCount() + 1):
-                if self.wavelength(bandNo) is None:
-                    return False
-            return True
+            return not np.any(np.isnan(self.wavelengths()))
 
     def findBandName(self, bandName: str) -> int:
         for bandNo in range(1, self.bandCount() + 1):
@@ -278,18 +504,12 @@ class RasterReader(object):
         raise ValueError(f'unknown band name: {bandName}')
 
     def findWavelength(self, wavelength: Optional[float]) -> Optional[int]:
-        bandNos = list()
-        distances = list()
-        for bandNo in range(1, self.bandCount() + 1):
-            wavelength_ = self.wavelength(bandNo)
-            if wavelength is None:
-                continue
-            bandNos.append(bandNo)
-            distances.append(abs(wavelength_ - wavelength))
-        if len(bandNos) == 0:
+        if wavelength is None:
             return None
-
-        return bandNos[np.argmin(distances)]
+        distances = np.abs(self.wavelengths() - wavelength)
+        if np.all(np.isnan(distances)):
+            return None
+        return int(np.nanargmin(distances)) + 1
 
     def wavelengthUnits(self, bandNo: int) -> Optional[str]:
         """Return wavelength units."""
@@ -309,90 +529,144 @@ class RasterReader(object):
 
     def wavelength(self, bandNo: int, units: str = None) -> Optional[float]:
         """Return band center wavelength in nanometers. Optionally, specify destination units."""
-        wavelength = self.metadataItem('wavelength', '', bandNo)
-        if wavelength is None:
-            wavelengths = self.metadataItem('wavelength', 'ENVI')
-            if wavelengths is None:
-                return None
-            else:
-                wavelength = wavelengths[bandNo - 1]
-                wavelength_units = self.metadataItem('wavelength_units', 'ENVI')
-        else:
-            wavelength_units = self.metadataItem('wavelength_units', '', bandNo)
-
-        # convert to nanometers
-        if wavelength_units.lower() in ['micrometers', 'um']:
-            scale = 1000.
-        elif wavelength_units.lower() in ['nanometers', 'nm']:
-            scale = 1.
-        else:
-            raise ValueError(f'unsupported wavelength units: {wavelength_units}')
-        wavelength = float(wavelength) * scale
-
-        # convert to destination units
-        if units is not None:
-            if units.lower() in ['micrometers', 'um']:
-                scale = 1 / 1000.
-            elif units.lower() in ['nanometers', 'nm']:
-                scale = 1.
-            else:
-                raise ValueError(f'unsupported wavelength units: {units}')
-            wavelength *= scale
+        wavelength = self.wavelengths()[bandNo - 1]
+        if isnan(wavelength):
+            return None
+        return float(wavelength) * self._nanometersToUnitsScale(units)
 
-        return wavelength
+    def wavelengths(self, units: str = None) -> np.ndarray:
+        """Return center wavelength of all bands in nanometers (NaN if undefined). Optionally, specify destination units.
+        """
+        return self._spectralMetadata('wavelength') * self._nanometersToUnitsScale(units)
 
     def fwhm(self, bandNo: int, units: str = None) -> Optional[float]:
         """Return band FWHM in nanometers. Optionally, specify destination units."""
-        fwhm = self.metadataItem('fwhm', '', bandNo)
-        if fwhm is None:
-            fwhms = self.metadataItem('fwhm', 'ENVI')
-            if fwhms is None:
-                return None
-            else:
-                fwhm = fwhms[bandNo - 1]
-                wavelength_units = self.metadataItem('wavelength_units', 'ENVI')
-        else:
-            wavelength_units = self.metadataItem('wavelength_units', '', bandNo)
-
-        # convert to nanometers
-        if wavelength_units.lower() in ['micrometers', 'um']:
-            scale = 1000.
-        elif wavelength_units.lower() in ['nanometers', 'nm']:
-            scale = 1.
-        else:
-            raise ValueError(f'unsupported wavelength units: {wavelength_units}')
-        fwhm = float(fwhm) * scale
-
-        # convert to destination units
-        if units is not None:
-            if units.lower() in ['micrometers', 'um']:
-                scale = 1 / 1000.
-            elif units.lower() in ['nanometers', 'nm']:
-                scale = 1.
-            else:
-                raise ValueError(f'unsupported wavelength units: {units}')
-            fwhm *= scale
-
-        return fwhm
+        fwhm = self.fwhms()[bandNo - 1]
+        if isnan(fwhm):
+            return None
+        return float(fwhm) * self._nanometersToUnitsScale(units)
 
+    def fwhms(self, units: str = None) -> np.ndarray:
+        """Return FWHM of all bands in nanometers (NaN if undefined). Optionally, specify destination units."""
+        return self._spectralMetadata('fwhm') * self._nanometersToUnitsScale(units)
 
     def badBandMultiplier(self, bandNo: int) -> Optional[int]:
         """Return bad band multiplier, typically 0 for bad bands and 1 for good bands."""
-        badBandMultiplier = self.metadataItem('bad band multiplier', '', bandNo)
-        if badBandMultiplier is None:
-            bbl = self.metadataItem('bbl', 'ENVI')
-            if bbl is None:
-                return 1
+        return int(self.badBandMultipliers()[bandNo - 1])
+
+    def badBandMultipliers(self) -> np.ndarray:
+        """Return bad band multiplier of all bands, typically 0 for bad bands and 1 for good bands."""
+        badBandMultipliers = self._metadataCache.get('bad band multiplier')
+        if badBandMultipliers is None:
+            bbl = None
+            badBandMultipliers = np.ones(self.bandCount(), dtype=int)
+            for bandNo in range(1, self.bandCount() + 1):
+                badBandMultiplier = self.metadataItem('bad band multiplier', '', bandNo)
+                if badBandMultiplier is None:
+                    if bbl is None:
+                        bbl = self.metadataItem('bbl', 'ENVI')
+                        if bbl is None:
+                            bbl = [1] * self.bandCount()
+                    badBandMultiplier = bbl[bandNo - 1]
+                badBandMultipliers[bandNo - 1] = int(badBandMultiplier)
+            badBandMultipliers.flags.writeable = False
+            self._metadataCache['bad band multiplier'] = badBandMultipliers
+        return badBandMultipliers
+
+    def _spectralMetadata(self, key: str) -> np.ndarray:
+        """Return wavelength or fwhm of all bands in nanometers, parsed only once."""
+        values = self._metadataCache.get(key)
+        if values is not None:
+            return values
+
+        values = np.full(self.bandCount(), np.nan, dtype=np.float64)
+        enviValues = enviScale = None
+        for bandNo in range(1, self.bandCount() + 1):
+            value = self.metadataItem(key, '', bandNo)
+            if value is not None:
+                scale = self._unitsToNanometersScale(self.metadataItem('wavelength_units', '', bandNo))
             else:
-                badBandMultiplier = bbl[bandNo - 1]
-        return int(badBandMultiplier)
+                if enviValues is None:
+                    enviValues = self.metadataItem(key, 'ENVI')
+                    if enviValues is None:
+                        enviValues = [None] * self.bandCount()
+                    else:
+                        enviScale = self._unitsToNanometersScale(self.metadataItem('wavelength_units', 'ENVI'))
+                value = enviValues[bandNo - 1]
+                scale = enviScale
+            if value is not None:
+                values[bandNo - 1] = float(value) * scale
+
+        values.flags.writeable = False
+        self._metadataCache[key] = values
+        return values
+
+    def _clearMetadataCache(self):
+        self._metadataCache = dict()
+
+    @staticmethod
+    def _unitsToNanometersScale(units: Optional[str]) -> float:
+        if units is not None and units.lower() in ['micrometers', 'um']:
+            return 1000.
+        elif units is not None and units.lower() in ['nanometers', 'nm']:
+            return 1.
+        else:
+            raise ValueError(f'unsupported wavelength units: {units}')
+
+    @classmethod
+    def _nanometersToUnitsScale(cls, units: Optional[str]) -> float:
+        if units is None:
+            return 1.
+        return 1. / cls._unitsToNanometersScale(units)
 
     def lineMemoryUsage(self, nBands: int = None, dataTypeSize: int = None) -> int:
+        return self.width() * self.pixelMemoryUsage(nBands, dataTypeSize)
+
+    def pixelMemoryUsage(self, nBands: int = None, dataTypeSize: int = None) -> int:
         if nBands is None:
             nBands = self.bandCount()
         if dataTypeSize is None:
             dataTypeSize = self.dataTypeSize()
-        return self.width() * nBands * dataTypeSize
+        return nBands * dataTypeSize
+
+    def gdalBlockSize(self, bandNo: int = None) -> Tuple[int, int]:
+        """Return the native storage block size (x, y), e.g. the GTiff tile size or (width, 1) for scanline files."""
+        if bandNo is None:
+            bandNo = 1
+        blockSizeX, blockSizeY = self.gdalBand(bandNo).GetBlockSize()
+        return min(max(blockSizeX, 1), self.width()), min(max(blockSizeY, 1), self.height())
+
+    def planBlockSize(self, pixelMemoryUsage: int, maximumMemoryUsage: int = None) -> Tuple[int, int]:
+        """Return a block size (x, y) that fits into the memory budget and is aligned to the native storage blocks.
+
+        The pixel memory usage must cover everything an algorithm holds per pixel of a block,
+        i.e. input arrays, masks, temporaries and outputs.
+        The memory budget defaults to Utils.maximumMemoryUsage().
+        """
+        if maximumMemoryUsage is None:
+            maximumMemoryUsage = Utils.maximumMemoryUsage()
+        maximumPixels = max(1, maximumMemoryUsage // max(1, pixelMemoryUsage))
+        width = self.width()
+        height = self.height()
+        nativeX, nativeY = self.gdalBlockSize()
+
+        # prefer full-width strips covering complete rows of native blocks, ...
+        if maximumPixels >= width * nativeY:
+            blockSizeY = maximumPixels // width // nativeY * nativeY
+            return width, min(height, blockSizeY)
+
+        # ... otherwise use tiles made up of native blocks, ...
+        if maximumPixels >= nativeX * nativeY:
+            nBlocks = maximumPixels // (nativeX * nativeY)
+            nBlocksX = min(ceil(width / nativeX), max(1, int(sqrt(nBlocks))))
+            nBlocksY = max(1, nBlocks // nBlocksX)
+            return min(width, nBlocksX * nativeX), min(height, nBlocksY * nativeY)
+
+        # ... and split the native blocks only if a single one exceeds the budget
+        if maximumPixels >= width:
+            return width, min(height, maximumPixels // width)
+        blockSize = max(1, int(sqrt(maximumPixels)))
+        return min(width, blockSize), min(height, blockSize)
 
     def _gdalObject(self, bandNo: int = None) -> Union[gdal.Band, gdal.Dataset]:
         if bandNo is None:
@@ -1,3 +1,5 @@
+from queue import Queue
+from threading import Thread
 from typing import List, Union, Optional
 
 from PyQt5.QtGui import QColor
@@ -164,3 +166,71 @@ class RasterWriter(object):
     def close(self):
         self.gdalDataset.FlushCache()
         self.gdalDataset = None
+
+
+@typechecked
+class AsyncRasterWriter(object):
+    """Write arrays in a background thread, so that writing overlaps with reading and computing.
+
+    At most maxsize arrays are queued; writeArray blocks if the background thread falls behind.
+    As long as the queue is open, the wrapped writer must not be used from other threads.
+    Errors raised while writing are re-raised by the next call to writeArray, flush or close.
+    """
+
+    def __init__(self, writer: RasterWriter, maxsize: int = 2):
+        self.writer = writer
+        self._queue = Queue(maxsize=maxsize)
+        self._error: Optional[BaseException] = None
+        self._thread = Thread(target=self._writeBehind, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if excType is None:
+            self.close()
+        else:  # do not mask the original error
+            try:
+                self.close()
+            except Exception:
+                pass
+
+    def _writeBehind(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is None:  # after an error, just drain the queue
+                    method, args = item
+                    method(*args)
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _raiseError(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def writeArray(self, array: Array3d, xOffset=0, yOffset=0, bandList: List[int] = None, overlap: int = None):
+        self._raiseError()
+        self._queue.put((self.writer.writeArray, (array, xOffset, yOffset, bandList, overlap)))
+
+    def writeArray2d(self, array: Array2d, bandNo: int, xOffset=0, yOffset=0, overlap: int = None):
+        self._raiseError()
+        self._queue.put((self.writer.writeArray2d, (array, bandNo, xOffset, yOffset, overlap)))
+
+    def flush(self):
+        """Wait until all queued arrays are written."""
+        self._queue.join()
+        self._raiseError()
+
+    def close(self):
+        """Wait until all queued arrays are written and stop the background thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raiseError()
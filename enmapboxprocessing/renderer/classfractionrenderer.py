@@ -11,7 +11,7 @@ from PyQt5.QtWidgets import QWidget, QToolButton, QTreeWidget, QTreeWidgetItem,
     QApplication, QMessageBox, QMainWindow
 from PyQt5.uic import loadUi
 from qgis._core import QgsRasterRenderer, QgsRasterInterface, QgsRectangle, QgsRasterBlockFeedback, QgsRasterBlock, \
-    Qgis, QgsRasterLayer
+    QgsRasterLayer
 from qgis._gui import QgsRasterBandComboBox, QgsColorButton
 
 from enmapbox.externals.qps.layerproperties import rendererFromXml
@@ -63,9 +63,7 @@ class ClassFractionRenderer(QgsRasterRenderer):
         np.clip(b, 0, 255, b)
 
         # convert back to QGIS raster block
-        rgba = np.array([r, g, b, a], dtype=np.uint32)
-        outarray = (rgba[0] << 16) + (rgba[1] << 8) + rgba[2] + (rgba[3] << 24)
-        return Utils.numpyArrayToQgsRasterBlock(outarray, Qgis.ARGB32_Premultiplied)
+        return Utils.numpyRgbaToQgsRasterBlock(r, g, b, a)
 
     def clone(self) -> QgsRasterRenderer:
         renderer = ClassFractionRenderer()
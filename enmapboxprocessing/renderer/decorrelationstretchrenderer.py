@@ -6,7 +6,7 @@ import numpy as np
 from PyQt5.QtWidgets import QWidget, QToolButton, QCheckBox, \
     QMainWindow, QComboBox
 from PyQt5.uic import loadUi
-from qgis._core import QgsRasterRenderer, QgsRasterInterface, QgsRectangle, QgsRasterBlockFeedback, Qgis, \
+from qgis._core import QgsRasterRenderer, QgsRasterInterface, QgsRectangle, QgsRasterBlockFeedback, \
     QgsRasterLayer, QgsMultiBandColorRenderer, QgsCoordinateTransform, QgsProject
 from qgis._gui import QgsMapCanvas, QgsRasterBandComboBox, QgsDoubleSpinBox
 
@@ -48,7 +48,7 @@ class DecorrelationStretchRenderer(QgsRasterRenderer):
         # read data
         reader = RasterReader(self.input())
         array = reader.array(width=width, height=height, bandList=self.bandList, boundingBox=extent)
-        maskArray = np.all(reader.maskArray(array, self.bandList), axis=0)
+        maskArray = reader.maskArray2d(array, self.bandList)
 
         # convert to sklearn sample format
         X = np.transpose([a[maskArray] for a in array])
@@ -70,8 +70,7 @@ class DecorrelationStretchRenderer(QgsRasterRenderer):
         a[maskArray] = 255
 
         # convert back to QGIS raster block
-        outarray = (r << 16) + (g << 8) + b + (a << 24)
-        return Utils.numpyArrayToQgsRasterBlock(outarray, Qgis.ARGB32_Premultiplied)
+        return Utils.numpyRgbaToQgsRasterBlock(r, g, b, a)
 
     def clone(self) -> QgsRasterRenderer:
         renderer = DecorrelationStretchRenderer()
@@ -181,7 +180,7 @@ class DecorrelationStretchRendererWidget(QMainWindow):
         # read trainings data
         reader = RasterReader(self.layer)
         array = reader.array(bandList=bandList, width=width, height=height, boundingBox=extent)
-        maskArray = np.all(reader.maskArray(array, bandList), axis=0)
+        maskArray = reader.maskArray2d(array, bandList)
 
         # fit transformers
         X = np.transpose([a[maskArray] for a in array])
@@ -5,7 +5,7 @@ import numpy as np
 from PyQt5.QtWidgets import QWidget, QToolButton, QCheckBox, \
     QMainWindow, QComboBox, QRadioButton, QLineEdit
 from PyQt5.uic import loadUi
-from qgis._core import QgsRasterRenderer, QgsRasterInterface, QgsRectangle, QgsRasterBlockFeedback, Qgis, \
+from qgis._core import QgsRasterRenderer, QgsRasterInterface, QgsRectangle, QgsRasterBlockFeedback, \
     QgsRasterLayer, QgsMultiBandColorRenderer, QgsCoordinateTransform, QgsProject
 from qgis._gui import QgsMapCanvas, QgsRasterBandComboBox, QgsDoubleSpinBox
 from sklearn.decomposition import PCA
@@ -42,7 +42,7 @@ class SpectralSimilarityRenderer(QgsRasterRenderer):
         # read data
         reader = RasterReader(self.input())
         array = reader.array(width=width, height=height, boundingBox=extent)
-        maskArray = np.all(reader.maskArray(array), axis=0)
+        maskArray = reader.maskArray2d(array)
 
         # calculate max. similarity over all endmember
         array = np.array(array, dtype=np.float32)
@@ -56,15 +56,11 @@ class SpectralSimilarityRenderer(QgsRasterRenderer):
         scale = self.maximumValue - self.minimumValue
         minRmse = (minRmse - self.minimumValue) * (255 / scale)
         np.clip(minRmse, 0, 255, out=minRmse)
-        minRmse = np.array(minRmse, np.uint32)
+        minRmse = np.array(minRmse, np.uint8)
 
         # convert back to QGIS raster block
-        r = g = b = minRmse
-
-        a = np.zeros((height, width), dtype=np.uint32)
-        a[maskArray] = 255
-        outarray = (r << 16) + (g << 8) + b + (a << 24)
-        return Utils.numpyArrayToQgsRasterBlock(outarray, Qgis.ARGB32_Premultiplied)
+        a = np.multiply(maskArray, 255, dtype=np.uint8)
+        return Utils.numpyRgbaToQgsRasterBlock(minRmse, minRmse, minRmse, a)
 
     def clone(self) -> QgsRasterRenderer:
         renderer = SpectralSimilarityRenderer()
@@ -155,7 +151,7 @@ class SpectralSimilarityRendererWidget(QMainWindow):
         # read trainings data
         reader = RasterReader(self.layer)
         array = reader.array(bandList=bandList, width=width, height=height, boundingBox=extent)
-        maskArray = np.all(reader.maskArray(array, bandList), axis=0)
+        maskArray = reader.maskArray2d(array, bandList)
 
         # fit transformers
         X = np.transpose([a[maskArray] for a in array])
@@ -0,0 +1,117 @@
+import hashlib
+import json
+from collections import OrderedDict
+from io import BytesIO
+from os import makedirs, replace, getpid
+from os.path import join, exists
+from shutil import rmtree
+from tempfile import gettempdir
+from threading import Lock, get_ident
+from typing import Dict, List, Tuple, Callable, Optional
+
+import numpy as np
+
+from typeguard import typechecked
+
+Responses = Dict[str, List[Tuple[int, float]]]
+
+
+@typechecked
+class SpectralResponseCache(object):
+    """Cache compiled spectral response functions and resampling weight matrices.
+
+    Response functions are keyed by the sensor definition code, weight matrices additionally by the source wavelength
+    grid (in full nanometers). Both are kept in memory and persisted inside the cache directory,
+    so that identical definitions are only compiled once, also across processes.
+    Set Directory to None to disable persistence. Increase Version, if the compiled results change.
+    """
+
+    Version = 1
+    Directory: Optional[str] = join(gettempdir(), 'EnMAPBox', 'SpectralResponseCache')
+    _responses: Dict[str, Responses] = dict()
+    _matrices: Dict[str, np.ndarray] = dict()
+    _lock = Lock()
+
+    @classmethod
+    def responsesKey(cls, code: str) -> str:
+        return hashlib.sha1(f'{cls.Version}:{code}'.encode()).hexdigest()
+
+    @classmethod
+    def matrixKey(cls, code: str, wavelength: List[float]) -> str:
+        grid = json.dumps([int(round(v)) for v in wavelength])
+        return hashlib.sha1(f'{cls.Version}:{code}:{grid}'.encode()).hexdigest()
+
+    @classmethod
+    def responses(cls, code: str, compile: Callable[[], Responses]) -> Responses:
+        """Return compiled response functions for the given sensor definition code, compile them if not cached."""
+        key = cls.responsesKey(code)
+        with cls._lock:
+            responses = cls._responses.get(key)
+        if responses is not None:
+            return responses
+
+        filename = cls.filename(key, '.json')
+        if filename is not None and exists(filename):
+            with open(filename) as file:
+                responses = OrderedDict(
+                    (name, [(int(x), float(y)) for x, y in values]) for name, values in json.load(file)
+                )
+        else:
+            responses = compile()
+            if filename is not None:
+                cls.atomicWrite(filename, json.dumps(list(responses.items())).encode())
+
+        with cls._lock:
+            cls._responses[key] = responses
+        return responses
+
+    @classmethod
+    def matrix(cls, code: str, wavelength: List[float], compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """Return resampling weight matrix for the given sensor definition code and source wavelength grid,
+        compute it if not cached. The returned array is read-only."""
+        key = cls.matrixKey(code, wavelength)
+        with cls._lock:
+            matrix = cls._matrices.get(key)
+        if matrix is not None:
+            return matrix
+
+        filename = cls.filename(key, '.npy')
+        if filename is not None and exists(filename):
+            matrix = np.load(filename)
+        else:
+            matrix = np.asarray(compute(), dtype=np.float64)
+            if filename is not None:
+                buffer = BytesIO()
+                np.save(buffer, matrix)
+                cls.atomicWrite(filename, buffer.getvalue())
+        matrix.setflags(write=False)
+
+        with cls._lock:
+            cls._matrices[key] = matrix
+        return matrix
+
+    @classmethod
+    def clear(cls, memoryOnly=False):
+        with cls._lock:
+            cls._responses.clear()
+            cls._matrices.clear()
+        if not memoryOnly and cls.Directory is not None and exists(cls.Directory):
+            rmtree(cls.Directory, ignore_errors=True)
+
+    @classmethod
+    def filename(cls, key: str, extension: str) -> Optional[str]:
+        if cls.Directory is None:
+            return None
+        return join(cls.Directory, key + extension)
+
+    @classmethod
+    def atomicWrite(cls, filename: str, data: bytes):
+        # write to a temporary file first, so that concurrent runs never see partially written cache entries
+        try:
+            makedirs(cls.Directory, exist_ok=True)
+            tmpFilename = f'{filename}.{getpid()}.{get_ident()}.tmp'
+            with open(tmpFilename, 'wb') as file:
+                file.write(data)
+            replace(tmpFilename, filename)
+        except OSError:
+            pass  # cache directory not writable, only keep the memory cache
@@ -3,7 +3,8 @@ from qgis._core import QgsRasterLayer, QgsVectorLayer
 
 from enmapbox.exampledata import landcover_polygons
 from enmapboxprocessing.algorithm.classificationperformancestratifiedalgorithm import (
-    stratifiedAccuracyAssessment, ClassificationPerformanceStratifiedAlgorithm
+    stratifiedAccuracyAssessment, ClassificationPerformanceStratifiedAlgorithm, StratifiedConfusionMatrixAccumulator,
+    stratifiedAccuracyAssessmentFromCounts, lookupIndices
 )
 from enmapboxprocessing.test.algorithm.testcase import TestCase
 from enmapboxtestdata import landcover_map_l3
@@ -77,6 +78,45 @@ class Test_aa_stratified(TestCase):
         self.assertEqual(1., result.overall_accuracy)
         self.assertTrue(np.isnan(result.overall_accuracy_se))
 
+    def test_accumulator_blockwise(self):
+        # stratum, map class and reference class indices; index 2 is outside of all classes
+        stratum = np.array([[0, 0, 0, 0], [1, 1, 1, 1], [1, 1, 1, 1]])
+        map = np.array([[0, 0, 1, 2], [0, 1, 1, 1], [1, 1, 0, 0]])
+        reference = np.array([[0, 1, 1, 1], [0, 0, 1, 2], [1, 1, 0, 1]])
+        valid = reference < 2
+
+        accumulator = StratifiedConfusionMatrixAccumulator(2, 2)
+        for rows in [slice(0, 1), slice(1, 3)]:
+            accumulator.update(stratum[rows], map[rows], reference[rows], valid[rows])
+        gold = [[[1, 1, 0], [0, 1, 0], [0, 1, 0]],
+                [[2, 1, 0], [1, 3, 0], [0, 0, 0]],
+                [[0, 0, 0], [0, 0, 0], [0, 0, 0]]]
+        self.assertListEqual(gold, accumulator.counts.tolist())
+        self.assertListEqual([4, 8, 0], accumulator.stratumSizes.tolist())
+
+        # hand-computed estimates for stratum sizes N_h = [40, 80], i.e. stratum weights 1/3 and 2/3,
+        # and per-stratum sample sizes n_h = [4, 7]
+        stats = stratifiedAccuracyAssessmentFromCounts(accumulator.counts[:-1], [40, 80], [0, 1], ['A', 'B'])
+        self.assertEqual(11, stats.n)
+        self.assertAlmostEqual(1 / 3 * 1 / 4 + 2 / 3 * 1 / 7, stats.confusion_matrix_proportions[0][1])
+        self.assertAlmostEqual(1 / 3 * 2 / 4 + 2 / 3 * 5 / 7, stats.overall_accuracy)
+        # variance terms W_h^2 * (1 - n_h / N_h) * s_h^2 / n_h, with s_h^2 = p_h * (1 - p_h) * n_h / (n_h - 1)
+        oa_var = (1 / 3) ** 2 * (1 - 4 / 40) * (1 / 2 * 1 / 2 * 4 / 3) / 4 \
+                 + (2 / 3) ** 2 * (1 - 7 / 80) * (5 / 7 * 2 / 7 * 7 / 6) / 7
+        self.assertAlmostEqual(np.sqrt(oa_var), stats.overall_accuracy_se)
+        self.assertAlmostEqual(1 / 3 * 1 / 4 + 2 / 3 * 3 / 7, stats.area_proportion[0])
+        self.assertAlmostEqual(
+            (1 / 3 * 1 / 4 + 2 / 3 * 2 / 7) / (1 / 3 * 2 / 4 + 2 / 3 * 3 / 7), stats.users_accuracy[0]
+        )
+        self.assertAlmostEqual(
+            (1 / 3 * 1 / 4 + 2 / 3 * 3 / 7) / (1 / 3 * 3 / 4 + 2 / 3 * 4 / 7), stats.producers_accuracy[1]
+        )
+
+    def test_lookupIndices(self):
+        array = np.array([[10, 20], [30, 40]])
+        self.assertTrue(np.array_equal([[1, 9], [0, 9]], lookupIndices(array, [30, 10], [0, 1], 9)))
+        self.assertTrue(np.array_equal([[9, 9], [9, 9]], lookupIndices(array, [], [], 9)))
+
 
 class TestClassificationPerformanceAlgorithm(TestCase):
 
@@ -75,7 +75,7 @@ class TestCreateRgbImageFromClassProbabilityAlgorithm(TestCase):
         self.assertEqual(16826968, np.sum(RasterReader(result[alg.P_OUTPUT_RGB]).array()))
 
         # test colors from list
-        colors = str([c.color for c in ClassifierDump(**Utils.pickleLoad(classifierDumpPkl)).categories])
+        colors = str([c.color for c in ClassifierDump(**Utils.datasetLoad(classifierDumpPkl)).categories])
         parameters = {
             alg.P_PROBABILITY: parametersPredict2[algPredict2.P_OUTPUT_PROBABILITY],
             alg.P_COLORS: colors,
@@ -89,3 +89,24 @@ class TestPredictClassificationAlgorithm(TestCase):
         }
         result = self.runalg(alg, parameters)
         self.assertEqual(3277, np.sum(RasterReader(result[alg.P_OUTPUT_CLASSIFICATION]).array()))
+
+    def test_numberOfWorkers(self):
+        algFit = FitTestClassifierAlgorithm()
+        algFit.initAlgorithm()
+        parametersFit = {
+            algFit.P_DATASET: classifierDumpPkl,
+            algFit.P_CLASSIFIER: algFit.defaultCodeAsString(),
+            algFit.P_OUTPUT_CLASSIFIER: self.filename('classifier.pkl')
+        }
+        self.runalg(algFit, parametersFit)
+
+        alg = PredictClassificationAlgorithm()
+        alg.initAlgorithm()
+        parameters = {
+            alg.P_RASTER: enmap,
+            alg.P_CLASSIFIER: parametersFit[algFit.P_OUTPUT_CLASSIFIER],
+            alg.P_NUMBER_OF_WORKERS: 4,
+            alg.P_OUTPUT_CLASSIFICATION: self.filename('classification.tif')
+        }
+        result = self.runalg(alg, parameters)
+        self.assertEqual(127249, np.sum(RasterReader(result[alg.P_OUTPUT_CLASSIFICATION]).array()))
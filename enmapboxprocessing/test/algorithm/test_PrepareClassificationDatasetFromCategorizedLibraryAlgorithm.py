@@ -17,7 +17,7 @@ class TestPrepareClassificationDatasetFromCategorizedLibrary(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('sample.pkl')
         }
         self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET]))
         self.assertEqual((75, 177), dump.X.shape)
         self.assertEqual((75, 1), dump.y.shape)
         self.assertEqual(177, len(dump.features))
@@ -30,7 +30,7 @@ class TestPrepareClassificationDatasetFromCategorizedLibrary(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('sample.pkl')
         }
         self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET]))
         self.assertEqual((75, 177), dump.X.shape)
         self.assertEqual((75, 1), dump.y.shape)
         self.assertEqual(177, len(dump.features))
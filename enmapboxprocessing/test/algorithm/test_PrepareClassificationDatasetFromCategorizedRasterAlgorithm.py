@@ -1,10 +1,13 @@
+import numpy as np
 from qgis._core import QgsRasterLayer
 
 from enmapbox.exampledata import enmap
 from enmapboxprocessing.algorithm.prepareclassificationdatasetfromcategorizedrasteralgorithm import \
     PrepareClassificationDatasetFromCategorizedRasterAlgorithm
+from enmapboxprocessing.driver import Driver
+from enmapboxprocessing.rasterreader import RasterReader
 from enmapboxprocessing.test.algorithm.testcase import TestCase
-from enmapboxprocessing.typing import ClassifierDump
+from enmapboxprocessing.typing import ClassifierDump, Category
 from enmapboxprocessing.utils import Utils
 from enmapboxtestdata import landcover_raster_30m
 
@@ -19,7 +22,7 @@ class TestPrepareClassificationSampleFromCategorizedRaster(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('sample.pkl')
         }
         self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET]))
         self.assertEqual((2028, 177), dump.X.shape)
         self.assertEqual((2028, 1), dump.y.shape)
         self.assertEqual(177, len(dump.features))
@@ -38,7 +41,7 @@ class TestPrepareClassificationSampleFromCategorizedRaster(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('sample.pkl')
         }
         self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET]))
         self.assertEqual((2028, 177), dump.X.shape)
         self.assertEqual((2028, 1), dump.y.shape)
         self.assertEqual(177, len(dump.features))
@@ -55,9 +58,29 @@ class TestPrepareClassificationSampleFromCategorizedRaster(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('sample.pkl')
         }
         self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET]))
         self.assertEqual((71158, 177), dump.X.shape)
         self.assertEqual((71158, 1), dump.y.shape)
         self.assertEqual(177, len(dump.features))
         self.assertEqual(['band 8 (0.460000 Micrometers)', 'band 9 (0.465000 Micrometers)'], dump.features[:2])
         self.assertEqual(1911, len(dump.categories))
+
+    def test_sampleData_sparseLabels(self):
+        reader = RasterReader(enmap)
+        labels = np.zeros((1, reader.height(), reader.width()), dtype=np.uint8)
+        labels[0, 3, 5] = 1
+        labels[0, 4, 2:7] = 2
+        labels[0, 100, 50] = 3  # not a category
+        labels[0, 200, 0] = 1
+        filename = self.filename('labels.tif')
+        writer = Driver(filename).createLike(reader, reader.dataType(), 1)
+        writer.writeArray(labels)
+        del writer
+        categories = [Category(1, 'a', '#ff0000'), Category(2, 'b', '#00ff00')]
+
+        X, y = PrepareClassificationDatasetFromCategorizedRasterAlgorithm.sampleData(
+            QgsRasterLayer(enmap), QgsRasterLayer(filename), 1, categories
+        )
+        labeled = np.isin(labels[0], [1, 2])
+        self.assertTrue(np.array_equal(labels[0][labeled][:, None], y))
+        self.assertTrue(np.array_equal(reader.array()[:, labeled].T, X))
@@ -17,7 +17,7 @@ class TestPrepareClassificationSampleFromCategorizedVectorAlgorithm(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('sample.pkl')
         }
         self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET]))
         self.assertEqual((2028, 177), dump.X.shape)
         self.assertEqual((2028, 1), dump.y.shape)
         self.assertEqual(177, len(dump.features))
@@ -35,7 +35,7 @@ class TestPrepareClassificationSampleFromCategorizedVectorAlgorithm(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('sample.pkl')
         }
         self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET]))
         self.assertEqual((58, 177), dump.X.shape)
         self.assertEqual((58, 1), dump.y.shape)
         self.assertEqual(177, len(dump.features))
@@ -55,7 +55,7 @@ class TestPrepareClassificationSampleFromCategorizedVectorAlgorithm(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('sample.pkl')
         }
         self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET]))
         self.assertEqual((2028, 177), dump.X.shape)
         self.assertEqual((2028, 1), dump.y.shape)
         self.assertEqual(177, len(dump.features))
@@ -76,6 +76,6 @@ class TestPrepareClassificationSampleFromCategorizedVectorAlgorithm(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('sample.pkl')
         }
         self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET]))
         self.assertEqual((1481, 177), dump.X.shape)
         self.assertEqual((1481, 1), dump.y.shape)
@@ -16,7 +16,7 @@ class TestPrepareClassificationDatasetFromVectorAndFieldsAlgorithm(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('sample.pkl')
         }
         self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET]))
         self.assertEqual((299, 177), dump.X.shape)
         self.assertEqual((299, 1), dump.y.shape)
         self.assertEqual(177, len(dump.features))
@@ -16,7 +16,7 @@ class TestPrepareClassificationDatasetFromCodeAlgorithm(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('dataset.pkl')
         }
         result = self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(result[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(result[alg.P_OUTPUT_DATASET]))
         self.assertEqual(
             [Category(value=1, name='class 1', color='#ff0000'), Category(value=2, name='class 2', color='#00ff00')],
             dump.categories
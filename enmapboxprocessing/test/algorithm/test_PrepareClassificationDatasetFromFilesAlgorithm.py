@@ -16,7 +16,7 @@ class TestPrepareClassificationDatasetFromFilesAlgorithm(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('sample.pkl')
         }
         self.runalg(alg, parameters)
-        dump = ClassifierDump(**Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET]))
+        dump = ClassifierDump(**Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET]))
         self.assertEqual((15000, 20), dump.X.shape)
         self.assertEqual((15000, 1), dump.y.shape)
         self.assertEqual(20, len(dump.features))
@@ -1,9 +1,13 @@
 import numpy as np
-from qgis._core import QgsRasterLayer, QgsVectorLayer
+from qgis._core import QgsRasterLayer, QgsVectorLayer, QgsRectangle, QgsCoordinateReferenceSystem
 
 from enmapboxprocessing.algorithm.randompointsfromcategorizedrasteralgorithm import \
     RandomPointsFromCategorizedRasterAlgorithm
+from enmapboxprocessing.driver import Driver
+from enmapboxprocessing.rasterreader import RasterReader
 from enmapboxprocessing.test.algorithm.testcase import TestCase
+from enmapboxprocessing.typing import Category
+from enmapboxprocessing.utils import Utils
 from enmapboxtestdata import landcover_map_l3
 
 
@@ -22,7 +26,80 @@ class TestRandomPointsFromCategorizedRasterAlgorithm(TestCase):
             alg.P_OUTPUT_POINTS: self.filename('points.gpkg')
         }
         result = self.runalg(alg, parameters)
-        self.assertEqual(26317, QgsVectorLayer(parameters[alg.P_OUTPUT_POINTS]).featureCount())
+
+        # the seeded run draws exactly the pixels drawn with the same seed
+        stratification = parameters[alg.P_STRATIFICATION]
+        categories = Utils.categoriesFromPalettedRasterRenderer(stratification.renderer())
+        xres = stratification.rasterUnitsPerPixelX()
+        yres = stratification.rasterUnitsPerPixelY()
+        arrayStrata = RasterReader(stratification).array(bandList=[stratification.renderer().band()])[0]
+        np.random.seed(42)
+        indicesList = RandomPointsFromCategorizedRasterAlgorithm.drawPixels(
+            arrayStrata, [c.value for c in categories], [100000000] * len(categories),
+            RandomPointsFromCategorizedRasterAlgorithm.makeKernel(xres, yres, 0),
+            RandomPointsFromCategorizedRasterAlgorithm.makeKernel(xres, yres, 45)
+        )
+        self.assertEqual(
+            sum(len(indices) for indices in indicesList),
+            QgsVectorLayer(parameters[alg.P_OUTPUT_POINTS]).featureCount()
+        )
+
+    def test_seed(self):
+        np.random.seed(0)
+        array = np.random.randint(1, 3, (1, 100, 150)).astype(np.uint8)
+        writer = Driver(self.filename('strata.tif')).createFromArray(
+            array, QgsRectangle(0, 0, 150 * 30, 100 * 30), QgsCoordinateReferenceSystem('EPSG:32633')
+        )
+        writer.close()
+        stratification = QgsRasterLayer(writer.source())
+        categories = [Category(1, 'a', '#ff0000'), Category(2, 'b', '#00ff00')]
+        stratification.setRenderer(
+            Utils.palettedRasterRendererFromCategories(stratification.dataProvider(), 1, categories)
+        )
+
+        alg = RandomPointsFromCategorizedRasterAlgorithm()
+        alg.initAlgorithm()
+        parameters = {
+            alg.P_STRATIFICATION: stratification,
+            alg.P_N: 100000000,
+            alg.P_DISTANCE_GLOBAL: 45,
+            alg.P_DISTANCE_STRATUM: 100,
+            alg.P_SEED: 42,
+            alg.P_OUTPUT_POINTS: self.filename('points.gpkg')
+        }
+        self.runalg(alg, parameters)
+        self.assertEqual(755 + 694, QgsVectorLayer(parameters[alg.P_OUTPUT_POINTS]).featureCount())
+
+    def test_drawPixels_respectsDistances(self):
+        np.random.seed(42)
+        arrayStrata = np.random.randint(1, 3, (200, 300))
+        kernelGlobal = RandomPointsFromCategorizedRasterAlgorithm.makeKernel(30, 30, 45)
+        kernelStratum = RandomPointsFromCategorizedRasterAlgorithm.makeKernel(30, 30, 100)
+        indicesList = RandomPointsFromCategorizedRasterAlgorithm.drawPixels(
+            arrayStrata, [1, 2], [500, 10000], kernelGlobal, kernelStratum
+        )
+        self.assertEqual(500, len(indicesList[0]))
+        self.assertEqual(2930, len(indicesList[1]))  # category exhausted
+
+        points = list()
+        for value, indices in zip([1, 2], indicesList):
+            self.assertTrue(np.all(arrayStrata.flat[indices] == value))
+            y, x = np.divmod(indices, 300)
+            points.append(np.transpose([y * 30., x * 30.]))
+        allPoints = np.concatenate(points)
+        for p, minimumDistance in [(allPoints, 45), (points[0], 100), (points[1], 100)]:
+            distances = np.sqrt(np.sum((p[:, None] - p[None]) ** 2, axis=-1))
+            np.fill_diagonal(distances, np.inf)
+            self.assertTrue(np.all(distances > minimumDistance))
+
+    def test_drawPixels_withoutDistances(self):
+        arrayStrata = np.array([[1, 1, 2], [2, 2, 2]])
+        kernel = RandomPointsFromCategorizedRasterAlgorithm.makeKernel(30, 30, 0)
+        indicesList = RandomPointsFromCategorizedRasterAlgorithm.drawPixels(
+            arrayStrata, [1, 2], [5, 2], kernel, kernel
+        )
+        self.assertEqual([0, 1], sorted(indicesList[0]))
+        self.assertEqual(2, len(set(indicesList[1])))
 
     def test_kernel(self):
         self.assertTrue(np.alltrue(np.equal([[0]], RandomPointsFromCategorizedRasterAlgorithm.makeKernel(30, 30, 0))))
@@ -1,9 +1,11 @@
 from os.path import normpath
 
 import numpy as np
+from qgis._core import QgsProcessingFeedback
 
 from enmapbox.exampledata import enmap, hires, landcover_polygons
 from enmapboxprocessing.algorithm.rastermathalgorithm.rastermathalgorithm import RasterMathAlgorithm
+from enmapboxprocessing.processingfeedback import ProcessingFeedback
 from enmapboxprocessing.rasterreader import RasterReader
 from enmapboxprocessing.test.algorithm.testcase import TestCase
 
@@ -71,6 +73,28 @@ class TestRasterMathAlgorithm(TestCase):
         self.assertEqual(29424494, np.sum(RasterReader(result[alg.P_OUTPUT_RASTER]).array(), dtype=float))
         self.assertTrue(len(result) == 1)
 
+    def test_expression_withAt_readsOnlyUsedBands(self):
+        alg = RasterMathAlgorithm()
+        reader = RasterReader(enmap)
+        feedback = ProcessingFeedback(QgsProcessingFeedback())
+        rasterMathCode = alg.compileCode('R1@1 + R1Mask@2 + R1_.noDataValue()', {'R1': reader}, {}, feedback)
+        self.assertNotIn('R1', rasterMathCode.names)  # full data is not read
+        self.assertNotIn('R1Mask', rasterMathCode.names)
+        self.assertIn('R1At1', rasterMathCode.names)
+        self.assertIn('R1MaskAt2', rasterMathCode.names)
+        self.assertEqual(
+            {(1,): [('R1At1', 'R1MaskAt1')], (2,): [('R1At2', 'R1MaskAt2')]}, dict(rasterMathCode.atBands['R1'])
+        )
+
+        parameters = {
+            alg.P_R1: enmap,
+            alg.P_CODE: 'R1@1 + R1@2',
+            alg.P_OUTPUT_RASTER: self.filename('raster.tif')
+        }
+        result = self.runalg(alg, parameters)
+        gold = np.sum(reader.array(bandList=[1, 2]), dtype=float)
+        self.assertEqual(gold, np.sum(RasterReader(result[alg.P_OUTPUT_RASTER]).array(), dtype=float))
+
     def test_inputs_lists(self):
         alg = RasterMathAlgorithm()
         parameters = {
@@ -1,3 +1,7 @@
+import numpy as np
+from osgeo import gdal
+from scipy.ndimage import median_filter, binary_dilation
+
 from enmapbox.exampledata import hires
 from enmapboxprocessing.algorithm.applybandfunctionalgorithmbase import ApplyBandFunctionAlgorithmBase
 from enmapboxprocessing.algorithm.spatialgaussiangradientmagnitudealgorithm import \
@@ -33,6 +37,7 @@ from enmapboxprocessing.algorithm.spatialmorphologicalwhitetophatalgorithm impor
 from enmapboxprocessing.algorithm.spatialpercentilealgorithm import SpatialPercentileAlgorithm
 from enmapboxprocessing.algorithm.spatialprewittalgorithm import SpatialPrewittAlgorithm
 from enmapboxprocessing.algorithm.spatialsobelalgorithm import SpatialSobelAlgorithm
+from enmapboxprocessing.rasterreader import RasterReader
 from enmapboxprocessing.test.algorithm.testcase import TestCase
 
 
@@ -105,3 +110,43 @@ class TestApplyBandFunctionAlgorithm(TestCase):
             self.runalg(alg, parameters)
 
             break  # comment out to check all filter algos
+
+    def test_footprintRadius(self):
+        self.assertEqual(0, ApplyBandFunctionAlgorithmBase.footprintRadius(lambda array: array * 2))
+        self.assertEqual(1, ApplyBandFunctionAlgorithmBase.footprintRadius(lambda array: median_filter(array, size=3)))
+        self.assertEqual(2, ApplyBandFunctionAlgorithmBase.footprintRadius(lambda array: median_filter(array, size=5)))
+        self.assertEqual(
+            3, ApplyBandFunctionAlgorithmBase.footprintRadius(lambda array: binary_dilation(array, iterations=3))
+        )
+        self.assertIsNone(
+            ApplyBandFunctionAlgorithmBase.footprintRadius(lambda array: binary_dilation(array, iterations=40))
+        )
+        self.assertFalse(SpatialMorphologicalBinaryFillHolesAlgorithm.Tileable)
+        self.assertFalse(SpatialMorphologicalBinaryPropagationAlgorithm.Tileable)
+
+    def test_tiledEqualsBandwise(self):
+        cacheMax = gdal.GetCacheMax()
+        for alg in [SpatialMedianAlgorithm(), SpatialGaussianGradientMagnitudeAlgorithm()]:
+            alg.initAlgorithm()
+            parameters = {
+                alg.P_RASTER: hires,
+                alg.P_FUNCTION: alg.defaultCodeAsString(),
+                alg.P_OUTPUT_RASTER: self.filename('bandwise.tif')
+            }
+            tileable = type(alg).Tileable
+            try:
+                type(alg).Tileable = False  # run() works on a new instance, so patch the class
+                self.runalg(alg, parameters)
+            finally:
+                type(alg).Tileable = tileable
+            try:
+                gdal.SetCacheMax(10 * 2 ** 20)  # force small tiles
+                parameters[alg.P_NUMBER_OF_WORKERS] = 2
+                parameters[alg.P_OUTPUT_RASTER] = self.filename('tiled.tif')
+                self.runalg(alg, parameters)
+            finally:
+                gdal.SetCacheMax(cacheMax)
+            self.assertTrue(np.array_equal(
+                RasterReader(self.filename('bandwise.tif')).array()[0],
+                RasterReader(self.filename('tiled.tif')).array()[0]
+            ))
@@ -1,5 +1,7 @@
 import numpy as np
 
+from enmapboxprocessing.algorithm.spectralresamplingbyresponsefunctionconvolutionalgorithmbase import \
+    SpectralResamplingByResponseFunctionConvolutionAlgorithmBase
 from enmapboxprocessing.algorithm.spectralresamplingtodesisalgorithm import SpectralResamplingToDesisAlgorithm
 from enmapboxprocessing.algorithm.spectralresamplingtoenmapalgorithm import SpectralResamplingToEnmapAlgorithm
 from enmapboxprocessing.algorithm.spectralresamplingtolandsat5algorithm import SpectralResamplingToLandsat5Algorithm
@@ -48,3 +50,27 @@ class TestSpectralResamplingByResponseFunctionConvolutionAlgorithmBase(TestCase)
             }
             print(alg.displayName())
             self.runalg(alg, parameters)
+
+    def test_responseMatrix(self):
+        responses = {
+            'a': [(500, 0.5), (501, 1.), (502, 0.5)],
+            'b': [(600, 1.)],
+            'c': [(700, 1.)]  # not covered
+        }
+        matrix = SpectralResamplingByResponseFunctionConvolutionAlgorithmBase.responseMatrix(
+            [500.2, 501, 502.4, 600, 650], responses
+        )
+        self.assertTrue(np.allclose(
+            [[0.25, 0.5, 0.25, 0, 0],
+             [0, 0, 0, 1, 0],
+             [0, 0, 0, 0, 0]],
+            matrix
+        ))
+
+        array = np.arange(5 * 2 * 3, dtype=np.float32).reshape((5, 2, 3))
+        outarray = SpectralResamplingByResponseFunctionConvolutionAlgorithmBase.resampleData(array, matrix, -1)
+        self.assertEqual((3, 2, 3), outarray.shape)
+        self.assertEqual(np.float32, outarray.dtype)
+        self.assertTrue(np.allclose(np.average(array[:3], 0, [0.25, 0.5, 0.25]), outarray[0]))
+        self.assertTrue(np.allclose(array[3], outarray[1]))
+        self.assertTrue(np.all(outarray[2] == -1))
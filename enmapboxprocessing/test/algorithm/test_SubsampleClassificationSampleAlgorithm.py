@@ -17,8 +17,8 @@ class TestSubsampleClassificationSampleAlgorithm(TestCase):
             alg.P_OUTPUT_COMPLEMENT: self.filename('sample2.pkl')
         }
         self.runalg(alg, parameters)
-        self.assertEqual(48, len(Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET])['X']))
-        self.assertEqual(10, len(Utils.pickleLoad(parameters[alg.P_OUTPUT_COMPLEMENT])['X']))
+        self.assertEqual(48, len(Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET])['X']))
+        self.assertEqual(10, len(Utils.datasetLoad(parameters[alg.P_OUTPUT_COMPLEMENT])['X']))
 
     def test_N_asList(self):
         alg = RandomSamplesFromClassificationDatasetAlgorithm()
@@ -30,7 +30,7 @@ class TestSubsampleClassificationSampleAlgorithm(TestCase):
             alg.P_OUTPUT_COMPLEMENT: self.filename('sample2.pkl')
         }
         self.runalg(alg, parameters)
-        self.assertEqual(3 * 5, len(Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET])['X']))
+        self.assertEqual(3 * 5, len(Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET])['X']))
 
     def test_N_withReplacemant(self):
         alg = RandomSamplesFromClassificationDatasetAlgorithm()
@@ -43,7 +43,7 @@ class TestSubsampleClassificationSampleAlgorithm(TestCase):
             alg.P_OUTPUT_COMPLEMENT: self.filename('sample2.pkl')
         }
         self.runalg(alg, parameters)
-        self.assertEqual(500, len(Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET])['X']))
+        self.assertEqual(500, len(Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET])['X']))
 
     def test_P(self):
         alg = RandomSamplesFromClassificationDatasetAlgorithm()
@@ -56,4 +56,4 @@ class TestSubsampleClassificationSampleAlgorithm(TestCase):
             alg.P_OUTPUT_COMPLEMENT: self.filename('sample_complement.pkl')
         }
         self.runalg(alg, parameters)
-        self.assertEqual(6, len(Utils.pickleLoad(parameters[alg.P_OUTPUT_DATASET])['X']))
+        self.assertEqual(6, len(Utils.datasetLoad(parameters[alg.P_OUTPUT_DATASET])['X']))
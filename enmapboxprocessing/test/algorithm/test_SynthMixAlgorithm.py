@@ -1,5 +1,8 @@
+import numpy as np
+
 from enmapboxprocessing.algorithm.synthmixalgorithm import SynthMixAlgorithm
 from enmapboxprocessing.test.algorithm.testcase import TestCase
+from enmapboxprocessing.typing import Category
 from enmapboxtestdata import (classifierDumpPkl)
 
 
@@ -14,3 +17,33 @@ class TestFitClassifierAlgorithm(TestCase):
             alg.P_OUTPUT_DATASET: self.filename('synthmix.pkl')
         }
         self.runalg(alg, parameters)
+
+    def mixer(self, allowWithinClassMixtures: bool) -> SynthMixAlgorithm:
+        alg = SynthMixAlgorithm()
+        alg.X = np.array([[1., 1.], [1., 1.], [0., 0.], [0., 0.], [0., 0.], [0., 0.]], dtype=np.float32)
+        alg.y = np.array([[1], [1], [2], [2], [3], [3]])
+        alg.categories = [Category(1, 'a', '#ff0000'), Category(2, 'b', '#00ff00'), Category(3, 'c', '#0000ff')]
+        alg.n = 1000
+        alg.includeEndmember = True
+        alg.mixingLikelihoods = [0.5, 0.5]
+        alg.allowWithinClassMixtures = allowWithinClassMixtures
+        alg.classLikelihoods = [1 / 3, 1 / 3, 1 / 3]
+        return alg
+
+    def test_mixTarget(self):
+        for allowWithinClassMixtures in [True, False]:
+            alg = self.mixer(allowWithinClassMixtures)
+            X, y = alg.mixTarget(alg.categories[0], np.random.default_rng(42))
+            self.assertEqual((1006, 2), X.shape)
+            self.assertEqual((1006, 1), y.shape)
+            # target endmembers are ones and all others are zeros, so mixtures must equal the target fraction
+            self.assertTrue(np.allclose(X[:, 0], y[:, 0], atol=1e-6))
+            self.assertTrue(np.all((y >= 0) & (y <= 1)))
+            self.assertTrue(np.array_equal([1, 1, 0, 0, 0, 0], y[-6:, 0]))
+
+    def test_mixTarget_seeded(self):
+        alg = self.mixer(False)
+        X1, y1 = alg.mixTarget(alg.categories[1], np.random.default_rng(42))
+        X2, y2 = alg.mixTarget(alg.categories[1], np.random.default_rng(42))
+        self.assertTrue(np.array_equal(X1, X2))
+        self.assertTrue(np.array_equal(y1, y2))
@@ -0,0 +1,46 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from enmapboxprocessing.batchpredictor import BatchPredictor
+from enmapboxprocessing.test.testcase import TestCase
+
+
+class TestBatchPredictor(TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(42)
+        self.arrayX = random.randint(0, 1000, (3, 20, 30)).astype(np.int16)
+        self.valid = random.random_sample((20, 30)) > 0.3
+        X = np.transpose([a[self.valid] for a in self.arrayX])
+        y = (X[:, 0] > 500).astype(np.int32) + 1
+        self.classifier = RandomForestClassifier(n_estimators=10, random_state=42).fit(X, y)
+        self.X = X
+
+    def test_sample(self):
+        X = BatchPredictor(self.classifier).sample(self.arrayX, self.valid)
+        self.assertEqual(np.float32, X.dtype)
+        self.assertTrue(X.flags.c_contiguous)
+        self.assertArrayEqual(self.X, X)
+
+    def test_predict_chunked(self):
+        gold = np.zeros((20, 30), np.int32)
+        gold[self.valid] = self.classifier.predict(self.X)
+        for chunkSize, numberOfWorkers in [(7, 1), (7, 4), (100000, 1)]:
+            arrayY = np.zeros((20, 30), np.int32)
+            BatchPredictor(self.classifier, chunkSize, numberOfWorkers).predict(self.arrayX, self.valid, arrayY)
+            self.assertArrayEqual(gold, arrayY)
+
+    def test_predictProba_chunked(self):
+        gold = np.full((2, 20, 30), -1, np.float32)
+        proba = self.classifier.predict_proba(self.X)
+        for i in range(2):
+            gold[i][self.valid] = proba[:, i]
+        arrayY = np.full((2, 20, 30), -1, np.float32)
+        BatchPredictor(self.classifier, 7, 4).predictProba(self.arrayX, self.valid, arrayY)
+        self.assertArrayEqual(gold, arrayY)
+
+    def test_noValidPixels(self):
+        arrayY = np.zeros((20, 30), np.int32)
+        valid = np.zeros((20, 30), bool)
+        BatchPredictor(self.classifier).predict(self.arrayX, valid, arrayY)
+        self.assertArrayEqual(np.zeros((20, 30), np.int32), arrayY)
@@ -0,0 +1,42 @@
+from time import sleep
+
+import numpy as np
+from qgis._core import QgsRectangle
+
+from enmapboxprocessing.blockexecutor import BlockExecutor
+from enmapboxprocessing.rasterblockinfo import RasterBlockInfo
+from enmapboxprocessing.test.testcase import TestCase
+
+
+class TestBlockExecutor(TestCase):
+
+    def setUp(self):
+        self.blocks = [RasterBlockInfo(QgsRectangle(0, i, 10, i + 1), 0, i, 10, 1) for i in range(20)]
+
+    def read(self, block: RasterBlockInfo):
+        return np.full((1, block.height, block.width), block.yOffset)
+
+    def compute(self, block: RasterBlockInfo, array):
+        sleep(0.001 * (20 - block.yOffset))  # make later blocks finish first
+        return array * 2
+
+    def test_serial(self):
+        written = list()
+        BlockExecutor().run(self.blocks, self.read, self.compute, lambda block, array: written.append(array))
+        self.assertEqual([i * 2 for i in range(20)], [int(array[0, 0, 0]) for array in written])
+
+    def test_parallel_writesInBlockOrder(self):
+        written = list()
+        executor = BlockExecutor(4)
+        self.assertEqual(8, executor.blocksInFlight())
+        executor.run(self.blocks, self.read, self.compute, lambda block, array: written.append(block.yOffset))
+        self.assertEqual(list(range(20)), written)
+
+    def test_parallel_raisesComputeError(self):
+        def compute(block: RasterBlockInfo, array):
+            if block.yOffset == 5:
+                raise ValueError('compute error')
+            return array
+
+        with self.assertRaises(ValueError):
+            BlockExecutor(4).run(self.blocks, self.read, compute, lambda block, array: None)
@@ -0,0 +1,73 @@
+import numpy as np
+from astropy.convolution import Gaussian2DKernel, Box1DKernel, Ring2DKernel
+
+from enmapboxprocessing.kernelconvolver import KernelConvolver
+from enmapboxprocessing.test.testcase import TestCase
+
+
+class TestKernelConvolver(TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(42)
+        self.array = random.random_sample((5, 40, 50))
+        self.mask = random.random_sample((5, 40, 50)) > 0.1
+        self.mask[:, 10:20, 10:20] = False  # a hole larger than small kernels
+
+    def kernels(self):
+        return [
+            Gaussian2DKernel(x_stddev=2, y_stddev=1).array[None],  # separable
+            Box1DKernel(width=5).array.reshape(-1, 1, 1),  # spectral
+            Ring2DKernel(radius_in=3, width=2).array[None]  # not separable
+        ]
+
+    def test_separableFactors(self):
+        gaussian, box, ring = self.kernels()
+        for kernel in [gaussian, box]:
+            factors = KernelConvolver.separableFactors(kernel)
+            self.assertTrue(np.allclose(kernel, np.einsum('i,j,k->ijk', *factors)))
+        self.assertIsNone(KernelConvolver.separableFactors(ring))
+
+    def test_backendSelection(self):
+        gaussian, box, ring = self.kernels()
+        self.assertEqual(KernelConvolver.Separable, KernelConvolver(gaussian).backend)
+        self.assertEqual(KernelConvolver.Direct, KernelConvolver(box).backend)
+        self.assertEqual(KernelConvolver.Fft, KernelConvolver(ring).backend)
+        # spectral kernel elements are more expensive for the direct backend than spatial ones
+        self.assertEqual(KernelConvolver.Separable, KernelConvolver(np.ones((7, 1, 1))).backend)
+        self.assertEqual(KernelConvolver.Direct, KernelConvolver(np.ones((1, 5, 5))).backend)
+        self.assertEqual(KernelConvolver.Separable, KernelConvolver(np.ones((1, 7, 7))).backend)
+        self.assertEqual(KernelConvolver.Direct, KernelConvolver(np.ones((7, 3, 3))).backend)
+
+    def test_backendsMatchDirect(self):
+        for kernel in self.kernels():
+            for normalizeKernel in [False, True]:
+                for interpolate in [False, True]:
+                    for mask in [self.mask, np.ones_like(self.mask)]:
+                        gold = KernelConvolver(kernel, normalizeKernel, interpolate, KernelConvolver.Direct).convolve(
+                            self.array, mask
+                        )
+                        backends = [KernelConvolver.Fft]
+                        if KernelConvolver.separableFactors(kernel) is not None:
+                            backends.append(KernelConvolver.Separable)
+                        for backend in backends:
+                            result = KernelConvolver(kernel, normalizeKernel, interpolate, backend).convolve(
+                                self.array, mask
+                            )
+                            self.assertTrue(np.allclose(gold, result, equal_nan=True), (backend, kernel.shape))
+
+    def test_isolatedNoData_withoutInterpolation(self):
+        random = np.random.RandomState(0)
+        array = random.random_sample((7, 100, 120))
+        mask = random.random_sample(array.shape) > 0.005  # sparse, isolated no data pixels
+        for kernel in self.kernels():
+            backends = [KernelConvolver.Fft]
+            if KernelConvolver.separableFactors(kernel) is not None:
+                backends.append(KernelConvolver.Separable)
+            for backend in backends:
+                convolver = KernelConvolver(kernel, interpolate=False, backend=backend)
+                result = convolver.convolve(array, mask)
+                gold = convolver.boundaryMask(mask.shape)
+                hz, hy, hx = [v // 2 for v in kernel.shape]
+                for z, y, x in np.argwhere(np.logical_not(mask)):
+                    gold[max(0, z - hz): z + hz + 1, max(0, y - hy): y + hy + 1, max(0, x - hx): x + hx + 1] = True
+                self.assertArrayEqual(gold, np.isnan(result))
@@ -1,5 +1,6 @@
 from enmapboxprocessing.driver import Driver
 from enmapboxprocessing.rasterreader import RasterReader
+from enmapboxprocessing.rasterwriter import AsyncRasterWriter
 from enmapboxprocessing.test.testcase import TestCase
 from enmapbox.exampledata import enmap
 
@@ -54,3 +55,14 @@ class TestRasterProcessing(TestCase):
         blockSizeX, blockSizeY = raster.gdalBand(1).GetBlockSize()
         for block in raster.walkGrid(blockSizeX, blockSizeY):
             pass
+
+    def test_blockwise_multiband_io_pipelined(self):
+        raster = RasterReader(enmap)
+        options = ['COMPRESS=LZW', 'INTERLEAVE=BAND']
+        outraster = Driver(self.filename('enmap.tif'), options=options).createLike(raster)
+        with AsyncRasterWriter(outraster) as writer:
+            for block, array in raster.iterBlockArrays(raster.walkGrid(50, 50), prefetch=2):
+                writer.writeArray(array, block.xOffset, block.yOffset)
+        outraster.setNoDataValue(raster.noDataValue())
+        outraster.setMetadata(raster.metadata())
+        self.assertArrayEqual(raster.array(), RasterReader(outraster.source()).array())
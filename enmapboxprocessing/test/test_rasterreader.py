@@ -49,12 +49,64 @@ class TestRasterReader(TestCase):
                 gold = self.array[:, yOffset:yOffset + 1, xOffset:xOffset + 1]
                 self.assertArrayEqual(lead, gold)
 
+    def test_readBandSubset_asContiguousArray(self):
+        lead = self.reader.array(bandList=[3, 1])
+        gold = self.array[[2, 0]]
+        self.assertIsInstance(lead, np.ndarray)
+        self.assertTrue(lead.flags.c_contiguous)
+        self.assertArrayEqual(lead, gold)
+
+    def test_readWithResampling_asContiguousArray(self):
+        lead = self.reader.array(boundingBox=self.provider.extent(), width=22, height=40, bandList=[1, 2])
+        self.assertIsInstance(lead, np.ndarray)
+        self.assertEqual((2, 40, 22), lead.shape)
+
+    def test_iterBlockArrays(self):
+        for prefetch in [0, 2]:
+            for block, lead in self.reader.iterBlockArrays(self.reader.walkGrid(50, 50), [1, 2], 1, prefetch):
+                gold = self.reader.arrayFromBlock(block, [1, 2], 1)
+                self.assertArrayEqual(lead, gold)
+
+    def test_iterBlockArrays_stopEarly(self):
+        for block, array in self.reader.iterBlockArrays(self.reader.walkGrid(10, 10), prefetch=1):
+            break  # background thread must not block forever
+
     def test_readWithOverlap(self):
         lead = self.reader.array(10, 10, self.reader.width() - 20, self.reader.height() - 20, overlap=10)
         gold = self.array
         self.assertArrayEqual(lead, gold)
 
 
+class TestRasterBlockPlanner(TestCase):
+
+    def setUp(self):
+        self.reader = RasterReader(enmap)
+
+    def test_fullRaster(self):
+        self.assertEqual((self.reader.width(), self.reader.height()), self.reader.planBlockSize(1, 10 ** 9))
+
+    def test_scanlineStrips(self):
+        self.assertEqual((self.reader.width(), 1), self.reader.gdalBlockSize())
+        pixelMemoryUsage = self.reader.pixelMemoryUsage()
+        maximumMemoryUsage = self.reader.lineMemoryUsage() * 3
+        self.assertEqual((self.reader.width(), 3), self.reader.planBlockSize(pixelMemoryUsage, maximumMemoryUsage))
+
+    def test_lessThanOneLine(self):
+        blockSizeX, blockSizeY = self.reader.planBlockSize(1, 100)
+        self.assertEqual((10, 10), (blockSizeX, blockSizeY))
+
+    def test_alignedToTiles(self):
+        array = np.zeros((1, 100, 100), np.float32)
+        filename = self.filename('tiled.tif')
+        options = ['TILED=YES', 'BLOCKXSIZE=16', 'BLOCKYSIZE=16']
+        Driver(filename, 'GTiff', options).createFromArray(array)
+        reader = RasterReader(filename)
+        self.assertEqual((16, 16), reader.gdalBlockSize())
+        self.assertEqual((100, 32), reader.planBlockSize(4, 100 * 4 * 40))  # strip of two tile rows
+        blockSizeX, blockSizeY = reader.planBlockSize(4, 16 * 16 * 4 * 5)  # less than a tile row
+        self.assertEqual((32, 32), (blockSizeX, blockSizeY))
+
+
 class TestRasterMetadataReader(TestCase):
     def setUp(self):
         self.reader = RasterReader(enmap)
@@ -76,6 +128,27 @@ class TestRasterMetadataReader(TestCase):
         self.assertEqual(5.8, self.reader.fwhm(1, self.reader.Nanometers))
         self.assertEqual(0.0058, self.reader.fwhm(1, self.reader.Micrometers))
 
+    def test_spectral_metadata_arrays(self):
+        wavelengths = self.reader.wavelengths()
+        self.assertEqual((self.reader.bandCount(),), wavelengths.shape)
+        self.assertEqual(460.0, wavelengths[0])
+        self.assertEqual(0.460, self.reader.wavelengths(self.reader.Micrometers)[0])
+        self.assertEqual(5.8, self.reader.fwhms()[0])
+        self.assertArrayEqual(np.ones(self.reader.bandCount()), self.reader.badBandMultipliers())
+        self.assertEqual(1, self.reader.findWavelength(460))
+        self.assertEqual(self.reader.bandCount(), self.reader.findWavelength(99999))
+
+    def test_spectral_metadata_cacheInvalidation(self):
+        filename = self.filename('test.bsq')
+        Driver(filename).createFromArray(np.zeros((2, 1, 1)))
+        reader = RasterReader(filename)
+        self.assertIsNone(reader.wavelength(1))
+        self.assertIsNone(reader.findWavelength(500))
+        reader.setMetadataItem('wavelength_units', 'nm', '', 2)
+        reader.setMetadataItem('wavelength', 500, '', 2)
+        self.assertEqual(500, reader.wavelength(2))
+        self.assertEqual(2, reader.findWavelength(400))
+
 
 class TestRasterMaskReader(TestCase):
 
@@ -122,3 +195,54 @@ class TestRasterMaskReader(TestCase):
         gold[0, 0, 0:5] = False
         lead = self.reader.maskArray(self.array)
         self.assertArrayEqual(lead, gold)
+
+    def test_bandSubset_usesBandNoData(self):
+        array = np.array([[[0, 1, 2]], [[0, 1, 2]]])
+        filename = self.filename('test2.bsq')
+        Driver(filename).createFromArray(array)
+        reader = RasterReader(filename)
+        reader.provider.setNoDataValue(bandNo=2, noDataValue=1)
+        gold = np.array([[[True, False, True]]])
+        lead = reader.maskArray(array[1:], bandList=[2])
+        self.assertArrayEqual(lead, gold)
+
+    def test_float32_notRepresentable_noData(self):
+        array = np.array([[[-9999.9, 1e-20, 0., 1.]]], dtype=np.float32)
+        filename = self.filename('test2.bsq')
+        Driver(filename).createFromArray(array)
+        reader = RasterReader(filename)
+        reader.provider.setNoDataValue(bandNo=1, noDataValue=-9999.9)
+        reader.setUserNoDataValue(1, [QgsRasterRange(1e-20, 1e-20)])
+        gold = np.array([[[False, False, True, True]]])
+        lead = reader.maskArray(array)
+        self.assertArrayEqual(lead, gold)
+
+    def test_notFinite_withoutUser_noData(self):
+        array = np.array([[[np.nan, np.inf, 1.]]])
+        gold = np.array([[[False, False, True]]])
+        lead = self.reader.maskArray(array)
+        self.assertArrayEqual(lead, gold)
+
+    def test_cacheInvalidation(self):
+        self.assertArrayEqual(self.reader.maskArray(self.array), np.full_like(self.array, True, dtype=bool))
+        self.reader.setUserNoDataValue(1, [QgsRasterRange(0, 0)])
+        gold = np.full_like(self.array, True, dtype=bool)
+        gold[0, 0, 0] = False
+        self.assertArrayEqual(self.reader.maskArray(self.array), gold)
+
+    def test_maskArray2d(self):
+        array = np.array([[[0, 1, 2]], [[1, 0, 2]]])
+        filename = self.filename('test2.bsq')
+        Driver(filename).createFromArray(array)
+        reader = RasterReader(filename)
+        reader.provider.setNoDataValue(bandNo=1, noDataValue=0)
+        reader.provider.setNoDataValue(bandNo=2, noDataValue=0)
+        gold = np.array([[False, False, True]])
+        self.assertArrayEqual(reader.maskArray2d(array), gold)
+        self.assertArrayEqual(reader.maskArray2d(array, chunkSize=1), gold)
+
+    def test_packedMaskArray(self):
+        self.provider.setNoDataValue(bandNo=1, noDataValue=0)
+        lead = self.reader.packedMaskArray(self.array)
+        self.assertEqual((1, 1, 10), lead.shape)
+        self.assertArrayEqual(np.unpackbits(lead, axis=0, count=1, bitorder='little'), self.reader.maskArray(self.array))
@@ -0,0 +1,54 @@
+from os.path import exists
+
+import numpy as np
+
+from enmapboxprocessing.spectralresponsecache import SpectralResponseCache
+from enmapboxprocessing.test.testcase import TestCase
+
+
+class TestSpectralResponseCache(TestCase):
+
+    def setUp(self):
+        self.directory = SpectralResponseCache.Directory
+        SpectralResponseCache.Directory = self.filename('spectralResponseCache')
+        SpectralResponseCache.clear()
+
+    def tearDown(self):
+        SpectralResponseCache.clear()
+        SpectralResponseCache.Directory = self.directory
+
+    def test_responses(self):
+        calls = list()
+
+        def compile():
+            calls.append(1)
+            return {'a': [(500, 0.5), (501, 1.)]}
+
+        code = "responses = {'a': [(500, 0.5), (501, 1.)]}"
+        responses = SpectralResponseCache.responses(code, compile)
+        self.assertEqual({'a': [(500, 0.5), (501, 1.)]}, responses)
+        self.assertEqual(responses, SpectralResponseCache.responses(code, compile))
+        self.assertEqual(1, len(calls))
+        self.assertTrue(exists(SpectralResponseCache.filename(SpectralResponseCache.responsesKey(code), '.json')))
+
+        # reload from disk
+        SpectralResponseCache.clear(memoryOnly=True)
+        self.assertEqual(responses, SpectralResponseCache.responses(code, compile))
+        self.assertEqual(1, len(calls))
+
+    def test_matrix(self):
+        calls = list()
+
+        def compute():
+            calls.append(1)
+            return np.eye(2)
+
+        matrix = SpectralResponseCache.matrix('code', [500.2, 600.], compute)
+        self.assertFalse(matrix.flags.writeable)
+        SpectralResponseCache.matrix('code', [500., 599.9], compute)  # same nanometer grid
+        SpectralResponseCache.clear(memoryOnly=True)
+        self.assertArrayEqual(np.eye(2), SpectralResponseCache.matrix('code', [500., 600.], compute))
+        self.assertEqual(1, len(calls))
+
+        SpectralResponseCache.matrix('code', [500., 601.], compute)  # different grid
+        self.assertEqual(2, len(calls))
@@ -1,9 +1,15 @@
+from os import listdir
+from os.path import dirname
+from tempfile import mkdtemp
 from unittest import TestCase
 
+import numpy as np
+
 from PyQt5.QtGui import QColor
-from qgis._core import QgsVectorLayer
+from qgis._core import QgsVectorLayer, Qgis
+from sklearn.ensemble import RandomForestClassifier
 
-from enmapboxprocessing.typing import Category
+from enmapboxprocessing.typing import Category, ClassifierDump
 from enmapboxprocessing.utils import Utils
 from enmapbox.exampledata import landcover_polygons
 
@@ -58,3 +64,65 @@ class TestUtils(TestCase):
         categories, valueLookup = Utils.prepareCategories([Category('name', 'A', '#000000')], valuesToInt=True)
         self.assertEqual([Category(1, 'A', '#000000')], categories)
         self.assertEqual({'name': 1}, valueLookup)
+
+    def test_qgsRasterBlock_roundTrip(self):
+        array = np.arange(12, dtype=np.int16).reshape((3, 4))
+        block = Utils.numpyArrayToQgsRasterBlock(array)
+        self.assertEqual(Qgis.Int16, block.dataType())
+        lead = Utils.qgsRasterBlockToNumpyArray(block)
+        self.assertTrue(np.all(array == lead))
+        lead = Utils.qgsRasterBlockToNumpyArray(block, copy=True)
+        lead[0, 0] = 42
+        self.assertTrue(np.all(array == Utils.qgsRasterBlockToNumpyArray(block)))
+
+    def test_numpyArrayToQgsRasterBlock_castsToDataType(self):
+        array = np.array([[1.5, 2.5]])
+        block = Utils.numpyArrayToQgsRasterBlock(array, Qgis.Byte)
+        self.assertTrue(np.all(np.array([[1, 2]]) == Utils.qgsRasterBlockToNumpyArray(block)))
+
+    def test_numpyRgbaToQgsRasterBlock(self):
+        r, g, b, a = [np.full((2, 3), v, dtype=np.uint32) for v in (1, 2, 3, 255)]
+        block = Utils.numpyRgbaToQgsRasterBlock(r, g, b, a)
+        gold = (r << 16) + (g << 8) + b + (a << 24)
+        self.assertEqual(Qgis.ARGB32_Premultiplied, block.dataType())
+        self.assertTrue(np.all(gold == Utils.qgsRasterBlockToNumpyArray(block)))
+
+    def test_argb32Buffer_isReused(self):
+        buffer = Utils.argb32Buffer(3, 2)
+        self.assertEqual((2, 3), buffer.shape)
+        self.assertIs(buffer, Utils.argb32Buffer(3, 2))
+        self.assertIsNot(buffer, Utils.argb32Buffer(2, 3))
+
+    def test_datasetDump_andLoad(self):
+        filename = mkdtemp() + '/classifier.pkl'
+        X = np.random.randint(0, 100, (10, 3))
+        y = np.random.randint(1, 3, (10, 1))
+        categories = [Category(1, 'a', '#ff0000'), Category(2, 'b', '#00ff00')]
+        dump = ClassifierDump(categories, ['f1', 'f2', 'f3'], X, y, RandomForestClassifier())
+        Utils.datasetDump(dump.__dict__, filename)
+        self.assertListEqual(['classifier.pkl'], listdir(dirname(filename)))  # single file, no sidecar files
+
+        dump2 = ClassifierDump(**Utils.datasetLoad(filename))
+        self.assertListEqual(categories, dump2.categories)
+        self.assertListEqual(['f1', 'f2', 'f3'], dump2.features)
+        self.assertNotIsInstance(dump2.X, np.memmap)
+        self.assertTrue(np.array_equal(X, dump2.X))
+        self.assertTrue(np.array_equal(y, dump2.y))
+        self.assertIsInstance(dump2.classifier, RandomForestClassifier)
+
+        mapped = Utils.datasetLoad(filename, mmap=True)
+        self.assertIsInstance(mapped['X'], np.memmap)
+        self.assertTrue(np.array_equal(X, mapped['X']))
+        self.assertTrue(np.array_equal(y, mapped['y']))
+        del mapped
+
+        # overwrite an existing dataset
+        Utils.datasetDump(dump2.withFeatures(['a', 'b', 'c']).__dict__, filename)
+        self.assertListEqual(['a', 'b', 'c'], Utils.datasetLoad(filename)['features'])
+        self.assertTrue(np.array_equal(X, Utils.datasetLoad(filename)['X']))
+        self.assertListEqual(['classifier.pkl'], listdir(dirname(filename)))
+
+    def test_datasetLoad_legacyPickle(self):
+        filename = mkdtemp() + '/sample.pkl'
+        Utils.pickleDump({'categories': None, 'features': ['f1'], 'X': np.zeros((2, 1)), 'y': None}, filename)
+        self.assertListEqual(['f1'], Utils.datasetLoad(filename)['features'])
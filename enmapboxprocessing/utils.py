@@ -1,10 +1,14 @@
 import json
 import pickle
 import re
-from os import makedirs
+import struct
+import threading
+from collections import OrderedDict
+from os import makedirs, replace
 from os.path import join, dirname, basename, exists, splitext
 from random import randint
 from typing import Tuple, Optional, Callable, Any, Dict, Union
+from zipfile import ZipFile, ZipInfo, ZIP_STORED, is_zipfile
 
 import numpy as np
 from PyQt5.QtGui import QColor
@@ -22,6 +26,8 @@ from typeguard import typechecked
 
 @typechecked
 class Utils(object):
+    Argb32BufferPoolSize = 4
+    _argb32Buffers = threading.local()
 
     @staticmethod
     def maximumMemoryUsage() -> int:
@@ -44,7 +50,7 @@ class Utils(object):
             return np.uint16
         elif dataType == Qgis.UInt32:
             return np.uint32
-        elif dataType == Qgis.ARGB32_Premultiplied:
+        elif dataType in [Qgis.ARGB32, Qgis.ARGB32_Premultiplied]:
             return np.uint32
         else:
             raise Exception(f'unsupported data type: {dataType}')
@@ -128,10 +134,15 @@ class Utils(object):
             raise Exception(f'unsupported data type: {dataType}')
 
     @classmethod
-    def qgsRasterBlockToNumpyArray(cls, block: QgsRasterBlock) -> np.ndarray:
+    def qgsRasterBlockToNumpyArray(cls, block: QgsRasterBlock, copy=False) -> np.ndarray:
+        """Return block data as 2d array.
+
+        The array is a view on the block data buffer and may be read-only. Use copy=True for a writable array.
+        """
         dtype = cls.qgisDataTypeToNumpyDataType(block.dataType())
-        array = np.frombuffer(np.array(block.data()), dtype=dtype)
-        array = np.reshape(array, (block.height(), block.width()))
+        array = np.frombuffer(block.data(), dtype=dtype).reshape((block.height(), block.width()))
+        if copy:
+            array = array.copy()
         return array
 
     @classmethod
@@ -140,10 +151,43 @@ class Utils(object):
         height, width = array.shape
         if dataType is None:
             dataType = cls.numpyDataTypeToQgisDataType(array.dtype)
+        array = np.ascontiguousarray(array, dtype=cls.qgisDataTypeToNumpyDataType(dataType))  # no-op if matching
         block = QgsRasterBlock(dataType, width, height)
         block.setData(array.tobytes())
         return block
 
+    @classmethod
+    def numpyRgbaToQgsRasterBlock(
+            cls, red: np.ndarray, green: np.ndarray, blue: np.ndarray, alpha: np.ndarray,
+            dataType: int = Qgis.ARGB32_Premultiplied
+    ) -> QgsRasterBlock:
+        """Pack 0-255 RGBA arrays into an ARGB32 raster block, using a reusable buffer."""
+        height, width = red.shape
+        array = cls.argb32Buffer(width, height)
+        array[:] = alpha
+        for channel in [red, green, blue]:
+            np.left_shift(array, 8, out=array)
+            np.add(array, channel, out=array, casting='unsafe')
+        return cls.numpyArrayToQgsRasterBlock(array, dataType)
+
+    @classmethod
+    def argb32Buffer(cls, width: int, height: int) -> np.ndarray:
+        """Return a reusable uint32 buffer owned by the calling thread.
+
+        The buffer content is overwritten by the next call with the same size.
+        """
+        buffers = getattr(cls._argb32Buffers, 'buffers', None)
+        if buffers is None:
+            buffers = cls._argb32Buffers.buffers = OrderedDict()
+        key = height, width
+        buffer = buffers.pop(key, None)
+        if buffer is None:
+            buffer = np.empty(key, dtype=np.uint32)
+        buffers[key] = buffer
+        while len(buffers) > cls.Argb32BufferPoolSize:
+            buffers.popitem(last=False)
+        return buffer
+
     @classmethod
     def metadateValueToString(cls, value: MetadataValue) -> str:
         if isinstance(value, list):
@@ -391,6 +435,95 @@ class Utils(object):
         with open(filename, 'rb') as file:
             return pickle.load(file)
 
+    DatasetFormatVersion = 1
+
+    @classmethod
+    def datasetDump(cls, obj: Dict[str, Any], filename: str):
+        """Dump dataset or model dictionary (e.g. ClassifierDump.__dict__) into a single columnar file.
+
+        The file is an uncompressed zip container with a JSON header (categories, features and other plain values),
+        one .npy member per array and one pickle member per other object (e.g. a fitted estimator).
+        """
+        header = {'version': cls.DatasetFormatVersion, 'values': {}, 'categories': {}, 'arrays': {}, 'objects': {}}
+        tmpFilename = filename + '.tmp'
+        with ZipFile(tmpFilename, 'w', ZIP_STORED, allowZip64=True) as zipFile:
+            for key, value in obj.items():
+                if isinstance(value, np.ndarray) and value.dtype != object:
+                    member = f'{key}.npy'
+                    with zipFile.open(member, 'w', force_zip64=True) as file:
+                        np.lib.format.write_array(file, value, allow_pickle=False)
+                    header['arrays'][key] = member
+                elif isinstance(value, list) and len(value) > 0 and all(isinstance(v, Category) for v in value):
+                    header['categories'][key] = [{'value': c.value, 'name': c.name, 'color': c.color} for c in value]
+                else:
+                    try:
+                        header['values'][key] = json.loads(json.dumps(value, default=cls._jsonValue))
+                    except (TypeError, ValueError):
+                        member = f'{key}.pkl'
+                        zipFile.writestr(member, pickle.dumps(value))
+                        header['objects'][key] = member
+            zipFile.writestr('header.json', json.dumps(header, default=cls._jsonValue, indent=2))
+        replace(tmpFilename, filename)
+
+    @classmethod
+    def datasetLoad(cls, filename: str, mmap=False) -> Dict[str, Any]:
+        """Load dataset or model dictionary dumped with datasetDump.
+
+        Use mmap=True to memory-map the arrays (copy-on-write), so only the accessed data is read from disk.
+        Note that a memory-mapped file can't be overwritten on Windows, as long as the arrays are referenced.
+        Legacy pickle files are supported as well.
+        """
+        if not is_zipfile(filename):
+            return cls.pickleLoad(filename)
+
+        with ZipFile(filename) as zipFile:
+            header = json.loads(zipFile.read('header.json'))
+            if header.get('version') != cls.DatasetFormatVersion:
+                raise ValueError(f'unsupported dataset format: {filename}')
+            obj = dict(header['values'])
+            for key, categories in header['categories'].items():
+                obj[key] = [Category(**category) for category in categories]
+            for key, member in header['arrays'].items():
+                array = None
+                if mmap:
+                    array = cls._memmapZipMember(filename, zipFile.getinfo(member))
+                if array is None:
+                    with zipFile.open(member) as file:
+                        array = np.lib.format.read_array(file, allow_pickle=False)
+                obj[key] = array
+            for key, member in header['objects'].items():
+                obj[key] = pickle.loads(zipFile.read(member))
+        return obj
+
+    @staticmethod
+    def _memmapZipMember(filename: str, info: ZipInfo) -> Optional[np.memmap]:
+        """Memory-map an uncompressed .npy member of a zip file, or return None if the member can't be mapped."""
+        if info.compress_type != ZIP_STORED:
+            return None
+        with open(filename, 'rb') as file:
+            file.seek(info.header_offset)
+            localHeader = file.read(30)
+            nameLength, extraLength = struct.unpack('<HH', localHeader[26:30])
+            file.seek(info.header_offset + 30 + nameLength + extraLength)
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortranOrder, dtype = np.lib.format.read_array_header_1_0(file)
+            elif version == (2, 0):
+                shape, fortranOrder, dtype = np.lib.format.read_array_header_2_0(file)
+            else:
+                return None
+            offset = file.tell()
+        if int(np.prod(shape)) == 0:
+            return None
+        order = 'F' if fortranOrder else 'C'
+        return np.memmap(filename, dtype=dtype, mode='c', shape=shape, order=order, offset=offset)
+
+    @staticmethod
+    def _jsonValue(value):
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f'not JSON serializable: {value}')
+
     @classmethod
     def jsonDumps(cls, obj: Any) -> str:
         def default(obj):
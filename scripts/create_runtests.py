@@ -29,6 +29,7 @@ def create_runtests():
 ::
 @echo off
 set CI=True
+set EMB_TYPECHECKING=1
 set PYTHONPATH=%~dp0/..;%PYTHONPATH%
 set PYTHONPATH
 set PYTHON=python
@@ -49,6 +50,8 @@ QT_QPA_PLATFORM=offscreen
 export QT_QPA_PLATFORM
 CI=True
 export CI
+EMB_TYPECHECKING=1
+export EMB_TYPECHECKING
 
 find . -name "*.pyc" -exec rm -f {} \;
 export PYTHONPATH="${PYTHONPATH}:$(pwd):/usr/share/qgis/python/plugins"
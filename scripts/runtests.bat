@@ -3,6 +3,7 @@
 ::
 @echo off
 set CI=True
+set EMB_TYPECHECKING=1
 set PYTHONPATH=%~dp0/..;%PYTHONPATH%
 set PYTHONPATH
 set PYTHON=python
@@ -3,6 +3,8 @@ QT_QPA_PLATFORM=offscreen
 export QT_QPA_PLATFORM
 CI=True
 export CI
+EMB_TYPECHECKING=1
+export EMB_TYPECHECKING
 
 find . -name "*.pyc" -exec rm -f {} \;
 export PYTHONPATH="${PYTHONPATH}:$(pwd):/usr/share/qgis/python/plugins"
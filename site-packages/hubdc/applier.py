@@ -13,7 +13,7 @@ import numpy
 from osgeo.gdal_array import NumericTypeCodeToGDALTypeCode
 from hubdc.core import *
 import hubdc.core  # needed for sphinx
-from hubdc.writer import Writer, WriterProcess, QueueMock
+from hubdc.writer import Writer, WriterProcess, QueueMock, SharedMemoryPool, shared_memory
 from hubdc.progressbar import CUIProgressBar
 import hubdc.hubdcerrors as errors
 
@@ -41,6 +41,12 @@ class ApplierDefaults(object):
     nwriter = None
     blockSize = RasterSize(x=256, y=256)
     writeENVIHeader = True
+    sampleDensityThreshold = 0.001
+
+    class WriterBuffer(object):
+        nslots = 4
+        slotSize = 8 * 2 ** 20  # e.g. a 256 x 256 block with 32 float32 bands
+        sharedMemory = True
 
     class GDALEnv(object):
         cacheMax = 100 * 2 ** 20
@@ -153,7 +159,12 @@ class ApplierInputRaster(ApplierIO):
             index = 0
         grid = self.operator().subgrid().pixelBuffer(buffer=overlap)
 
-        # create tmp dataset with binarized categories in original resolution
+        # count categories per target pixel, if the target grid is an aligned integer multiple of the source grid
+        array = self._fractionArrayByBlockReduction(categories=categories, grid=grid, index=index)
+        if array is not None:
+            return array
+
+        # otherwise, create tmp dataset with binarized categories in original resolution
 
         extentInSourceProjection = grid.extent().reproject(projection=self.dataset().projection())
         gridInSourceProjection = Grid(extent=extentInSourceProjection, resolution=self.dataset().grid().resolution())
@@ -178,13 +189,64 @@ class ApplierInputRaster(ApplierIO):
         array = binarizedInputRaster.array(overlap=overlap, resampleAlg=gdal.GRA_Average)
         return array
 
+    def _fractionArrayByBlockReduction(self, categories, grid, index):
+        '''
+        Returns category fractions for the given ``grid`` by counting the categories of all source pixels inside each
+        target pixel in a single pass. Returns None, if the ``grid`` is not aligned to the source grid,
+        or if the target resolution is not an integer multiple of the source resolution.
+        '''
+
+        if any(category is None for category in categories):
+            return None
+        sourceGrid = self.dataset().grid()
+        if not grid.projection().equal(other=sourceGrid.projection()):
+            return None
+        factors = [grid.resolution().x() / sourceGrid.resolution().x(),
+                   grid.resolution().y() / sourceGrid.resolution().y(),
+                   (grid.extent().xmin() - sourceGrid.extent().xmin()) / sourceGrid.resolution().x(),
+                   (sourceGrid.extent().ymax() - grid.extent().ymax()) / sourceGrid.resolution().y()]
+        if any(abs(factor - round(factor)) > 1e-5 for factor in factors):
+            return None
+        xfactor, yfactor, xoff, yoff = [int(round(factor)) for factor in factors]
+        if xfactor < 1 or yfactor < 1:
+            return None
+
+        # source pixel window covered by the grid, clipped to the source raster
+        ysize, xsize = grid.shape()
+        x0, y0 = max(xoff, 0), max(yoff, 0)
+        x1 = min(xoff + xsize * xfactor, sourceGrid.size().x())
+        y1 = min(yoff + ysize * yfactor, sourceGrid.size().y())
+
+        uniqueCategories, inverse = numpy.unique(categories, return_inverse=True)
+        ncells = ysize * xsize
+        counts = numpy.zeros(shape=(len(uniqueCategories), ncells), dtype=numpy.int64)
+        if x0 < x1 and y0 < y1:
+            window = sourceGrid.subset(offset=Pixel(x=x0, y=y0), size=RasterSize(x=x1 - x0, y=y1 - y0))
+            values = self.dataset().band(index=index).readAsArray(grid=window)
+
+            # map values to category indices and source pixels to target cell indices
+            codes = numpy.clip(numpy.searchsorted(uniqueCategories, values), 0, len(uniqueCategories) - 1)
+            valid = uniqueCategories[codes] == values
+            ycells = (numpy.arange(y0, y1) - yoff) // yfactor
+            xcells = (numpy.arange(x0, x1) - xoff) // xfactor
+            cells = ycells[:, None] * xsize + xcells[None, :]
+            counts = numpy.bincount(codes[valid] * ncells + cells[valid],
+                                    minlength=len(uniqueCategories) * ncells).reshape(len(uniqueCategories), ncells)
+
+        # source pixels outside the source raster count as not belonging to any category
+        array = numpy.float32(counts[inverse] / float(xfactor * yfactor))
+        return array.reshape((len(categories), ysize, xsize))
+
     def sample(self, mask, resampleAlg=gdal.GRA_NearestNeighbour, noDataValue=None,
                errorThreshold=ApplierDefaults.GDALWarp.errorThreshold,
                warpMemoryLimit=ApplierDefaults.GDALWarp.memoryLimit,
-               multithread=ApplierDefaults.GDALWarp.multithread):
+               multithread=ApplierDefaults.GDALWarp.multithread,
+               densityThreshold=ApplierDefaults.sampleDensityThreshold):
         '''
         Returns all pixel profiles for which ``mask`` is True as a 2-d numpy array of shape = (zsize, samples).
-        Note that pixel profiles are individually accessed, which is fast for sparse masks, but slow otherwise.
+        If the fraction of True pixels is above ``densityThreshold``, the whole subgrid is read at once and
+        profiles are extracted by indexing. Otherwise, pixel profiles are individually accessed,
+        which is faster for very sparse masks.
 
         :param overlap: the number of pixels to additionally read along each spatial dimension
         :param resampleAlg: GDAL resampling algorithm, e.g. gdal.GRA_NearestNeighbour
@@ -192,6 +254,7 @@ class ApplierInputRaster(ApplierIO):
         :param errorThreshold: error threshold for approximation transformer (in pixels)
         :param warpMemoryLimit: size of working buffer in bytes
         :param multithread: whether to multithread computation and I/O operations
+        :param densityThreshold: fraction of True pixels above which the whole subgrid is read
         '''
 
         assert isinstance(mask, numpy.ndarray)
@@ -200,6 +263,12 @@ class ApplierInputRaster(ApplierIO):
         assert mask.shape[0] == 1
         assert mask.shape[1:] == self.operator().subgrid().shape()
 
+        n = numpy.count_nonzero(mask)
+        if n != 0 and n > densityThreshold * mask.size:
+            array = self.array(resampleAlg=resampleAlg, noDataValue=noDataValue, errorThreshold=errorThreshold,
+                               warpMemoryLimit=warpMemoryLimit, multithread=multithread)
+            return array[:, mask[0]]
+
         ys, xs = numpy.indices(mask.shape[1:])[:, mask[0]]
         profiles = list()
         for y, x in zip(ys, xs):
@@ -955,6 +1024,10 @@ class Applier(object):
         else:
             raise errors.ApplierOperatorTypeError()
 
+        if self.operatorType.incrementalAggregation and \
+                self.operatorType.mergeBlockResults is ApplierOperator.mergeBlockResults:
+            raise errors.MissingMergeBlockResultsError(operatorType=self.operatorType)
+
         if description is None:
             description = self.operatorType.__name__
 
@@ -995,10 +1068,17 @@ class Applier(object):
         self.writers = list()
         self.queues = list()
         self.queueMock = QueueMock()
+        self.writerPool = None
         if self.controls._multiwriting:
+            if self.controls.writerSharedMemory:
+                try:
+                    self.writerPool = SharedMemoryPool(nslots=self.controls.writerBufferSlots,
+                                                       slotSize=self.controls.writerBufferSlotSize)
+                except OSError:
+                    self.writerPool = None  # no shared memory available, blocks are pickled
 
             for w in range(self.controls.nwriter if self.controls.nwriter is not None else 1):
-                w = WriterProcess()
+                w = WriterProcess(maxsize=self.controls.writerBufferSlots, pool=self.writerPool)
                 w.start()
                 self.writers.append(w)
                 self.queues.append(w.queue)
@@ -1023,10 +1103,15 @@ class Applier(object):
         _, n, ny, nx = subgrids[-1]
 
         self.nsubgrids = n
+        blockResults = list()
         if self.controls._multiprocessing:
             applyResults = list()
-        else:
-            blockResults = list()
+
+        def collect(blockResult):
+            if self.operatorType.incrementalAggregation and len(blockResults) != 0:
+                blockResults[0] = self.operatorType.mergeBlockResults(blockResults[0], blockResult)
+            else:
+                blockResults.append(blockResult)
 
         for subgrid, i, iy, ix in subgrids:
             kwargs = {'i': i,
@@ -1040,10 +1125,13 @@ class Applier(object):
             if self.controls._multiprocessing:
                 applyResults.append(self.pool.apply_async(func=_pickableWorkerProcessSubgrid, kwds=kwargs))
             else:
-                blockResults.append(_Worker.processSubgrid(**kwargs))
+                collect(_Worker.processSubgrid(**kwargs))
 
         if self.controls._multiprocessing:
-            blockResults = [applyResult.get() for applyResult in applyResults]
+            # drop each result handle as soon as it is folded, so that block results don't pile up
+            applyResults.reverse()
+            while len(applyResults) != 0:
+                collect(applyResults.pop().get())
 
         result = self.operatorType.aggregate(blockResults=blockResults, grid=self.grid(), *self.ufuncArgs, **self.ufuncKwargs)
         return result
@@ -1074,6 +1162,9 @@ class Applier(object):
                 writer.queue.put([Writer.CLOSE_RASTERS, self.controls.createEnviHeader])
                 writer.queue.put([Writer.CLOSE_WRITER, None])
                 writer.join()
+            if self.writerPool is not None:
+                self.writerPool.close()
+                self.writerPool = None
         else:
             self.queueMock.put([Writer.CLOSE_RASTERS, self.controls.createEnviHeader])
 
@@ -1286,6 +1377,19 @@ class ApplierOperator(object):
         '''
         return blockResults
 
+    incrementalAggregation = False
+    '''Set to True to merge block-wise return values with :meth:`mergeBlockResults` as soon as they are available,
+    instead of collecting all of them. :meth:`aggregate` then receives a list with the single merged value.'''
+
+    @staticmethod
+    def mergeBlockResults(result, blockResult):
+        '''
+        Overwrite this method to specify how to merge a block-wise return value into the merged return value
+        of all previous blocks. Only used if ``incrementalAggregation`` is True, in which case
+        :meth:`Applier.apply` requires it to be overwritten.
+        '''
+        raise NotImplementedError()
+
 
 class ApplierControls(object):
     '''Class for controlling various details of the applier processing.'''
@@ -1295,6 +1399,7 @@ class ApplierControls(object):
         self.setBlockSize()
         self.setNumThreads()
         self.setNumWriter()
+        self.setWriterBuffer()
         self.setWriteENVIHeader(createEnviHeader=False)
         self.setAutoExtent()
         self.setAutoResolution()
@@ -1373,6 +1478,25 @@ class ApplierControls(object):
         self.nwriter = nwriter
         return self
 
+    def setWriterBuffer(self, nslots=ApplierDefaults.WriterBuffer.nslots,
+                        slotSize=ApplierDefaults.WriterBuffer.slotSize,
+                        sharedMemory=ApplierDefaults.WriterBuffer.sharedMemory):
+        """
+        Set the number of output blocks that can be queued for the writer processes.
+        Workers block when the writer processes fall behind, which bounds the memory used for queued blocks.
+        If ``sharedMemory`` is True, blocks are passed through a pool of ``nslots`` shared memory slots of
+        ``slotSize`` bytes each, instead of pickling them. Blocks larger than the slot size are pickled.
+        The pool is allocated for each run, keep ``nslots * slotSize`` small, e.g. /dev/shm is often limited to 64 MB
+        inside containers and Windows commits the full size to the page file.
+        Shared memory requires Python 3.8 or newer and is disabled otherwise.
+        """
+
+        assert nslots > 0
+        self.writerBufferSlots = nslots
+        self.writerBufferSlotSize = slotSize
+        self.writerSharedMemory = sharedMemory and shared_memory is not None
+        return self
+
     def setWriteENVIHeader(self, createEnviHeader=ApplierDefaults.writeENVIHeader):
         """
         Set to True to create additional ENVI header files for all output rasters.
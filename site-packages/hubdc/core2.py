@@ -670,6 +670,36 @@ class Band(object):
         return array, maskArray.view(dtype=bool)
 
 
+class ArrayBand(Band):
+    '''Band holding the data of a single grid in memory, used for passing intermediate pipeline results.'''
+
+    def __init__(self, array, maskArray, grid, name, date, wavelength):
+        assert isinstance(grid, Grid)
+        assert array.shape == grid.shape()
+        assert maskArray.shape == grid.shape()
+        Band.__init__(self, filename='', index=0, mask=None, name=name, date=date, wavelength=wavelength,
+                      geometry=grid.extent(), tilingScheme=SingleTileTilingScheme(extent=grid.extent()))
+        self._array = array
+        self._maskArray = maskArray
+        self._grid = grid
+
+    def __deepcopy__(self, memo):
+        # bands are copied on select, rename, etc.; share the (read-only) data instead of copying it
+        return copy.copy(self)
+
+    def arrays(self, grid):
+        assert isinstance(grid, Grid)
+        if grid.equal(other=self._grid):
+            array, maskArray = self._array, self._maskArray
+        else:
+            array = RasterDataset.fromArray(array=self._array[None], grid=self._grid).warp(grid=grid).readAsArray()[0]
+            maskArray = RasterDataset.fromArray(array=np.uint8(self._maskArray)[None], grid=self._grid).warp(
+                grid=grid).readAsArray()[0].view(dtype=bool)
+        if self.mask() is not None:
+            maskArray = np.logical_and(maskArray, np.asarray(self.mask().arrays(grid=grid)[0][0]).view(dtype=bool))
+        return array, maskArray
+
+
 class Operand(object):
 
     def _connect(self, operator):
@@ -690,12 +720,7 @@ class Operand(object):
         assert isinstance(tile, Tile)
 
         if resolution is None:
-            if isinstance(self, Raster):  # use resolution of first band
-                resolution = openRasterDataset(filename=self.band(index=0).filename(tile=tile)).grid().resolution()
-            elif isinstance(self, Collection):  # use resolution of first raster
-                resolution = openRasterDataset(filename=self.first().band(index=0).filename(tile=tile)).grid().resolution()
-            else:
-                assert 0
+            resolution = self._tileResolution(tile=tile)
 
         resolution = Resolution.parse(resolution)
 
@@ -704,34 +729,7 @@ class Operand(object):
             driver = RasterDriver.fromFilename(filename=filename)
         maskFilename = join(dirname(filename), '.mask.{}'.format(basename(filename)))
 
-        if isinstance(operator, MapOperator):
-            array, maskArray = operator.calculate(raster=self, grid=grid)
-        elif isinstance(operator, ReduceOperator):
-            array, maskArray = operator.calculate(collection=self, grid=grid)
-        else:
-            assert 0
-
-
-        msg = 'wrong array or mask array format, check operator: {}'.format(operator)
-        if isinstance(array, list):
-            assert isinstance(array[0], np.ndarray), msg
-            assert array[0].ndim == 2, msg
-        elif isinstance(array, np.ndarray):
-            assert array.ndim == 3, msg
-        else:
-            assert 0, msg
-
-        if isinstance(maskArray, list):
-            assert isinstance(maskArray[0], np.ndarray), msg
-            assert maskArray[0].ndim == 2, msg
-            assert maskArray[0].dtype == bool, 'wrong mask array data type, expected bool, check operator: {}'.format(operator)
-        elif isinstance(maskArray, np.ndarray):
-            assert maskArray.ndim == 3, msg
-        else:
-            raise Exception('wrong mask array format, check operator: {}'.format(operator))
-
-        if len(array) != len(maskArray):
-            raise Exception('number of bands in array and mask array must match, check operator: {}'.format(operator))
+        array, maskArray = self._calculateOperator(operator=operator, grid=grid)
 
         if noDataValues is not None:
             assert len(noDataValues) == len(array)
@@ -777,6 +775,58 @@ class Operand(object):
 
         return raster, arrayRasterDataset, maskRasterDataset
 
+    def _computeOperatorInMemory(self, operator, grid):
+        '''Returns the operator result for the given grid as a raster of :class:`ArrayBand`'s.'''
+
+        array, maskArray = self._calculateOperator(operator=operator, grid=grid)
+        raster = Raster(name=operator.rasterName(self), date=operator.rasterDate(self))
+        for i in range(len(array)):
+            raster.addBand(band=ArrayBand(array=array[i], maskArray=np.asarray(maskArray[i], dtype=bool), grid=grid,
+                                          name=operator.bandName(i, self),
+                                          date=operator.bandDate(i, self),
+                                          wavelength=operator.wavelength(i, self)))
+        return raster
+
+    def _calculateOperator(self, operator, grid):
+        if isinstance(operator, MapOperator):
+            array, maskArray = operator.calculate(raster=self, grid=grid)
+        elif isinstance(operator, ReduceOperator):
+            array, maskArray = operator.calculate(collection=self, grid=grid)
+        else:
+            assert 0
+
+        msg = 'wrong array or mask array format, check operator: {}'.format(operator)
+        if isinstance(array, list):
+            assert isinstance(array[0], np.ndarray), msg
+            assert array[0].ndim == 2, msg
+        elif isinstance(array, np.ndarray):
+            assert array.ndim == 3, msg
+        else:
+            assert 0, msg
+
+        if isinstance(maskArray, list):
+            assert isinstance(maskArray[0], np.ndarray), msg
+            assert maskArray[0].ndim == 2, msg
+            assert maskArray[0].dtype == bool, 'wrong mask array data type, expected bool, check operator: {}'.format(operator)
+        elif isinstance(maskArray, np.ndarray):
+            assert maskArray.ndim == 3, msg
+        else:
+            raise Exception('wrong mask array format, check operator: {}'.format(operator))
+
+        if len(array) != len(maskArray):
+            raise Exception('number of bands in array and mask array must match, check operator: {}'.format(operator))
+
+        return array, maskArray
+
+    def _tileResolution(self, tile):
+        if isinstance(self, Raster):  # use resolution of first band
+            resolution = openRasterDataset(filename=self.band(index=0).filename(tile=tile)).grid().resolution()
+        elif isinstance(self, Collection):  # use resolution of first raster
+            resolution = openRasterDataset(filename=self.first().band(index=0).filename(tile=tile)).grid().resolution()
+        else:
+            assert 0
+        return resolution
+
     def arrays(self, grid):
         assert 0 # overload me!
 
@@ -913,6 +963,40 @@ class Pipeline(Operand):
         self._steps.append(operator)
         return self
 
+    def fusedSteps(self):
+        '''Returns the steps with consecutive map operators fused into single :class:`MapFused` operators.'''
+        stages = list()
+        mapOperators = list()
+        for operator in self._steps:
+            if isinstance(operator, MapOperator):
+                mapOperators.append(operator)
+                continue
+            if len(mapOperators) != 0:
+                stages.append(MapFused(operators=mapOperators))
+                mapOperators = list()
+            stages.append(operator)
+        if len(mapOperators) != 0:
+            stages.append(MapFused(operators=mapOperators))
+        if len(stages) == 0:
+            stages.append(MapIdentity())
+        return stages
+
+    def raster(self, grid):
+        '''Returns the result for the given grid as an in-memory raster, without writing any intermediate results.'''
+        assert isinstance(grid, Grid)
+        operand = self._operand
+        for operator in self.fusedSteps():
+            operand, operator = self._resolveStage(operand=operand, operator=operator, grid=grid)
+            operand = operand._computeOperatorInMemory(operator=operator, grid=grid)
+        return operand
+
+    @staticmethod
+    def _resolveStage(operand, operator, grid):
+        '''Returns the operand and operator for computing a stage, fused stages are resolved to their last operator.'''
+        if isinstance(operator, MapFused):
+            return operator.intermediate(raster=operand, grid=grid), operator.lastOperator()
+        return operand, operator
+
     def compute(self, filename, tilingScheme=None, resolution=None, noDataValues=None, driver=None, options=None,
                 categoryNames=None):
 
@@ -930,32 +1014,34 @@ class Pipeline(Operand):
         assert isinstance(tilingScheme, TilingScheme)
         assert isinstance(filename, str)
 
+        # intermediate results are passed in memory, only the last stage is written
+        stages = self.fusedSteps()
         geometry = None
         for tile in tilingScheme.tiles():
             print(tile.name())
             extent = tile.extent()
+            if resolution is None:
+                tileResolution = self._operand._tileResolution(tile=tile)
+            else:
+                tileResolution = Resolution.parse(resolution)
+            grid = Grid(extent=extent, resolution=tileResolution)
             operand = self._operand
-            last = len(self._steps) - 1
-            tmpfilenames = ['', '']
-            for i, operator in enumerate(self._steps):
+            for operator in stages[:-1]:
                 print('  {}'.format(operator))
-                if i != last: # write all intermediate results into mem
-                    kwds = {'filename': '/vsimem/step{}/{}'.format(i, filename), 'driver': driver, 'options': None}
-                else:
-                    kwds = {'filename': filename, 'driver': driver, 'options': options, 'noDataValues': noDataValues}
-
-                operand, rasterDataset, maskRasterDataset = operand._computeOperatorOnTile(operator=operator,
-                                                                                           tile=tile,
-                                                                                           extent=extent,
-                                                                                           resolution=resolution,
-                                                                                           categoryNames=categoryNames,
-                                                                                           **kwds)
-
-                for tmpfilename in tmpfilenames: # free memory of step i-1
-                    gdal.Unlink(tmpfilename)
-                tmpfilenames = [rasterDataset.filename(), maskRasterDataset.filename()]
-
-                assert isinstance(operand, Raster)
+                operand, operator = self._resolveStage(operand=operand, operator=operator, grid=grid)
+                operand = operand._computeOperatorInMemory(operator=operator, grid=grid)
+            print('  {}'.format(stages[-1]))
+            operand, operator = self._resolveStage(operand=operand, operator=stages[-1], grid=grid)
+            operand, rasterDataset, maskRasterDataset = operand._computeOperatorOnTile(operator=operator,
+                                                                                       tile=tile,
+                                                                                       extent=extent,
+                                                                                       resolution=tileResolution,
+                                                                                       categoryNames=categoryNames,
+                                                                                       filename=filename,
+                                                                                       driver=driver,
+                                                                                       options=options,
+                                                                                       noDataValues=noDataValues)
+            assert isinstance(operand, Raster)
 
             if geometry is None:
                 geometry = extent
@@ -981,31 +1067,18 @@ class Pipeline(Operand):
     def arrays(self, grid, returnRaster=False):
         assert isinstance(grid, Grid)
 
-        tilingScheme = SingleTileTilingScheme(extent=grid.extent())
-        filename = '/vsimem/pipeline/raster.bsq'
-        arrayFilename = '/vsimem/pipeline/./raster.bsq'
-        maskArrayFilename = '/vsimem/pipeline/./.mask.raster.bsq'
-
-        if self._cache:
-            filename = filename.replace('pipeline', 'cache/{}'.format(id(self)))
-            arrayFilename = arrayFilename.replace('pipeline', 'cache/{}'.format(id(self)))
-            maskArrayFilename = maskArrayFilename.replace('pipeline', 'cache/{}'.format(id(self)))
-
-
         key = '{}_{}'.format(id(self), id(grid))
         if key in CACHE:
-            raster, array, maskArray = CACHE[key]
+            raster = CACHE[key]
         else:
-            raster = self.compute(tilingScheme=tilingScheme, resolution=grid.resolution(),
-                                  filename=filename, driver=RasterDriver('ENVI'), options=None)
-            array = openRasterDataset(filename=arrayFilename).readAsArray()
-            maskArray = openRasterDataset(filename=maskArrayFilename).readAsArray()
+            raster = self.raster(grid=grid)
 
         if self._cache:
-            CACHE[key] = raster, array, maskArray
-        else:
-            gdal.Unlink(arrayFilename)
-            gdal.Unlink(maskArrayFilename)
+            CACHE[key] = raster
+
+        array, maskArray = raster.arrays(grid=grid)
+        array = np.array(array)
+        maskArray = np.array(maskArray)
 
         if returnRaster:
             return array, maskArray, raster
@@ -1379,6 +1452,41 @@ class MapAddRaster(MapOperator):
         return self.stack.band(index).wavelength()
 
 
+class MapFused(MapOperator):
+    '''
+    Chain of map operators, computed as a single pipeline stage.
+
+    Intermediate results are still materialized for each tile, as in-memory :class:`ArrayBand` rasters;
+    fusing only avoids writing them to /vsimem and reading them back.
+    The band metadata of the result is derived by the last operator from its input,
+    use :meth:`intermediate` and :meth:`lastOperator` to compute the stage.
+    '''
+
+    def __init__(self, operators):
+        assert len(operators) > 0
+        for operator in operators:
+            assert isinstance(operator, MapOperator)
+        self._operators = list(operators)
+
+    def __repr__(self):
+        return 'MapFused({})'.format(', '.join([repr(operator) for operator in self._operators]))
+
+    def lastOperator(self):
+        return self._operators[-1]
+
+    def intermediate(self, raster, grid):
+        '''Returns the result of all but the last operator for the given grid as an in-memory raster.'''
+        assert isinstance(raster, Raster)
+        assert isinstance(grid, Grid)
+        for operator in self._operators[:-1]:
+            raster = raster._computeOperatorInMemory(operator=operator, grid=grid)
+        return raster
+
+    def calculate(self, raster, grid):
+        raster = self.intermediate(raster=raster, grid=grid)
+        return raster._calculateOperator(operator=self.lastOperator(), grid=grid)
+
+
 class Raster(Operand):
 
     def __init__(self, name, date):
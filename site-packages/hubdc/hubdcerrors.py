@@ -60,6 +60,12 @@ class InvalidOGRLayerError(HubDcError):
 class ApplierOperatorTypeError(HubDcError):
     '''Applier operator must be a subclass of :class:`~hubdc.applier.ApplierOperator` or function.'''
 
+class MissingMergeBlockResultsError(HubDcError):
+    '''Applier operator with incremental aggregation must overwrite :meth:`~hubdc.applier.ApplierOperator.mergeBlockResults`.'''
+    def __init__(self, operatorType):
+        HubDcError.__init__(self, 'MissingMergeBlockResultsError: {} sets incrementalAggregation, '
+                                  'but does not overwrite mergeBlockResults'.format(operatorType.__name__))
+
 
 class ApplierOutputRasterNotInitializedError(HubDcError):
     '''Applier output raster is not initialized, use :meth:`~hubdc.applier.ApplierOutputRaster.initialize`.'''
@@ -0,0 +1,151 @@
+from os.path import join
+from tempfile import mkdtemp
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+import numpy as np
+
+from hubdc.applier import Applier, ApplierOperator, ApplierInputRaster, ApplierOutputRaster
+from hubdc.core import Extent, Grid, Projection, RasterDataset, openRasterDataset
+from hubdc.hubdcerrors import MissingMergeBlockResultsError
+from hubdc.progressbar import SilentProgressBar
+from hubdc.writer import SharedMemoryPool, shared_memory
+
+
+def createRaster(filename, array, resolution=30.):
+    extent = Extent(xmin=0, xmax=array.shape[-1] * resolution, ymin=0, ymax=array.shape[-2] * resolution,
+                    projection=Projection.utm(zone=33))
+    raster = RasterDataset.fromArray(array=array, grid=Grid(extent=extent, resolution=resolution), filename=filename)
+    raster.close()
+    return filename
+
+
+class RecordingSharedMemoryPool(SharedMemoryPool):
+    '''Shared memory pool that records the names of all created slots.'''
+    createdNames = list()
+
+    def __init__(self, nslots, slotSize):
+        SharedMemoryPool.__init__(self, nslots=nslots, slotSize=slotSize)
+        RecordingSharedMemoryPool.createdNames.extend(self.names)
+
+
+class CopyOperator(ApplierOperator):
+    def ufunc(operator):
+        array = operator.inputRaster.raster(key='image').array()
+        operator.outputRaster.raster(key='copy').setArray(array=array)
+        operator.outputRaster.raster(key='double').setArray(array=array * 2)
+
+
+class SampleOperator(ApplierOperator):
+    def ufunc(operator):
+        raster = operator.inputRaster.raster(key='image')
+        mask = raster.array()[:1] % 7 == 0
+        return raster.sample(mask=mask, densityThreshold=0), raster.sample(mask=mask, densityThreshold=1)
+
+
+class FractionOperator(ApplierOperator):
+    def ufunc(operator, categories, overlap):
+        return operator.inputRaster.raster(key='categories').fractionArray(categories=categories, overlap=overlap)
+
+
+class SumOperator(ApplierOperator):
+    incrementalAggregation = True
+
+    def ufunc(operator):
+        return int(operator.inputRaster.raster(key='image').array().sum())
+
+    @staticmethod
+    def mergeBlockResults(result, blockResult):
+        return result + blockResult
+
+
+class MissingMergeOperator(ApplierOperator):
+    incrementalAggregation = True
+
+    def ufunc(operator):
+        return 0
+
+
+class TestApplier(TestCase):
+
+    def setUp(self):
+        self.outdir = mkdtemp()
+        self.array = np.arange(3 * 100 * 120, dtype=np.int16).reshape((3, 100, 120))
+        self.filename = createRaster(join(self.outdir, 'image.tif'), self.array)
+
+    def applier(self):
+        applier = Applier()
+        applier.controls.setProgressBar(SilentProgressBar())
+        applier.controls.setBlockSize(32)
+        applier.inputRaster.setRaster(key='image', value=ApplierInputRaster(filename=self.filename))
+        for key in ['copy', 'double']:
+            applier.outputRaster.setRaster(key=key, value=ApplierOutputRaster(filename=join(self.outdir, key + '.tif')))
+        return applier
+
+    @skipIf(shared_memory is None, 'shared memory requires Python 3.8 or newer')
+    def test_multiwriting_withSharedMemory(self):
+        applier = self.applier()
+        applier.controls.setNumThreads(2)
+        applier.controls.setNumWriter(2)
+        applier.controls.setWriterBuffer(nslots=2, slotSize=32 * 32 * 3 * 2)
+        RecordingSharedMemoryPool.createdNames = list()
+        with patch('hubdc.applier.SharedMemoryPool', RecordingSharedMemoryPool):
+            applier.apply(operatorType=CopyOperator)
+
+        self.assertTrue(np.array_equal(self.array, openRasterDataset(join(self.outdir, 'copy.tif')).readAsArray()))
+        self.assertTrue(np.array_equal(self.array * 2, openRasterDataset(join(self.outdir, 'double.tif')).readAsArray()))
+
+        # all slots are unlinked after the run
+        self.assertEqual(2, len(RecordingSharedMemoryPool.createdNames))
+        self.assertIsNone(applier.writerPool)
+        for name in RecordingSharedMemoryPool.createdNames:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+    def test_sample_blockReadEqualsPixelReads(self):
+        applier = self.applier()
+        for blockRead, pixelReads in applier.apply(operatorType=SampleOperator):
+            self.assertEqual(3, len(blockRead))
+            self.assertLess(0, blockRead.shape[1])
+            self.assertTrue(np.array_equal(blockRead, pixelReads))
+
+    def test_fractionArray_blockReductionEqualsWarp(self):
+        array = np.random.RandomState(0).randint(1, 5, (1, 99, 120)).astype(np.uint8)
+        filename = createRaster(join(self.outdir, 'categories.tif'), array)
+        categories = [1, 3, 3, 5]  # duplicate and missing categories
+
+        def fractionArrays():
+            applier = Applier()
+            applier.controls.setProgressBar(SilentProgressBar())
+            applier.controls.setBlockSize(16)
+            applier.controls.setResolution(90)  # aligned, 3 x 3 source pixels per target pixel
+            applier.inputRaster.setRaster(key='categories', value=ApplierInputRaster(filename=filename))
+            # the overlap reaches past the raster edge in the border blocks
+            return applier.apply(operatorType=FractionOperator, categories=categories, overlap=2)
+
+        reductions = list()
+        fractionArrayByBlockReduction = ApplierInputRaster._fractionArrayByBlockReduction
+
+        def recordingFractionArrayByBlockReduction(raster, *args, **kwargs):
+            reductions.append(fractionArrayByBlockReduction(raster, *args, **kwargs))
+            return reductions[-1]
+
+        with patch.object(ApplierInputRaster, '_fractionArrayByBlockReduction', recordingFractionArrayByBlockReduction):
+            lead = fractionArrays()
+        self.assertLess(0, len(reductions))
+        self.assertTrue(all(reduction is not None for reduction in reductions))  # all blocks were reduced
+        with patch.object(ApplierInputRaster, '_fractionArrayByBlockReduction', return_value=None):
+            gold = fractionArrays()
+
+        self.assertEqual(len(gold), len(lead))
+        for fractions, goldFractions in zip(lead, gold):
+            self.assertEqual(goldFractions.shape, fractions.shape)
+            self.assertTrue(np.allclose(goldFractions, fractions))
+            self.assertTrue(np.array_equal(fractions[1], fractions[2]))
+            self.assertTrue(np.all(fractions[3] == 0))
+
+    def test_incrementalAggregation(self):
+        applier = self.applier()
+        self.assertEqual([int(self.array.sum())], applier.apply(operatorType=SumOperator))
+        with self.assertRaises(MissingMergeBlockResultsError):
+            applier.apply(operatorType=MissingMergeOperator)
@@ -0,0 +1,102 @@
+from os.path import join
+from tempfile import mkdtemp
+from unittest import TestCase
+
+import numpy as np
+
+from hubdc.core2 import (ArrayBand, Band, Collection, Extent, Grid, MapFused, Pipeline, Projection, Raster,
+                         RasterDataset, RasterDriver, ReduceMedian, SingleTileTilingScheme, openRasterDataset)
+
+
+def createRaster(filename, array, grid, name, mask=None):
+    RasterDataset.fromArray(array=array, grid=grid, filename=filename, driver=RasterDriver.fromFilename(filename)).close()
+    raster = Raster(name=name, date=None)
+    for i in range(len(array)):
+        raster.addBand(band=Band(filename=filename, index=i, mask=mask, name='band {}'.format(i + 1), date=None,
+                                 wavelength=None, geometry=grid.extent(),
+                                 tilingScheme=SingleTileTilingScheme(extent=grid.extent())))
+    return raster
+
+
+class TestPipeline(TestCase):
+
+    def setUp(self):
+        self.outdir = mkdtemp()
+        extent = Extent(xmin=0, xmax=40 * 30, ymin=0, ymax=30 * 30, projection=Projection.UTM(zone=33))
+        self.grid = Grid(extent=extent, resolution=30)
+        random = np.random.RandomState(0)
+        self.arrays = [random.randint(0, 100, (2, 30, 40)).astype(np.float32) for _ in range(3)]
+        self.valid = random.randint(0, 2, (30, 40)).astype(np.uint8)
+        mask = createRaster(join(self.outdir, 'mask.tif'), self.valid[None], self.grid, name='mask')
+
+        # all rasters share the mask, masked pixel are invalid in the median
+        self.collection = Collection()
+        for i, array in enumerate(self.arrays):
+            self.collection._addRaster(createRaster(join(self.outdir, 'image{}.tif'.format(i)), array, self.grid,
+                                                    name='image{}'.format(i), mask=mask))
+
+    def pipeline(self):
+        return self.collection.median().multiply(10).add(1).rename(bandNames=['a', 'b'])
+
+    def test_fusedSteps(self):
+        stages = self.pipeline().fusedSteps()
+        self.assertEqual(2, len(stages))
+        self.assertIsInstance(stages[0], ReduceMedian)
+        self.assertIsInstance(stages[1], MapFused)
+
+    def test_arraysEqualUnfusedSteps(self):
+        pipeline = self.pipeline()
+
+        # unfused reference, each step is computed into a raster of its own
+        operand = self.collection
+        for operator in pipeline._steps:
+            operand = operand._computeOperatorInMemory(operator=operator, grid=self.grid)
+        goldArray, goldMaskArray = operand.arrays(grid=self.grid)
+
+        array, maskArray, raster = pipeline.arrays(grid=self.grid, returnRaster=True)
+        self.assertTrue(np.array_equal(np.array(goldMaskArray), maskArray))
+        self.assertTrue(np.array_equal(np.array(goldArray)[maskArray], array[maskArray]))
+        self.assertEqual(['a', 'b'], raster.bandNames())
+
+        valid = self.valid.astype(bool)
+        median = np.median(self.arrays, axis=0)
+        self.assertTrue(np.all(maskArray == valid))
+        self.assertTrue(np.allclose(median[:, valid] * 10 + 1, array[:, valid]))
+
+    def test_compute(self):
+        filename = join(self.outdir, 'result.tif')
+        raster = self.pipeline().compute(filename=filename, noDataValues=[-1, -1],
+                                         categoryNames=[['low', 'high'], ['x', 'y']])
+        self.assertEqual(['a', 'b'], raster.bandNames())
+
+        array, maskArray = self.pipeline().arrays(grid=self.grid)
+        rasterDataset = openRasterDataset(filename=filename)
+        self.assertEqual([-1, -1], rasterDataset.noDataValues())
+        self.assertEqual(['a', 'b'], [band.description() for band in rasterDataset.bands()])
+        self.assertEqual([['low', 'high'], ['x', 'y']], [band.categoryNames() for band in rasterDataset.bands()])
+        written = rasterDataset.readAsArray()
+        self.assertTrue(np.allclose(array[maskArray], written[maskArray]))
+        self.assertTrue(np.all(written[np.logical_not(maskArray)] == -1))
+
+
+class TestArrayBand(TestCase):
+
+    def test_arraysOnOtherGrid(self):
+        projection = Projection.UTM(zone=33)
+        grid = Grid(extent=Extent(xmin=0, xmax=40 * 30, ymin=0, ymax=30 * 30, projection=projection), resolution=30)
+        array = np.arange(30 * 40, dtype=np.int32).reshape((30, 40))
+        maskArray = array % 3 != 0
+        band = ArrayBand(array=array, maskArray=maskArray, grid=grid, name='band', date=None, wavelength=None)
+
+        # same grid, data is passed through
+        a, m = band.arrays(grid=grid)
+        self.assertIs(array, a)
+        self.assertIs(maskArray, m)
+
+        # subset grid, 5 pixel right and 10 pixel down
+        subgrid = Grid(extent=Extent(xmin=5 * 30, xmax=25 * 30, ymin=10 * 30, ymax=20 * 30, projection=projection),
+                       resolution=30)
+        a, m = band.arrays(grid=subgrid)
+        self.assertEqual(bool, m.dtype)
+        self.assertTrue(np.array_equal(array[10:20, 5:25], a))
+        self.assertTrue(np.array_equal(maskArray[10:20, 5:25], m))
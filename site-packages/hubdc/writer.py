@@ -1,9 +1,13 @@
 from osgeo import gdal, gdal_array
 from multiprocessing import Process, Queue
-from time import sleep
 import numpy as np
 from hubdc.core import RasterDataset, RasterBandDataset, RasterDriver
 
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
 class Writer():
     WRITE_ARRAY, WRITE_BANDARRAY, CALL_RASTERMETHOD, CALL_BANDMETHOD, CLOSE_RASTERS, CLOSE_WRITER = range(6)
 
@@ -70,33 +74,149 @@ class Writer():
     def callBandMethode(cls, outputRasters, filename, index, method, kwargs):
         getattr(*method)(cls.getRaster(outputRasters, filename).band(index=index), **kwargs)
 
+class SharedArray(object):
+    '''Handle to an array stored inside a slot of a :class:`~hubdc.writer.SharedMemoryPool`.'''
+
+    def __init__(self, slot, shape, dtype):
+        self.slot = slot
+        self.shape = shape
+        self.dtype = dtype
+
+
+class SharedMemoryPool(object):
+    '''
+    Fixed-size pool of shared memory slots for passing arrays to writer processes without pickling them.
+
+    A producer acquires a free slot, copies the array into it and only sends the small slot handle.
+    The consumer releases the slot after using the array.
+    If all slots are in use, producers block until a slot is released.
+    Arrays larger than the slot size are passed as is.
+    '''
+
+    def __init__(self, nslots, slotSize):
+        assert shared_memory is not None, 'shared memory requires Python 3.8 or newer'
+        assert nslots > 0
+        self.slotSize = slotSize
+        self._attached = dict()
+        self._owned = list()
+        try:
+            for _ in range(nslots):
+                self._owned.append(shared_memory.SharedMemory(create=True, size=slotSize))
+        except Exception:
+            self.close()
+            raise
+        self.names = [memory.name for memory in self._owned]
+        self.freeSlots = Queue(maxsize=nslots)
+        for slot in range(nslots):
+            self.freeSlots.put(slot)
+
+    def __getstate__(self):
+        # only pass slot names, each process attaches the slots it uses
+        return {'slotSize': self.slotSize, 'names': self.names, 'freeSlots': self.freeSlots}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._owned = list()
+        self._attached = dict()
+
+    def _memory(self, slot):
+        if slot not in self._attached:
+            self._attached[slot] = shared_memory.SharedMemory(name=self.names[slot])
+        return self._attached[slot]
+
+    def store(self, array):
+        '''Copy array into a free slot and return the :class:`~hubdc.writer.SharedArray` handle.'''
+        if array.nbytes > self.slotSize or array.dtype.hasobject:
+            return array
+        slot = self.freeSlots.get()
+        sharedArray = SharedArray(slot=slot, shape=array.shape, dtype=array.dtype.str)
+        self.array(sharedArray)[...] = array
+        return sharedArray
+
+    def array(self, sharedArray):
+        '''Return array view on the slot content.'''
+        if not isinstance(sharedArray, SharedArray):
+            return sharedArray
+        return np.ndarray(shape=sharedArray.shape, dtype=sharedArray.dtype, buffer=self._memory(sharedArray.slot).buf)
+
+    def release(self, sharedArray):
+        '''Mark the slot as free. Array views on the slot must not be used afterwards.'''
+        if isinstance(sharedArray, SharedArray):
+            self.freeSlots.put(sharedArray.slot)
+
+    def close(self):
+        '''Free all slots, must be called by the process that created the pool, after all writers are closed.'''
+        for memory in list(self._attached.values()):
+            memory.close()
+        self._attached.clear()
+        for memory in self._owned:
+            memory.close()
+            memory.unlink()
+        self._owned = list()
+
+
+class WriterQueue(object):
+    '''
+    Bounded task queue for a :class:`~hubdc.writer.WriterProcess`.
+
+    Producers block when the queue is full, which throttles the compute workers if the writer falls behind.
+    If a :class:`~hubdc.writer.SharedMemoryPool` is given, block arrays are passed through its slots,
+    so that only slot handles are pickled.
+    '''
+
+    def __init__(self, maxsize=0, pool=None):
+        assert isinstance(pool, (SharedMemoryPool, type(None)))
+        self.queue = Queue(maxsize=maxsize)
+        self.pool = pool
+
+    def qsize(self):
+        return self.queue.qsize()
+
+    def put(self, value):
+        task, args = value[0], tuple(value[1:])
+        if self.pool is not None and task in (Writer.WRITE_ARRAY, Writer.WRITE_BANDARRAY):
+            filename, array = args[:2]
+            args = (filename, self.pool.store(array)) + args[2:]
+        self.queue.put((task,) + args)
+
+    def handleNext(self, outputRasters):
+        '''Handle the next task and return its type.'''
+        value = self.queue.get()
+        task, args = value[0], value[1:]
+        if task in (Writer.WRITE_ARRAY, Writer.WRITE_BANDARRAY) and isinstance(args[1], SharedArray):
+            sharedArray = args[1]
+            try:
+                args = (args[0], self.pool.array(sharedArray)) + tuple(args[2:])
+                Writer.handleTask(task=task, args=args, outputRasters=outputRasters)
+            finally:
+                args = None  # drop the view before the slot is reused
+                self.pool.release(sharedArray)
+        else:
+            Writer.handleTask(task=task, args=args, outputRasters=outputRasters)
+        return task
+
+
 class WriterProcess(Process):
 
-    def __init__(self):
+    def __init__(self, maxsize=0, pool=None):
         Process.__init__(self)
         self.outputRasters = dict()
-        self.queue = Queue()
+        self.queue = WriterQueue(maxsize=maxsize, pool=pool)
 
     def run(self):
 
-        try:
-            gdal.SetCacheMax(1)
-            while True:
-
-                sleep(0.01) # this should prevent high CPU load during idle time (not sure if this is really needed)
-                if self.queue.qsize() == 0:
-                    continue
-                value = self.queue.get()
-                task, args = value[0], value[1:]
-                Writer.handleTask(task=task, args=args, outputRasters=self.outputRasters)
-                if task is Writer.CLOSE_WRITER:
-                    break
-
-        except:
-
-            import traceback
-            tb = traceback.format_exc()
-            print(tb)
+        gdal.SetCacheMax(1)
+        while True:
+            try:
+                task = self.queue.handleNext(outputRasters=self.outputRasters)
+            except:
+                # keep consuming tasks, otherwise producers would block forever on the bounded queue
+                import traceback
+                tb = traceback.format_exc()
+                print(tb)
+                continue
+            if task is Writer.CLOSE_WRITER:
+                break
 
 class QueueMock():
 
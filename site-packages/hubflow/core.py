@@ -1299,9 +1299,14 @@ class Raster(Map):
         :type calcMean: bool
         :param calcStd: if set True, band standard deviations are calculated
         :type calcStd: bool
-        :param percentiles: values between 0 (i.e. min value) and 100 (i.e. max value), 50 is the median
+        :param percentiles: values between 0 (i.e. min value) and 100 (i.e. max value), 50 is the median;
+            percentiles are approximated block-wise with a :class:`~hubflow.core.HistogramSketch`,
+            the absolute error is not larger than the sketch bin width, which is smaller than 2 * (max - min) / 4095;
+            percentiles 0 and 100 are exact
         :type percentiles: List[float]
-        :param histogramRanges: list of ranges, one for each band; ranges are passed to ``numpy.histogram``; None ranges are set to (min, max)
+        :param histogramRanges: list of ranges, one for each band; ranges are passed to ``numpy.histogram`` and counted exactly;
+            None ranges are set to (min, max) and the histogram is derived from the sketch bins,
+            i.e. values are binned with an error not larger than the sketch bin width
         :type histogramRanges: List[numpy.histogram ranges]
         :param histogramBins: list of bins, one for each band; bins are passed to ``numpy.histogram``; None bins are set to 256
         :type histogramBins: List[numpy.histogram bins]
@@ -1323,11 +1328,10 @@ class Raster(Map):
         >>> # calculate percentiles (min, median, max)
         >>> statistics = raster.statistics(calcPercentiles=True, percentiles=[0, 50, 100])
         >>> print(statistics[0].percentiles)
-        [Percentile(rank=0, value=1.0), Percentile(rank=50, value=2.0), Percentile(rank=100, value=3.0)]
+        [Percentile(rank=0, value=1.0), Percentile(rank=50, value=2.00048828125), Percentile(rank=100, value=3.0)]
         '''
 
         applier = Applier(defaultGrid=self, **kwargs)
-        applier.controls.setBlockFullSize()
         applier.setFlowRaster('raster', raster=self)
         applier.setFlowMask('mask', mask=mask)
         return applier.apply(operatorType=_RasterStatistics, raster=self, bandIndices=bandIndices, mask=mask,
@@ -1602,7 +1606,176 @@ class _RasterCalculate(ApplierOperator):
         outraster.setArray(array=outarray)
 
 
+class HistogramSketch(object):
+    '''
+    One-pass, mergeable summary of a stream of values.
+
+    Count, min, max, mean and variance are exact (partial results are merged with the parallel algorithm of Chan et al.).
+    Values are additionally counted in at most ``bins`` histogram bins of width 2**exponent, anchored at zero.
+    If values or merged sketches do not fit into the bins, adjacent bins are merged (doubling the bin width).
+    Because all bin lattices are aligned, sketches calculated independently (e.g. for different blocks)
+    can be merged without loss, and the result does not depend on the merge order.
+
+    Quantiles have an absolute error not larger than :meth:`binWidth`,
+    which is smaller than 2 * (max - min) / (bins - 1).
+
+    :Example:
+
+    >>> sketch = HistogramSketch.fromValues(values=np.arange(1000.))
+    >>> sketch.merge(HistogramSketch.fromValues(values=np.arange(1000., 2000.)))
+    HistogramSketch(count=2000, min=0.0, max=1999.0, binWidth=0.5)
+    >>> median = sketch.percentiles(q=[50])[0]
+    >>> abs(median - np.percentile(np.arange(2000.), q=50)) <= sketch.binWidth()
+    True
+    '''
+
+    DefaultBins = 2 ** 12
+
+    def __init__(self, bins=DefaultBins):
+        assert bins >= 2
+        self.bins = int(bins)
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.mean = 0.
+        self.m2 = 0.  # sum of squared deviations from the mean
+        self.exponent = 0
+        self.offset = 0  # lattice index of the first bin
+        self.counts = np.zeros(shape=(self.bins,), dtype=np.int64)
+
+    def __repr__(self):
+        return 'HistogramSketch(count={}, min={}, max={}, binWidth={})'.format(self.count, self.min, self.max,
+            self.binWidth())
+
+    @classmethod
+    def fromValues(cls, values, bins=DefaultBins):
+        '''Create sketch from finite ``values``.'''
+        sketch = cls(bins=bins)
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return sketch
+        sketch.count = int(values.size)
+        sketch.min = float(np.min(values))
+        sketch.max = float(np.max(values))
+        sketch.mean = float(np.mean(values))
+        sketch.m2 = float(np.sum(np.square(values - sketch.mean)))
+        sketch.exponent = cls._exponent(vmin=sketch.min, vmax=sketch.max, bins=sketch.bins)
+        width = 2. ** sketch.exponent
+        sketch.offset = int(np.floor(sketch.min / width))
+        indices = np.floor(values / width).astype(np.int64) - sketch.offset
+        sketch.counts = np.bincount(indices, minlength=sketch.bins).astype(np.int64)
+        return sketch
+
+    @staticmethod
+    def _exponent(vmin, vmax, bins):
+        # smallest bin width, for which [vmin, vmax] fits into the bins and lattice indices stay exact in float64
+        maxabs = max(abs(vmin), abs(vmax))
+        exponent = int(np.frexp(maxabs)[1]) - 53 if maxabs > 0 else -1074
+        if vmax > vmin:
+            exponent = max(exponent, int(np.ceil(np.log2((vmax - vmin) / (bins - 1)))))
+        while np.floor(vmax / 2. ** exponent) - np.floor(vmin / 2. ** exponent) + 1 > bins:
+            exponent += 1
+        return exponent
+
+    def update(self, values):
+        '''Add finite ``values`` to the sketch.'''
+        return self.merge(HistogramSketch.fromValues(values=values, bins=self.bins))
+
+    def merge(self, other):
+        '''Merge ``other`` sketch into self.'''
+        assert isinstance(other, HistogramSketch)
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.min, self.max, self.mean, self.m2 = other.count, other.min, other.max, other.mean, other.m2
+            self.exponent, self.offset, self.counts = other.exponent, other.offset, other.counts.copy()
+            if len(self.counts) != self.bins:
+                self._rebin(exponent=self.exponent, others=[])
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._rebin(exponent=max(self.exponent, other.exponent), others=[other])
+        return self
+
+    def _rebin(self, exponent, others):
+        # recount bins of self and others on a common lattice, that covers [min, max] with at most self.bins bins
+        exponent = max(exponent, self._exponent(vmin=self.min, vmax=self.max, bins=self.bins))
+        offset = int(np.floor(self.min / 2. ** exponent))
+        counts = np.zeros(shape=(self.bins,), dtype=np.int64)
+        for sketch in [self] + others:
+            used = np.flatnonzero(sketch.counts)
+            # floor division of lattice indices by 2**shift (lattices are nested)
+            shift = min(exponent - sketch.exponent, 63)
+            indices = np.right_shift(sketch.offset + used, shift) - offset
+            counts += np.bincount(indices, weights=sketch.counts[used], minlength=self.bins).astype(np.int64)
+        self.exponent = exponent
+        self.offset = offset
+        self.counts = counts
+
+    def binWidth(self):
+        '''Returns the bin width, which is also the maximal absolute error of quantiles.'''
+        return 2. ** self.exponent
+
+    def std(self):
+        '''Returns the (population) standard deviation.'''
+        if self.count == 0:
+            return np.nan
+        return float(np.sqrt(self.m2 / self.count))
+
+    def percentiles(self, q):
+        '''
+        Returns approximated percentiles, consistent with ``numpy.percentile`` (linear interpolation).
+        Percentiles 0 and 100 are exact (min and max value).
+
+        :param q: percentiles between 0 and 100
+        '''
+        q = np.asarray(q, dtype=np.float64)
+        if self.count == 0:
+            return np.full(shape=q.shape, fill_value=np.nan)
+        ranks = q / 100. * (self.count - 1)
+        lower = np.floor(ranks)
+        fraction = ranks - lower
+        upper = np.minimum(lower + 1, self.count - 1)
+        lowerValues = self._orderStatistics(ranks=lower)
+        upperValues = self._orderStatistics(ranks=upper)
+        return lowerValues + fraction * (upperValues - lowerValues)
+
+    def _orderStatistics(self, ranks):
+        # approximate the k-th smallest values, assuming that values are spread evenly inside a bin
+        cumulated = np.cumsum(self.counts)
+        indices = np.searchsorted(cumulated, ranks, side='right')
+        before = cumulated[indices] - self.counts[indices]
+        width = self.binWidth()
+        lower = (self.offset + indices) * width
+        values = lower + (ranks - before + 0.5) / self.counts[indices] * width
+        values = np.clip(values, np.maximum(lower, self.min), np.minimum(lower + width, self.max))
+        values = np.where(ranks == 0, self.min, values)
+        values = np.where(ranks == self.count - 1, self.max, values)
+        return values
+
+    def histogram(self, bins=256, range=None):
+        '''
+        Returns ``(hist, bin_edges)`` like ``numpy.histogram``, derived from the sketch bins.
+        Values are assigned by the center of their sketch bin, i.e. bin edges are accurate up to :meth:`binWidth`.
+        Default range is (min, max).
+        '''
+        if range is None:
+            range = (self.min, self.max) if self.count != 0 else (0., 1.)
+        width = self.binWidth()
+        centers = np.clip((self.offset + np.arange(self.bins) + 0.5) * width, self.min, self.max)
+        hist, bin_edges = np.histogram(centers, bins=bins, range=range, weights=self.counts)
+        return hist.astype(np.int64), bin_edges
+
+
 class _RasterStatistics(ApplierOperator):
+    incrementalAggregation = True
+
     def ufunc(self, raster, bandIndices, mask, calcPercentiles, calcHistogram, calcMean, calcStd,
             percentiles, histogramRanges, histogramBins):
 
@@ -1611,69 +1784,99 @@ class _RasterStatistics(ApplierOperator):
         if bandIndices is None:
             bandIndices = range(self.inputRaster.raster('raster').dataset().zsize())
 
+        # return mergeable partial results for the current block, one for each band
         result = list()
-
-        BandStatistics = namedtuple('BandStatistics', ['index', 'nvalid', 'ninvalid', 'min', 'max', 'percentiles',
-                                                       'std', 'mean', 'histo'])
-        Histogram = namedtuple('Histogram', ['hist', 'bin_edges'])
-        Percentile = namedtuple('Percentile', ['rank', 'value'])
-
         for i, index in enumerate(bandIndices):
-            self.progressBar.setPercentage((float(i) + 1) / len(bandIndices) * 100)
             band = self.flowRasterArray('raster', raster=raster, indices=[index]).astype(dtype=np.float64)
             finiteValid = np.isfinite(band)
             valid = self.maskFromBandArray(array=band, noDataValueSource='raster', index=index)
             valid *= maskValid
             valid *= finiteValid
-            values = band[valid]  # may still contain NaN
+            values = band[valid]
             bandResult = dict()
-            bandResult['index'] = index
-            bandResult['nvalid'] = np.sum(valid)
-            bandResult['ninvalid'] = np.product(band.shape) - bandResult['nvalid']
-            bandResult['min'] = np.min(values)
-            bandResult['max'] = np.max(values)
+            bandResult['ninvalid'] = int(np.product(band.shape) - values.size)
+            bandResult['sketch'] = HistogramSketch.fromValues(values=values)
+
+            if calcHistogram and histogramRanges is not None:
+                assert len(histogramRanges) == len(bandIndices)
+            if calcHistogram and histogramRanges is not None and histogramRanges[index] is not None:
+                # fixed range histograms are counted exactly, None ranges are derived from the sketch in aggregate
+                if histogramBins is None:
+                    bins = 256
+                else:
+                    assert len(histogramBins) == len(bandIndices)
+                    bins = histogramBins[index]
+                hist, bin_edges = np.histogram(values, bins=bins, range=histogramRanges[index])
+                bandResult['histo'] = (hist, bin_edges)
+            result.append(bandResult)
+        return result
+
+    @staticmethod
+    def mergeBlockResults(result, blockResult):
+        for bandResult, bandBlockResult in zip(result, blockResult):
+            bandResult['ninvalid'] += bandBlockResult['ninvalid']
+            bandResult['sketch'].merge(bandBlockResult['sketch'])
+            if 'histo' in bandResult:
+                bandResult['histo'] = (bandResult['histo'][0] + bandBlockResult['histo'][0], bandResult['histo'][1])
+        return result
+
+    @staticmethod
+    def aggregate(blockResults, grid, raster, bandIndices, calcPercentiles, calcHistogram, calcMean, calcStd,
+            percentiles, histogramRanges, histogramBins, **kwargs):
+
+        BandStatistics = namedtuple('BandStatistics', ['index', 'nvalid', 'ninvalid', 'min', 'max', 'percentiles',
+                                                       'std', 'mean', 'histo'])
+        Histogram = namedtuple('Histogram', ['hist', 'bin_edges'])
+        Percentile = namedtuple('Percentile', ['rank', 'value'])
+
+        if bandIndices is None:
+            bandIndices = range(raster.dataset().zsize())
+
+        result = list()
+        for index, bandResult in zip(bandIndices, blockResults[0]):
+            sketch = bandResult['sketch']
+            assert isinstance(sketch, HistogramSketch)
+            statistics = dict()
+            statistics['index'] = index
+            statistics['nvalid'] = sketch.count
+            statistics['ninvalid'] = bandResult['ninvalid']
+            statistics['min'] = sketch.min
+            statistics['max'] = sketch.max
 
             if calcPercentiles:
                 qs = percentiles
-                ps = np.percentile(values, q=percentiles)
-                bandResult['percentiles'] = [Percentile(rank=rank, value=value) for rank, value in zip(qs, ps)]
+                ps = sketch.percentiles(q=percentiles)
+                statistics['percentiles'] = [Percentile(rank=rank, value=value) for rank, value in zip(qs, ps)]
             else:
-                bandResult['percentiles'] = None
+                statistics['percentiles'] = None
 
             if calcStd:
-                bandResult['std'] = np.nanstd(values)
+                statistics['std'] = sketch.std()
             else:
-                bandResult['std'] = None
+                statistics['std'] = None
 
             if calcMean:
-                bandResult['mean'] = np.nanmean(values)
+                statistics['mean'] = sketch.mean
             else:
-                bandResult['mean'] = None
+                statistics['mean'] = None
 
             if calcHistogram:
-                if histogramRanges is None:
-                    range_ = [bandResult['min'], bandResult['max']]
-                else:
-                    assert len(histogramRanges) == len(bandIndices)
-                    range_ = histogramRanges[index]
-                if histogramBins is None:
-                    bins = 256
+                if 'histo' in bandResult:
+                    hist, bin_edges = bandResult['histo']
                 else:
-                    assert len(histogramBins) == len(bandIndices)
-                    bins = histogramBins[index]
-
-                hist, bin_edges = np.histogram(values, bins=bins, range=range_)
-                bandResult['histo'] = Histogram(hist=hist, bin_edges=bin_edges)
+                    if histogramBins is None:
+                        bins = 256
+                    else:
+                        assert len(histogramBins) == len(bandIndices)
+                        bins = histogramBins[index]
+                    hist, bin_edges = sketch.histogram(bins=bins)
+                statistics['histo'] = Histogram(hist=hist, bin_edges=bin_edges)
             else:
-                bandResult['histo'] = None
+                statistics['histo'] = None
 
-            result.append(BandStatistics(**bandResult))
+            result.append(BandStatistics(**statistics))
         return result
 
-    @staticmethod
-    def aggregate(blockResults, grid, *args, **kwargs):
-        return blockResults[0]
-
 
 class _RasterFromVector(ApplierOperator):
     def ufunc(self, vector, noDataValue):
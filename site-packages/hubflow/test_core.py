@@ -710,6 +710,73 @@ class TestRaster(TestCase):
             resampleAlg=gdal.GRA_Average))
 
 
+class TestHistogramSketch(TestCase):
+
+    def test_mergeAndPercentiles(self):
+        random = np.random.RandomState(42)
+        parts = [random.normal(100, 30, 10000), random.uniform(-1000, 0, 5000), np.array([7.])]
+        values = np.concatenate(parts)
+
+        sketch = HistogramSketch()
+        for part in parts:
+            sketch.merge(HistogramSketch.fromValues(values=part))
+        self.assertEqual(sketch.count, len(values))
+        self.assertEqual(sketch.min, values.min())
+        self.assertEqual(sketch.max, values.max())
+        self.assertAlmostEqual(sketch.mean, values.mean())
+        self.assertAlmostEqual(sketch.std(), values.std())
+
+        q = [0, 2, 50, 98, 100]
+        error = np.abs(sketch.percentiles(q=q) - np.percentile(values, q=q))
+        self.assertTrue(np.all(error <= sketch.binWidth()))
+        self.assertLess(sketch.binWidth(), 2 * (values.max() - values.min()) / (sketch.bins - 1))
+
+        # merge order does not matter
+        reversed = HistogramSketch()
+        for part in parts[::-1]:
+            reversed.update(values=part)
+        self.assertTrue(np.array_equal(sketch.counts, reversed.counts))
+        self.assertEqual(sketch.histogram(bins=10)[0].sum(), len(values))
+
+    def test_rasterStatisticsOverSeveralBlocks(self):
+        random = np.random.RandomState(42)
+        array = random.normal(100, 30, (1, 50, 70))
+        array[0, ::7, ::5] = -9999
+        raster = Raster.fromArray(array=array, filename='/vsimem/rasterStatistics.bsq', noDataValues=[-9999])
+        values = array[array != -9999]
+        binWidth = HistogramSketch.fromValues(values=values).binWidth()
+
+        def statistics(histogramRanges):
+            return raster.statistics(calcPercentiles=True, calcHistogram=True, calcMean=True, calcStd=True,
+                percentiles=[0, 2, 50, 98, 100], histogramRanges=histogramRanges, histogramBins=[10],
+                controls=ApplierControls().setBlockSize(16))[0]  # 4 x 5 blocks
+
+        # counts and moments are exact, percentiles are accurate up to the sketch bin width
+        bandStatistics = statistics(histogramRanges=[(50, 150)])
+        self.assertEqual(bandStatistics.nvalid, len(values))
+        self.assertEqual(bandStatistics.ninvalid, array.size - len(values))
+        self.assertEqual(bandStatistics.min, values.min())
+        self.assertEqual(bandStatistics.max, values.max())
+        self.assertAlmostEqual(bandStatistics.mean, values.mean())
+        self.assertAlmostEqual(bandStatistics.std, values.std())
+        ranks = [percentile.rank for percentile in bandStatistics.percentiles]
+        error = np.abs([percentile.value for percentile in bandStatistics.percentiles] - np.percentile(values, ranks))
+        self.assertTrue(np.all(error <= binWidth))
+
+        # fixed range histograms are exact
+        hist, bin_edges = np.histogram(values, bins=10, range=(50, 150))
+        self.assertTrue(np.array_equal(bandStatistics.histo.hist, hist))
+        self.assertTrue(np.array_equal(bandStatistics.histo.bin_edges, bin_edges))
+
+        # None ranges span (min, max) of all blocks, values near inner bin edges may move to the neighbouring bin
+        bandStatistics = statistics(histogramRanges=[None])
+        hist, bin_edges = np.histogram(values, bins=10)
+        self.assertTrue(np.allclose(bandStatistics.histo.bin_edges, bin_edges))
+        self.assertEqual(bandStatistics.histo.hist.sum(), len(values))
+        nearEdge = np.sum(np.min(np.abs(values[:, None] - bin_edges[None, 1:-1]), axis=1) <= binWidth)
+        self.assertLessEqual(np.abs(bandStatistics.histo.hist - hist).sum(), 2 * nearEdge)
+
+
 class TestFraction(TestCase):
 
     def test_Fraction(self):
@@ -4,6 +4,7 @@ __all__ = ('ForwardRefPolicy', 'TypeHintWarning', 'typechecked', 'check_return_t
 import collections.abc
 import gc
 import inspect
+import os
 import sys
 import threading
 from collections import OrderedDict
@@ -65,6 +66,10 @@ _type_hints_map = WeakKeyDictionary()  # type: Dict[FunctionType, Dict[str, Any]
 _functions_map = WeakValueDictionary()  # type: Dict[CodeType, FunctionType]
 _missing = object()
 
+# Runtime type checking is opt-in: set the EMB_TYPECHECKING environment variable to 1 (before any decorated module
+# is imported) to wrap functions decorated with @typechecked. Otherwise the decorator returns the function unchanged.
+TYPECHECKING_ENABLED = os.environ.get('EMB_TYPECHECKING', '0').lower() in ['1', 'true']
+
 T_CallableOrType = TypeVar('T_CallableOrType', bound=Callable[..., Any])
 
 
@@ -845,8 +850,8 @@ def typechecked(func=None, *, always=False, _localns: Optional[Dict[str, Any]] =
 
     The return value is also checked against the return annotation if any.
 
-    If the ``__debug__`` global variable is set to ``False``, no wrapping and therefore no type
-    checking is done, unless ``always`` is ``True``.
+    If the ``__debug__`` global variable is set to ``False`` or the ``EMB_TYPECHECKING`` environment
+    variable is not set to ``1``, no wrapping and therefore no type checking is done, unless ``always`` is ``True``.
 
     This can also be used as a class decorator. This will wrap all type annotated methods,
     including ``@classmethod``, ``@staticmethod``,  and ``@property`` decorated methods,
@@ -859,7 +864,7 @@ def typechecked(func=None, *, always=False, _localns: Optional[Dict[str, Any]] =
     if func is None:
         return partial(typechecked, always=always, _localns=_localns)
 
-    if not __debug__ and not always:  # pragma: no cover
+    if not always and (not __debug__ or not TYPECHECKING_ENABLED):  # pragma: no cover
         return func
 
     if isclass(func):
@@ -0,0 +1,88 @@
+"""Benchmark the convolution backends for growing kernel sizes to find the crossover points.
+
+Usage: python snippets/processing/benchmark_convolution.py
+
+Results (single CPU core, numpy 2.4, scipy 1.17, astropy 8.0), which the KernelConvolver crossover points are based on:
+
+array [50, 250, 250], 1 % no data, interpolate, best of 3
+kernel                                shape     direct  separable        fft  automatic
+Random2D (3x3)                    [1, 3, 3]     0.109s          -     0.349s  direct
+Random2D (5x5)                    [1, 5, 5]     0.156s          -     0.305s  direct
+Random2D (7x7)                    [1, 7, 7]     0.294s          -     0.315s  direct
+Random2D (9x9)                    [1, 9, 9]     0.439s          -     0.349s  fft
+Random2D (11x11)                [1, 11, 11]     0.699s          -     0.344s  fft
+Gaussian2D (stddev=0.5)           [1, 5, 5]     0.177s     0.265s     0.406s  direct
+Gaussian2D (stddev=1)             [1, 9, 9]     0.456s     0.254s     0.379s  separable
+Gaussian2D (stddev=2)           [1, 17, 17]     1.424s     0.292s     0.359s  separable
+Gaussian2D (stddev=4)           [1, 33, 33]     5.039s     0.373s     0.455s  separable
+Ring2D (radius=1)                 [1, 7, 7]     0.300s          -     0.354s  direct
+Ring2D (radius=2)                 [1, 9, 9]     0.482s          -     0.345s  fft
+Ring2D (radius=4)               [1, 13, 13]     0.878s          -     0.374s  fft
+Gaussian1D (stddev=0.5)           [5, 1, 1]     0.141s     0.123s     0.269s  direct
+Gaussian1D (stddev=1)             [9, 1, 1]     0.202s     0.136s     0.274s  separable
+Gaussian1D (stddev=2)            [17, 1, 1]     0.332s     0.170s     0.417s  separable
+Gaussian1D (stddev=4)            [33, 1, 1]     0.718s     0.205s     0.475s  separable
+Random3D (3x3x3)                  [3, 3, 3]     0.207s          -     0.531s  direct
+Random3D (5x3x3)                  [5, 3, 3]     0.316s          -     0.584s  direct
+Random3D (7x3x3)                  [7, 3, 3]     0.323s          -     0.641s  direct
+
+Spectral kernels of 5 elements are at the crossover, direct and separable timings swap between runs.
+"""
+import time
+import warnings
+
+import numpy as np
+from astropy.convolution import Gaussian2DKernel, Ring2DKernel, Gaussian1DKernel
+from astropy.utils.exceptions import AstropyWarning
+
+from enmapboxprocessing.kernelconvolver import KernelConvolver
+
+SHAPE = (50, 250, 250)
+REPEATS = 3
+
+
+def timeit(convolver: KernelConvolver, array, mask) -> float:
+    times = list()
+    for i in range(REPEATS):
+        t0 = time.perf_counter()
+        convolver.convolve(array, mask)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def kernels():
+    random = np.random.RandomState(0)
+    for size in [3, 5, 7, 9, 11]:
+        kernel = random.random_sample((1, size, size)) + 0.1
+        yield f'Random2D ({size}x{size})', kernel
+    for stddev in [0.5, 1, 2, 4]:
+        kernel = Gaussian2DKernel(x_stddev=stddev).array[None]
+        yield f'Gaussian2D (stddev={stddev})', kernel
+    for radius in [1, 2, 4]:
+        kernel = Ring2DKernel(radius_in=radius, width=2).array[None]
+        yield f'Ring2D (radius={radius})', kernel
+    for stddev in [0.5, 1, 2, 4]:
+        kernel = Gaussian1DKernel(stddev=stddev).array.reshape(-1, 1, 1)
+        yield f'Gaussian1D (stddev={stddev})', kernel
+    for size in [3, 5, 7]:
+        kernel = random.random_sample((size, 3, 3)) + 0.1
+        yield f'Random3D ({size}x3x3)', kernel
+
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore', AstropyWarning)
+    random = np.random.RandomState(42)
+    array = random.random_sample(SHAPE)
+    mask = random.random_sample(SHAPE) > 0.01
+    print(f'array {list(SHAPE)}, 1 % no data, interpolate, best of {REPEATS}')
+    print(f'{"kernel":28} {"shape":>14} ' + ' '.join(f'{backend:>10}' for backend in KernelConvolver.Backends)
+          + '  automatic')
+    for name, kernel in kernels():
+        times = list()
+        for backend in KernelConvolver.Backends:
+            try:
+                times.append(f'{timeit(KernelConvolver(kernel, backend=backend), array, mask):9.3f}s')
+            except AssertionError:
+                times.append(f'{"-":>10}')
+        automatic = KernelConvolver(kernel).backend
+        print(f'{name:28} {str(list(kernel.shape)):>14} ' + ' '.join(times) + f'  {automatic}')
@@ -0,0 +1,41 @@
+"""Benchmark the per-call overhead of @typechecked on a 10,000 block walk.
+
+Type checking is decided when a decorated module is imported, so each configuration runs in its own interpreter.
+
+Usage: python snippets/processing/benchmark_typechecked.py
+"""
+import os
+import subprocess
+import sys
+
+NUMBER_OF_BLOCKS = 10000
+
+WALK = f'''
+import time
+from enmapbox.exampledata import enmap
+from enmapboxprocessing.rasterreader import RasterReader
+
+reader = RasterReader(enmap)
+blocks = list(reader.walkGrid(1, 1))[:{NUMBER_OF_BLOCKS}]
+t0 = time.perf_counter()
+for block in blocks:
+    array = reader.arrayFromBlock(block)
+    marray = reader.maskArray(array)
+print(time.perf_counter() - t0)
+'''
+
+
+def walk(typechecking: bool) -> float:
+    env = os.environ.copy()
+    env['EMB_TYPECHECKING'] = str(int(typechecking))
+    output = subprocess.check_output([sys.executable, '-c', WALK], env=env)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    enabled = walk(True)
+    disabled = walk(False)
+    print(f'{NUMBER_OF_BLOCKS} blocks (arrayFromBlock + maskArray)')
+    print(f'typechecking enabled:  {enabled:.3f} s')
+    print(f'typechecking disabled: {disabled:.3f} s')
+    print(f'overhead per block:    {(enabled - disabled) / NUMBER_OF_BLOCKS * 1e6:.1f} us')